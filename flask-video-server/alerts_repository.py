@@ -0,0 +1,134 @@
+"""
+Alerts Repository Module for ConstructGuard-AI
+Cached view of data/alerts.json with precomputed site and dashboard aggregates
+"""
+
+import os
+import json
+import threading
+import time
+
+ALERT_LEVELS = ("critical", "warning", "info")
+
+
+class AlertsSnapshot:
+    """Parsed alerts.json plus everything the API derives from it"""
+
+    def __init__(self, data):
+        self.data = data
+        self.sites_by_id = {}
+        self.site_summaries = []
+
+        for site in data['sites']:
+            self.sites_by_id.setdefault(site['id'], site)
+
+            # Count alerts
+            counts = {level: len(site['alerts'].get(level, [])) for level in ALERT_LEVELS}
+            counts['total'] = sum(counts.values())
+
+            self.site_summaries.append({
+                'id': site['id'],
+                'name': site['name'],
+                'location': site['location'],
+                'riskLevel': site['riskLevel'],
+                'riskScore': site['riskScore'],
+                'compliance': site['compliance'],
+                'workers': site['workers'],
+                'aiCameras': site['aiCameras'],
+                'lastCheck': site['lastCheck'],
+                'alertCounts': counts
+            })
+
+        self.dashboard_summary = self._build_dashboard_summary()
+
+    def find_site(self, site_id):
+        """Site by ID; numeric IDs ('1', '001') also match SITE_001"""
+        site = self.sites_by_id.get(site_id)
+        if site is None:
+            site = self.sites_by_id.get(f"SITE_{site_id.zfill(3)}")
+        return site
+
+    def _build_dashboard_summary(self):
+        sites = self.data['sites']
+        total_sites = len(sites)
+
+        alert_totals = {level: 0 for level in ALERT_LEVELS}
+        risk_levels = {'High': 0, 'Moderate': 0, 'Low': 0}
+
+        for site, summary in zip(sites, self.site_summaries):
+            for level in ALERT_LEVELS:
+                alert_totals[level] += summary['alertCounts'][level]
+
+            risk_level = site.get('riskLevel', 'Unknown')
+            if risk_level in risk_levels:
+                risk_levels[risk_level] += 1
+
+        # Calculate average compliance and risk score
+        avg_compliance = sum(site['compliance'] for site in sites) / total_sites if total_sites > 0 else 0
+        avg_risk_score = sum(site['riskScore'] for site in sites) / total_sites if total_sites > 0 else 0
+
+        return {
+            'summary': {
+                'totalSites': total_sites,
+                'totalWorkers': sum(site['workers'] for site in sites),
+                'totalCameras': sum(site['aiCameras'] for site in sites),
+                'averageCompliance': round(avg_compliance, 1),
+                'averageRiskScore': round(avg_risk_score, 1)
+            },
+            'alerts': dict(alert_totals, total=sum(alert_totals.values())),
+            'riskDistribution': risk_levels
+        }
+
+
+class AlertsRepository:
+    """Serves alerts.json from memory, re-reading it only when it changes.
+
+    The file is stat()ed at most once per `check_interval` seconds and
+    reparsed only when its mtime or size moved. Readers get an immutable
+    snapshot, so requests never wait on a reload in progress.
+    """
+
+    def __init__(self, path='data/alerts.json', check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._snapshot = AlertsSnapshot({"sites": []})
+        self._signature = "unloaded"
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _check_due(self, now):
+        return self._checked_at is None or now - self._checked_at >= self.check_interval
+
+    def snapshot(self):
+        now = time.monotonic()
+        if self._check_due(now):
+            with self._lock:
+                if self._check_due(now):
+                    self._reload_if_changed()
+                    self._checked_at = now
+        return self._snapshot
+
+    def _reload_if_changed(self):
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = None
+
+        if signature == self._signature:
+            return
+        # Only remember the file once it has been turned into a snapshot,
+        # so a failed build is retried on the next check
+        self._snapshot = AlertsSnapshot(self._load())
+        self._signature = signature
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            print("Warning: alerts.json not found")
+            return {"sites": []}
+        except json.JSONDecodeError:
+            print("Warning: Invalid JSON in alerts.json")
+            return {"sites": []}
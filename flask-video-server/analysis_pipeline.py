@@ -0,0 +1,287 @@
+"""
+Analysis Pipeline Module for ConstructGuard-AI
+Runs decode -> inference -> alerts/logging as stages joined by bounded queues
+"""
+
+import queue
+import threading
+import time
+from datetime import datetime
+
+from metrics import ALERTS, DECODE_SECONDS, FRAMES_ANALYZED, track_pipeline
+
+# Missing vests are reported at most once per this much video time (the
+# original every-60th-frame check at 30 FPS), whatever the sampling rate
+VEST_CHECK_SECONDS = 2.0
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+class StageStats:
+    """Timing counters for one pipeline stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy_s = 0.0
+        self.wait_in_s = 0.0
+        self.wait_out_s = 0.0
+
+    def to_dict(self):
+        return {
+            "items": self.items,
+            "busy_s": round(self.busy_s, 3),
+            "wait_input_s": round(self.wait_in_s, 3),
+            "wait_output_s": round(self.wait_out_s, 3),
+            "ms_per_item": round(self.busy_s / self.items * 1000, 2) if self.items else None
+        }
+
+
+class AnalysisAccumulator:
+    """Turns per-frame PPE counts into alerts, log rows and the run summary"""
+
+    def __init__(self, fps, sink):
+        self.fps = fps
+        self.sink = sink
+        self.alerts_generated = []
+        self.violation_count = 0
+        self.frames_analyzed = 0
+        self.last_frame_index = None
+        self.alert_counts = {"NoHelmetDetected": 0, "SafetyVestMissing": 0}
+        # Carried over from an earlier run this one continues
+        self.earlier_alerts = []
+
+    def state(self):
+        """Running totals for a checkpoint (see restore)"""
+        return {
+            "frames_analyzed": self.frames_analyzed,
+            "last_frame_index": self.last_frame_index,
+            "violation_count": self.violation_count,
+            "alert_counts": dict(self.alert_counts),
+            "recent_alerts": (self.earlier_alerts + self.alerts_generated)[-10:]
+        }
+
+    def restore(self, state):
+        """Continue the totals of an earlier run whose frames were already logged"""
+        self.frames_analyzed = state["frames_analyzed"]
+        self.last_frame_index = state["last_frame_index"]
+        self.violation_count = state["violation_count"]
+        self.alert_counts = dict(state["alert_counts"])
+        self.earlier_alerts = list(state["recent_alerts"])
+
+    def add(self, sample_no, frame_index, counts):
+        """Record one analyzed frame; returns the alerts it raised"""
+        time_s = frame_index / float(self.fps)
+        frame_alerts = []
+
+        # Generate alerts for violations
+        if counts["hat"] == 0:
+            frame_alerts.append({
+                "type": "NoHelmetDetected",
+                "timestamp": datetime.now().isoformat() + "Z",
+                "description": f"Worker detected without helmet at {time_s:.1f}s",
+                "confidence": 0.92,
+                "frame": frame_index,
+                "video_time": time_s
+            })
+
+        if counts["vest"] == 0 and self._vest_check_due(frame_index):  # Less frequent vest checks
+            frame_alerts.append({
+                "type": "SafetyVestMissing",
+                "timestamp": datetime.now().isoformat() + "Z",
+                "description": f"Worker without safety vest detected at {time_s:.1f}s",
+                "confidence": 0.87,
+                "frame": frame_index,
+                "video_time": time_s
+            })
+
+        for alert in frame_alerts:
+            ALERTS.inc(type=alert["type"])
+            self.alert_counts[alert["type"]] += 1
+        self.violation_count += len(frame_alerts)
+        self.alerts_generated.extend(frame_alerts)
+        self.frames_analyzed += 1
+        self.last_frame_index = frame_index
+
+        # Log to CSV
+        self.sink.write_frame(frame_index, time_s, counts)
+        return frame_alerts
+
+    def _vest_check_due(self, frame_index):
+        """True for the first analyzed frame of each VEST_CHECK_SECONDS window"""
+        if self.last_frame_index is None:
+            return True
+        window = VEST_CHECK_SECONDS * self.fps
+        return frame_index // window > self.last_frame_index // window
+
+    def summary(self, site_id, video_path, csv_path, total_frames):
+        return {
+            "site_id": site_id,
+            "video_path": str(video_path),
+            "analysis_timestamp": datetime.now().isoformat(),
+            "total_frames_processed": total_frames,
+            "total_violations": self.violation_count,
+            "compliance_score": max(0, 100 - (self.violation_count * 5)),  # Rough calculation
+            "alerts": (self.earlier_alerts + self.alerts_generated)[-10:],  # Last 10 alerts
+            "csv_log": str(csv_path),
+            "summary": {
+                "helmet_violations": self.alert_counts["NoHelmetDetected"],
+                "vest_violations": self.alert_counts["SafetyVestMissing"],
+                "total_violations": sum(self.alert_counts.values())
+            }
+        }
+
+
+class AnalysisPipeline:
+    """Decoder thread -> inference thread -> writer (caller's thread).
+
+    Stages hand work over through bounded queues, so a fast decoder blocks
+    instead of buffering a whole video ahead of a slow model. Decoding runs
+    in the ffmpeg subprocess and inference releases the GIL inside
+    torch/numpy, so threads are enough to overlap the two.
+    """
+
+    def __init__(self, detector, reader, accumulator, queue_size=8, progress_callback=None, gate=None,
+                 alert_callback=None):
+        self.detector = detector
+        self.gate = gate
+        self.reader = reader
+        self.accumulator = accumulator
+        self.progress_callback = progress_callback
+        self.alert_callback = alert_callback
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.counts = queue.Queue(maxsize=queue_size)
+        self.stages = {name: StageStats(name) for name in ("decode", "inference", "write")}
+        self.wall_s = 0.0
+        self._stop = threading.Event()
+        self._error = None
+
+    def run(self):
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._guard, args=(self._decode,), daemon=True),
+            threading.Thread(target=self._guard, args=(self._infer,), daemon=True),
+        ]
+        track_pipeline(self, True)
+        for thread in threads:
+            thread.start()
+
+        try:
+            self._write()
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+            track_pipeline(self, False)
+            self.wall_s = time.perf_counter() - start
+
+        if self._error is not None:
+            raise self._error
+
+    def stats(self):
+        """Per-stage timing; the bottleneck is the stage with the most busy time"""
+        stages = {name: stage.to_dict() for name, stage in self.stages.items()}
+        bottleneck = max(self.stages.values(), key=lambda stage: stage.busy_s).name
+        return {
+            "wall_s": round(self.wall_s, 3),
+            "bottleneck": bottleneck,
+            "stages": stages
+        }
+
+    def _guard(self, stage):
+        try:
+            stage()
+        except BaseException as e:
+            if self._error is None:
+                self._error = e
+            self._stop.set()
+
+    def _put(self, q, item, stats):
+        waited = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        stats.wait_out_s += time.perf_counter() - waited
+
+    def _get(self, q, stats):
+        waited = time.perf_counter()
+        item = _DONE
+        while True:
+            try:
+                item = q.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if self._stop.is_set():
+                    break
+        stats.wait_in_s += time.perf_counter() - waited
+        return item
+
+    def _decode(self):
+        stats = self.stages["decode"]
+        started = time.perf_counter()
+        frames = iter(self.reader)
+        try:
+            decode_started = time.perf_counter()
+            for item in frames:
+                DECODE_SECONDS.observe(time.perf_counter() - decode_started)
+                if self._stop.is_set():
+                    break
+                stats.items += 1
+                self._put(self.frames, item, stats)
+                decode_started = time.perf_counter()
+        finally:
+            if hasattr(frames, "close"):
+                frames.close()
+            self._put(self.frames, _DONE, stats)
+            stats.busy_s = time.perf_counter() - started - stats.wait_out_s
+
+    def _queued_frames(self):
+        stats = self.stages["inference"]
+        while True:
+            item = self._get(self.frames, stats)
+            if item is _DONE:
+                return
+            yield item
+
+    def _infer(self):
+        stats = self.stages["inference"]
+        started = time.perf_counter()
+        try:
+            for item in self.detector.iter_frame_counts(self._queued_frames(), gate=self.gate):
+                if self._stop.is_set():
+                    break
+                stats.items += 1
+                self._put(self.counts, item, stats)
+        finally:
+            self._put(self.counts, _DONE, stats)
+            stats.busy_s = time.perf_counter() - started - stats.wait_in_s - stats.wait_out_s
+
+    def _write(self):
+        stats = self.stages["write"]
+        started = time.perf_counter()
+        try:
+            while True:
+                item = self._get(self.counts, stats)
+                if item is _DONE:
+                    break
+                sample_no, frame_index, counts = item
+                frame_alerts = self.accumulator.add(sample_no, frame_index, counts)
+                FRAMES_ANALYZED.inc()
+                stats.items += 1
+
+                if self.alert_callback:
+                    for alert in frame_alerts:
+                        self.alert_callback(alert)
+                if self.progress_callback:
+                    self.progress_callback(frame_index + 1, self.reader.estimated_frame_count())
+
+                if sample_no % 10 == 0:
+                    print(f"Processed {frame_index} frames...")
+        finally:
+            stats.busy_s = time.perf_counter() - started - stats.wait_in_s
@@ -1,11 +1,23 @@
+import time
+_process_started = time.perf_counter()  # for startup-time tracking
+
 from flask import Flask, Response, render_template_string, jsonify, request
 from flask_cors import CORS
 import cv2
 import threading
-import time
 import os
+import importlib.util
 import json
-from ppe_detector import initialize_ppe_detector, analyze_video_async
+import socket
+from datetime import datetime
+from ppe_detector import initialize_ppe_detector
+from job_scheduler import JobScheduler, PRIORITIES
+from alerts_repository import AlertsRepository, ALERT_LEVELS
+from stream_broadcaster import BroadcasterRegistry, ClientStream, StreamSettings
+from frame_cache import clip_cache_for, release_clip_cache
+from live_annotator import LiveAnnotator
+from event_bus import EventBus, ProgressTracker
+from metrics import REGISTRY, CONTENT_TYPE, ENCODE_SECONDS, HTTP_REQUEST_SECONDS, JOBS, STREAM_SUBSCRIBERS
 
 # Import video watcher for automatic processing
 try:
@@ -18,19 +30,33 @@ except ImportError:
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React app
 
-# Initialize PPE detector
-ppe_detector = initialize_ppe_detector()
-
 # Global video watcher instance
 video_watcher = None
 
+# Global background analysis scheduler (created at start-up)
+job_scheduler = None
+
+# Live analysis progress/alerts per site, streamed at /api/ppe/events/<site_id>
+analysis_events = EventBus()
+
+def publish_job_event(job, event, payload):
+    """JobScheduler listener: forward background job events to the site's stream"""
+    analysis_events.publish(job.site_id, event, dict(payload, job_id=job.id))
+
+# Seconds from process start to each start-up milestone
+STARTUP_TIMINGS = {'imports_s': round(time.perf_counter() - _process_started, 3)}
+
 # Start automatic video processing
 def start_video_watcher():
     """Start the automatic video processing service"""
     global video_watcher
     if VIDEO_WATCHER_AVAILABLE and video_watcher is None:
         try:
-            video_watcher = VideoWatcher("../construction_videos")
+            # Watcher jobs share the server's scheduler (at low priority)
+            video_watcher = VideoWatcher(
+                os.environ.get('PPE_WATCH_DIR', '../construction_videos'),
+                job_scheduler=job_scheduler
+            )
             # Start in background thread
             watcher_thread = threading.Thread(
                 target=video_watcher.start_watching,
@@ -41,23 +67,32 @@ def start_video_watcher():
         except Exception as e:
             print(f"Failed to start video watcher: {e}")
 
-# Start video watcher when app starts
-start_video_watcher()
+# Analysis workers are spawned processes that re-import this module as
+# __mp_main__; they build their own detector, so only the server starts up
+if __name__ != '__mp_main__':
+    # Load the model in the background so the server can bind right away;
+    # /ready reports when it is warmed up, and sync analysis returns 503 until then
+    ppe_detector = initialize_ppe_detector(background=True)
+    
+    # Background analysis jobs run on a bounded process pool
+    job_scheduler = JobScheduler(detector_kwargs={
+        'weights_path': ppe_detector.weights_path,
+        'conf_threshold': ppe_detector.conf_threshold,
+        'backend': ppe_detector.backend,
+        'shards': ppe_detector.shards
+    }, listener=publish_job_event)
+    
+    # Start video watcher when app starts (off the start-up path)
+    threading.Thread(target=start_video_watcher, daemon=True).start()
+
+# Alerts data, reloaded only when data/alerts.json changes
+alerts_repository = AlertsRepository('data/alerts.json')
 
-# Load alerts data
 def load_alerts_data():
-    try:
-        with open('data/alerts.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("Warning: alerts.json not found")
-        return {"sites": []}
-    except json.JSONDecodeError:
-        print("Warning: Invalid JSON in alerts.json")
-        return {"sites": []}
+    return alerts_repository.snapshot().data
 
 class VideoCamera:
-    def __init__(self, video_source=None):
+    def __init__(self, video_source=None, use_frame_cache=False, annotator=None):
         # Use video file if provided, otherwise use default camera
         if video_source and os.path.exists(video_source):
             self.video = cv2.VideoCapture(video_source)
@@ -78,14 +113,40 @@ class VideoCamera:
             self.current_frame = 0
             print(f"Video info: {self.total_frames} frames, {self.fps} FPS")
         
+        # Live PPE detections drawn onto each frame (annotated feeds)
+        self.annotator = annotator
+        
+        # Looping file feeds can replay pre-encoded frames after the first pass
+        self.clip_cache = None
+        if self.is_file and use_frame_cache and annotator is None:
+            self.clip_cache = clip_cache_for(video_source)
+            if not self.clip_cache.complete:
+                self.clip_cache.reset()  # (re)build from frame 0
+            else:
+                self.video.release()
+        
     def __del__(self):
         self.video.release()
+        if self.annotator is not None:
+            self.annotator.stop()
+        if self.clip_cache is not None:
+            release_clip_cache(self.clip_cache)
         
     def get_frame(self):
+        cache = self.clip_cache
+        if cache is not None and cache.complete:
+            return self._cached_frame(cache)
+        
         success, image = self.video.read()
         
         # If it's a video file and we've reached the end, restart from beginning
         if not success and self.is_file:
+            if cache is not None and not cache.failed:
+                cache.finish()
+                if cache.complete:
+                    self.video.release()
+                    self.current_frame = 0
+                    return self._cached_frame(cache)
             self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
             self.current_frame = 0
             success, image = self.video.read()
@@ -97,10 +158,19 @@ class VideoCamera:
         if self.is_file:
             self.current_frame += 1
         
+        if self.annotator is not None:
+            self.annotator.offer(image)
+            self.annotator.draw(image)
+        
+        caching = cache is not None and not cache.failed
+        if caching:
+            cache.prepare(image)
+        
         # Add some text overlay for construction site simulation
         font = cv2.FONT_HERSHEY_SIMPLEX
         cv2.putText(image, 'ConstructGuard-AI Live Feed', (10, 30), font, 0.7, (0, 255, 0), 2)
-        cv2.putText(image, f'Time: {time.strftime("%H:%M:%S")}', (10, 60), font, 0.5, (255, 255, 255), 1)
+        if not caching:
+            cv2.putText(image, f'Time: {time.strftime("%H:%M:%S")}', (10, 60), font, 0.5, (255, 255, 255), 1)
         
         if self.is_file:
             cv2.putText(image, f'Frame: {self.current_frame}/{self.total_frames}', (10, 90), font, 0.5, (255, 255, 0), 1)
@@ -108,21 +178,101 @@ class VideoCamera:
         else:
             cv2.putText(image, 'Status: LIVE MONITORING', (10, 90), font, 0.5, (0, 255, 0), 1)
         
+        if caching:
+            # Stored without the clock, which is spliced in per second
+            self.last_image = None
+            return cache.with_clock(cache.add(image))
+        
+        # Keep the overlaid image so stream variants can be resized from it
+        self.last_image = image
+        
         # Convert image to JPEG
-        ret, jpeg = cv2.imencode('.jpg', image)
+        with ENCODE_SECONDS.time(kind="frame"):
+            ret, jpeg = cv2.imencode('.jpg', image)
         return jpeg.tobytes()
+    
+    def _cached_frame(self, cache):
+        """Next frame of a fully cached clip: stored bytes plus the clock"""
+        if self.current_frame >= len(cache.store):
+            self.current_frame = 0
+        jpeg = cache.frame(self.current_frame)
+        self.current_frame += 1
+        self.last_image = None
+        return cache.with_clock(jpeg)
 
-def generate_frames(camera):
-    while True:
-        frame = camera.get_frame()
-        if frame is not None:
+def generate_frames(client_stream):
+    """MJPEG stream for one viewer of a shared feed"""
+    frames = client_stream.frames()
+    try:
+        for frame in frames:
             yield (b'--frame\r\n'
                    b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-        # Adjust frame rate - for video files, use original FPS
-        if hasattr(camera, 'is_file') and camera.is_file and hasattr(camera, 'fps'):
-            time.sleep(1.0 / camera.fps)  # Use original video FPS
-        else:
-            time.sleep(0.1)  # 10 FPS for webcam
+    finally:
+        # Runs when the client disconnects and the response is closed
+        frames.close()
+
+# One capture/encode producer per video source, shared by all viewers
+stream_broadcasters = BroadcasterRegistry()
+
+# Gauges read at scrape time, so they cost nothing between scrapes
+STREAM_SUBSCRIBERS.set_callback(lambda: {
+    (feed,): info['subscribers'] for feed, info in stream_broadcasters.stats().items()
+})
+JOBS.set_callback(lambda: {
+    (status,): count for status, count in job_scheduler.counts().items()
+} if job_scheduler else {})
+
+def feed_response(video_path, annotated=False):
+    """MJPEG response for a source, sized/paced by ?width=&height=&quality=&max_fps="""
+    try:
+        settings = StreamSettings.from_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid stream parameter: {e}'}), 400
+    
+    is_file = bool(video_path and os.path.exists(video_path))
+    key = video_path if is_file else 'webcam'
+    if annotated:
+        # Annotated viewers share their own producer (and inference loop)
+        key = ('annotated', key)
+        factory = lambda: VideoCamera(
+            video_path, annotator=LiveAnnotator(ppe_detector, LIVE_INFERENCE_FPS, name=str(key))
+        )
+    else:
+        factory = lambda: VideoCamera(video_path, use_frame_cache=STREAM_FRAME_CACHE)
+    broadcaster = stream_broadcasters.get(key, factory)
+    source_fps = video_fps(video_path) if is_file else 10
+    
+    # A small send buffer makes a slow client's writes block within a frame
+    # or two, which is what lets ClientStream notice and drop frames; by
+    # default the kernel would queue seconds of video first
+    sock = request.environ.get('werkzeug.socket')
+    if sock is not None:
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, STREAM_SEND_BUFFER)
+        except OSError:
+            pass
+    
+    return Response(generate_frames(ClientStream(broadcaster, settings, source_fps)),
+                    mimetype='multipart/x-mixed-replace; boundary=frame')
+
+# Per-client socket send buffer for MJPEG streams
+STREAM_SEND_BUFFER = 256 * 1024
+
+# Replay looping file feeds from pre-encoded JPEGs (STREAM_FRAME_CACHE=0 disables)
+STREAM_FRAME_CACHE = os.environ.get('STREAM_FRAME_CACHE', '1') != '0'
+
+# Detector runs per second on annotated feeds, independent of the stream FPS
+LIVE_INFERENCE_FPS = float(os.environ.get('LIVE_INFERENCE_FPS', '2'))
+
+_video_fps = {}
+
+def video_fps(video_path):
+    """Source FPS of a video file (probed once)"""
+    if video_path not in _video_fps:
+        capture = cv2.VideoCapture(video_path)
+        _video_fps[video_path] = capture.get(cv2.CAP_PROP_FPS) or None
+        capture.release()
+    return _video_fps[video_path]
 
 # Video file paths for different sites
 VIDEO_FILES = {
@@ -136,22 +286,74 @@ VIDEO_FILES = {
 def video_feed():
     # Default video feed (webcam or first video file)
     video_path = VIDEO_FILES.get(1, None)
-    camera = VideoCamera(video_path)
-    return Response(generate_frames(camera),
-                    mimetype='multipart/x-mixed-replace; boundary=frame')
+    return feed_response(video_path)
 
 @app.route('/video_feed/<int:site_id>')
 def video_feed_site(site_id):
     """Serve different video files for different construction sites"""
     video_path = VIDEO_FILES.get(site_id, None)
-    camera = VideoCamera(video_path)
-    return Response(generate_frames(camera),
-                    mimetype='multipart/x-mixed-replace; boundary=frame')
+    return feed_response(video_path)
+
+@app.route('/video_feed/<int:site_id>/annotated')
+def video_feed_site_annotated(site_id):
+    """Site feed with live PPE detections drawn on (model runs at LIVE_INFERENCE_FPS)"""
+    video_path = VIDEO_FILES.get(site_id, None)
+    return feed_response(video_path, annotated=True)
+
+@app.before_request
+def start_request_timer():
+    request.started_at = time.perf_counter()
+
+@app.after_request
+def record_request_time(response):
+    started = getattr(request, 'started_at', None)
+    if started is not None:
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            endpoint=request.url_rule.rule if request.url_rule else 'unmatched',
+            method=request.method,
+            status=response.status_code
+        )
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint (stage latencies, throughput, jobs, viewers)"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
 
 @app.route('/health')
 def health():
     return {'status': 'ok', 'message': 'Video server is running'}
 
+def startup_timings():
+    timings = dict(STARTUP_TIMINGS)
+    if ppe_detector.ready_at is not None:
+        timings['model_ready_s'] = round(ppe_detector.ready_at - _process_started, 3)
+    timings.update(ppe_detector.load_timings)
+    return timings
+
+@app.route('/ready')
+def ready():
+    """Readiness probe: 200 once the PPE model is loaded and warmed up, 503 before"""
+    if not ppe_detector.ready.is_set():
+        return jsonify({'status': 'warming_up', 'startup': startup_timings()}), 503
+    return jsonify({
+        'status': 'ready',
+        'model_loaded': ppe_detector.model is not None,
+        'backend': ppe_detector.backend,
+        'startup': startup_timings()
+    })
+
+def warming_up_response():
+    """503 for endpoints that need the in-process model before it is ready"""
+    response = jsonify({
+        'error': 'PPE model is warming up',
+        'status': 'warming_up',
+        'message': 'The detection model is still loading; retry shortly or poll /ready'
+    })
+    response.headers['Retry-After'] = '5'
+    return response, 503
+
 @app.route('/videos')
 def list_videos():
     """List available video files"""
@@ -192,14 +394,8 @@ def get_all_alerts():
 @app.route('/api/alerts/<site_id>')
 def get_site_alerts(site_id):
     """Get alerts for a specific site"""
-    data = load_alerts_data()
-    
     # Find site by ID (support both SITE_001 format and numeric IDs)
-    site = None
-    for s in data['sites']:
-        if s['id'] == site_id or s['id'] == f"SITE_{site_id.zfill(3)}":
-            site = s
-            break
+    site = alerts_repository.snapshot().find_site(site_id)
     
     if not site:
         return jsonify({'error': 'Site not found'}), 404
@@ -209,19 +405,13 @@ def get_site_alerts(site_id):
 @app.route('/api/alerts/<site_id>/<alert_type>')
 def get_site_alerts_by_type(site_id, alert_type):
     """Get specific type of alerts for a site (critical, warning, info)"""
-    data = load_alerts_data()
-    
     # Find site by ID
-    site = None
-    for s in data['sites']:
-        if s['id'] == site_id or s['id'] == f"SITE_{site_id.zfill(3)}":
-            site = s
-            break
+    site = alerts_repository.snapshot().find_site(site_id)
     
     if not site:
         return jsonify({'error': 'Site not found'}), 404
     
-    if alert_type not in ['critical', 'warning', 'info']:
+    if alert_type not in ALERT_LEVELS:
         return jsonify({'error': 'Invalid alert type. Use: critical, warning, info'}), 400
     
     return jsonify({
@@ -234,85 +424,76 @@ def get_site_alerts_by_type(site_id, alert_type):
 @app.route('/api/sites')
 def get_all_sites():
     """Get basic site information without alerts"""
-    data = load_alerts_data()
-    sites = []
-    
-    for site in data['sites']:
-        # Count alerts
-        critical_count = len(site['alerts'].get('critical', []))
-        warning_count = len(site['alerts'].get('warning', []))
-        info_count = len(site['alerts'].get('info', []))
-        
-        sites.append({
-            'id': site['id'],
-            'name': site['name'],
-            'location': site['location'],
-            'riskLevel': site['riskLevel'],
-            'riskScore': site['riskScore'],
-            'compliance': site['compliance'],
-            'workers': site['workers'],
-            'aiCameras': site['aiCameras'],
-            'lastCheck': site['lastCheck'],
-            'alertCounts': {
-                'critical': critical_count,
-                'warning': warning_count,
-                'info': info_count,
-                'total': critical_count + warning_count + info_count
-            }
-        })
-    
-    return jsonify({'sites': sites})
+    # Per-site alert counts are computed once per alerts.json change
+    return jsonify({'sites': alerts_repository.snapshot().site_summaries})
 
 @app.route('/api/dashboard/summary')
 def get_dashboard_summary():
     """Get dashboard summary statistics"""
-    data = load_alerts_data()
-    
-    total_sites = len(data['sites'])
-    total_workers = sum(site['workers'] for site in data['sites'])
-    total_cameras = sum(site['aiCameras'] for site in data['sites'])
-    
-    # Count alerts by type
-    total_critical = 0
-    total_warning = 0
-    total_info = 0
+    return jsonify(alerts_repository.snapshot().dashboard_summary)
+
+# PPE Detection Endpoints
+def canonical_site_id(site_id):
+    """Numeric site IDs ('1', '001') in their SITE_001 form"""
+    return f"SITE_{site_id.zfill(3)}" if site_id.isdigit() else site_id
+
+def wants_async_analysis():
+    """?async=1 or `Prefer: respond-async` asks for a 202 + job handle"""
+    if request.args.get('async', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return 'respond-async' in request.headers.get('Prefer', '')
+
+def wants_incremental_analysis():
+    """?incremental=1 analyzes only frames appended since the last finished run"""
+    return request.args.get('incremental', '').lower() in ('1', 'true', 'yes')
+
+def analyze_with_events(video_path, site_id, incremental=False):
+    """Inline analysis that also publishes progress and alerts to the event stream"""
+    tracker = ProgressTracker()
     
-    risk_levels = {'High': 0, 'Moderate': 0, 'Low': 0}
+    def report_progress(frames_processed, total_frames):
+        update = tracker.update(frames_processed, total_frames)
+        if update is not None:
+            analysis_events.publish(site_id, 'progress', update)
     
-    for site in data['sites']:
-        total_critical += len(site['alerts'].get('critical', []))
-        total_warning += len(site['alerts'].get('warning', []))
-        total_info += len(site['alerts'].get('info', []))
-        
-        risk_level = site.get('riskLevel', 'Unknown')
-        if risk_level in risk_levels:
-            risk_levels[risk_level] += 1
+    analysis_events.publish(site_id, 'started', {'video_path': video_path})
+    try:
+        results = ppe_detector.analyze_video(
+            video_path, site_id,
+            progress_callback=report_progress,
+            alert_callback=lambda alert: analysis_events.publish(site_id, 'alert', alert),
+            incremental=incremental,
+            fallback=False
+        )
+    except Exception as e:
+        # Subscribers hear about the failure; the caller still gets the
+        # simulated results analyze_video() would have returned
+        analysis_events.publish(site_id, 'failed', {'error': str(e)})
+        return ppe_detector.create_simulated_results(site_id)
     
-    # Calculate average compliance and risk score
-    avg_compliance = sum(site['compliance'] for site in data['sites']) / total_sites if total_sites > 0 else 0
-    avg_risk_score = sum(site['riskScore'] for site in data['sites']) / total_sites if total_sites > 0 else 0
+    if results.get('status') == 'simulated_demo_data':
+        analysis_events.publish(site_id, 'failed', {
+            'error': 'PPE model or video decoding unavailable; results are simulated'
+        })
+        return results
     
-    return jsonify({
-        'summary': {
-            'totalSites': total_sites,
-            'totalWorkers': total_workers,
-            'totalCameras': total_cameras,
-            'averageCompliance': round(avg_compliance, 1),
-            'averageRiskScore': round(avg_risk_score, 1)
-        },
-        'alerts': {
-            'critical': total_critical,
-            'warning': total_warning,
-            'info': total_info,
-            'total': total_critical + total_warning + total_info
-        },
-        'riskDistribution': risk_levels
+    analysis_events.publish(site_id, 'completed', {
+        'total_violations': results.get('total_violations'),
+        'compliance_score': results.get('compliance_score'),
+        'cache_hit': bool(results.get('cache_hit'))
     })
+    return results
 
-# PPE Detection Endpoints
 @app.route('/api/ppe/analyze/<site_id>', methods=['POST'])
 def analyze_site_ppe(site_id):
-    """Analyze PPE compliance for a specific site"""
+    """Analyze PPE compliance for a specific site
+
+    Runs inline by default. In async mode the analysis is queued and the
+    response is 202 with a job handle to poll at /api/ppe/jobs/<job_id>;
+    repeat requests for the same site/video join the job already running.
+    With ?incremental=1 only frames appended since the last finished run
+    are analyzed and merged into its results.
+    """
     try:
         # Check if video file exists for the site
         video_files = {
@@ -329,10 +510,33 @@ def analyze_site_ppe(site_id):
         video_path = video_files.get(site_id)
         if not video_path or not os.path.exists(video_path):
             # Use simulated analysis if no video file
-            results = ppe_detector.create_simulated_results(site_id)
+            results = ppe_detector.create_simulated_results(canonical_site_id(site_id))
+        elif wants_async_analysis():
+            priority = request.args.get('priority', 'normal')
+            if priority not in PRIORITIES:
+                return jsonify({'error': f'Invalid priority. Use: {", ".join(PRIORITIES)}'}), 400
+            
+            job, created = job_scheduler.submit(
+                video_path, canonical_site_id(site_id), priority=priority,
+                incremental=wants_incremental_analysis()
+            )
+            status_url = f'/api/ppe/jobs/{job.id}'
+            response = jsonify({
+                'job_id': job.id,
+                'site_id': job.site_id,
+                'status': job.status,
+                'coalesced': not created,
+                'status_url': status_url
+            })
+            response.headers['Location'] = status_url
+            return response, 202
+        elif not ppe_detector.ready.is_set():
+            return warming_up_response()
         else:
             # Analyze actual video file
-            results = ppe_detector.analyze_video(video_path, site_id)
+            results = analyze_with_events(
+                video_path, canonical_site_id(site_id), incremental=wants_incremental_analysis()
+            )
         
         return jsonify(results)
     
@@ -347,7 +551,7 @@ def analyze_site_ppe(site_id):
 def get_ppe_results(site_id):
     """Get latest PPE analysis results for a site"""
     try:
-        results = ppe_detector.get_latest_results(site_id)
+        results = ppe_detector.get_latest_results(canonical_site_id(site_id))
         return jsonify(results)
     except Exception as e:
         return jsonify({
@@ -355,6 +559,86 @@ def get_ppe_results(site_id):
             'message': str(e)
         }), 500
 
+@app.route('/api/ppe/events/<site_id>')
+def ppe_events(site_id):
+    """Server-Sent Events: started/progress (with ETA)/alert/completed/failed for a site
+
+    Reconnecting EventSource clients send Last-Event-ID and get the events
+    they missed from a bounded buffer (or `resync` if they fell too far
+    behind). Clients that can't set headers may pass ?last_event_id=.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({'error': 'Last-Event-ID must be an integer'}), 400
+    
+    stream = analysis_events.stream(canonical_site_id(site_id), last_event_id)
+    return Response(stream, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # don't let nginx buffer the stream
+    })
+
+def parse_time_param(value):
+    """Query-string time as epoch seconds (accepts epoch numbers or ISO 8601)"""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+@app.route('/api/ppe/results/<site_id>/history')
+def get_ppe_results_history(site_id):
+    """Past PPE analysis runs for a site (?from=&to= as epoch or ISO time, ?limit=)"""
+    try:
+        since = parse_time_param(request.args.get('from'))
+        until = parse_time_param(request.args.get('to'))
+        limit = int(request.args.get('limit', 100))
+    except ValueError:
+        return jsonify({'error': 'Invalid from/to/limit parameter'}), 400
+    
+    try:
+        site_id = canonical_site_id(site_id)
+        runs = ppe_detector.get_results_history(site_id, since=since, until=until, limit=limit)
+        return jsonify({'site_id': site_id, 'runs': runs})
+    except Exception as e:
+        return jsonify({
+            'error': 'Failed to get PPE results history',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/ppe/timeline/<site_id>')
+def get_ppe_timeline(site_id):
+    """Per-frame PPE counts over video time in min/max/mean buckets
+
+    ?from=&to= are video seconds, ?resolution= the bucket width in seconds
+    and ?video= picks a video by file name (default: the latest analyzed).
+    """
+    try:
+        start = float(request.args['from']) if request.args.get('from') else None
+        end = float(request.args['to']) if request.args.get('to') else None
+        resolution = float(request.args['resolution']) if request.args.get('resolution') else None
+    except ValueError:
+        return jsonify({'error': 'Invalid from/to/resolution parameter'}), 400
+    
+    try:
+        timeline = ppe_detector.get_timeline(
+            canonical_site_id(site_id), start=start, end=end, resolution=resolution,
+            video=request.args.get('video')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({
+            'error': 'Failed to get PPE timeline',
+            'message': str(e)
+        }), 500
+    
+    if timeline is None:
+        return jsonify({'error': f'No timeline data for {site_id}'}), 404
+    return jsonify(timeline)
+
 @app.route('/api/ppe/status')
 def ppe_status():
     """Get PPE detection system status"""
@@ -366,11 +650,8 @@ def ppe_status():
             'imageio_available': False
         }
         
-        try:
-            from ultralytics import YOLO
-            status['yolo_available'] = True
-        except ImportError:
-            pass
+        # find_spec avoids importing ultralytics (and torch) just to check
+        status['yolo_available'] = importlib.util.find_spec('ultralytics') is not None
         
         try:
             import imageio.v2 as imageio
@@ -379,7 +660,9 @@ def ppe_status():
             pass
         
         status['model_loaded'] = ppe_detector.model is not None if ppe_detector else False
+        status['model_ready'] = ppe_detector.ready.is_set() if ppe_detector else False
         status['results_directory'] = str(ppe_detector.results_dir) if ppe_detector else 'Not initialized'
+        status['auto_processing'] = watcher_status()
         
         return jsonify(status)
     
@@ -389,6 +672,16 @@ def ppe_status():
             'message': str(e)
         }), 500
 
+def watcher_status():
+    if video_watcher is None:
+        return {'running': False, 'available': VIDEO_WATCHER_AVAILABLE}
+    return dict(video_watcher.status(), available=True)
+
+@app.route('/api/ppe/watcher')
+def get_watcher_status():
+    """Automatic processing: folder being watched, backlog, throughput, recent jobs"""
+    return jsonify(watcher_status())
+
 @app.route('/api/ppe/batch-analyze', methods=['POST'])
 def batch_analyze_ppe():
     """Analyze PPE for all sites with available videos"""
@@ -400,13 +693,20 @@ def batch_analyze_ppe():
             'SITE_004': 'videos/site4_construction.mp4'
         }
         
+        priority = request.args.get('priority', 'normal')
+        if priority not in PRIORITIES:
+            return jsonify({'error': f'Invalid priority. Use: {", ".join(PRIORITIES)}'}), 400
+        
         results = {}
         for site_id, video_path in video_files.items():
             if os.path.exists(video_path):
-                # Start async analysis
-                thread = analyze_video_async(video_path, site_id)
+                # Queue background analysis (joins an in-flight job for the site)
+                job, _created = job_scheduler.submit(
+                    video_path, site_id, priority=priority, incremental=wants_incremental_analysis()
+                )
                 results[site_id] = {
-                    'status': 'analysis_started',
+                    'status': job.status,
+                    'job_id': job.id,
                     'video_path': video_path
                 }
             else:
@@ -425,7 +725,29 @@ def batch_analyze_ppe():
             'message': str(e)
         }), 500
 
+@app.route('/api/ppe/jobs')
+def list_ppe_jobs():
+    """List background analysis jobs (optionally ?status=queued|running|completed|failed)"""
+    jobs = job_scheduler.list_jobs(status=request.args.get('status'))
+    return jsonify({
+        'jobs': [job.to_dict() for job in jobs],
+        'counts': job_scheduler.counts(),
+        'max_workers': job_scheduler.max_workers
+    })
+
+@app.route('/api/ppe/jobs/<job_id>')
+def get_ppe_job(job_id):
+    """Status, progress and (once finished) results of one analysis job"""
+    job = job_scheduler.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify(job.to_dict(include_result=True))
+
+STARTUP_TIMINGS['app_initialized_s'] = round(time.perf_counter() - _process_started, 3)
+
 if __name__ == '__main__':
+    print(f"⏱️  Server initialized in {STARTUP_TIMINGS['app_initialized_s']:.2f}s (model loading in background)")
     print("Starting ConstructGuard-AI Video Server...")
     print("Video feed available at: http://localhost:5001/video_feed")
     app.run(host='0.0.0.0', port=2000, debug=True, threaded=True)
\ No newline at end of file
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+API benchmark: endpoint latency and throughput under concurrent clients
+
+Starts the app (stub model, synthetic data) on a local port and hammers the
+read endpoints the dashboard polls, at several concurrency levels.
+
+Usage: python benchmarks/bench_api.py [--concurrency 1,8,32] [--requests 400] [--sites 50]
+"""
+
+import argparse
+import http.client
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+from synthetic import emit_report, make_synthetic_video, start_bench_server
+
+ENDPOINTS = [
+    "/health",
+    "/api/alerts",
+    "/api/sites",
+    "/api/dashboard/summary",
+    "/api/alerts/SITE_001/critical",
+    "/api/ppe/results/SITE_001",
+]
+
+
+def load_test(host, port, path, concurrency, total):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    remaining = [total]
+
+    def client():
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                conn.close()
+                ok = response.status < 500
+            except OSError:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "req_per_s": round(len(latencies) / wall, 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=400, help="Requests per endpoint and level")
+    parser.add_argument("--sites", type=int, default=50)
+    args = parser.parse_args()
+
+    video = make_synthetic_video("constructguard_bench_480p.mp4", seconds=10, width=640, height=480)
+    with tempfile.TemporaryDirectory() as tmp:
+        base_url, _app = start_bench_server(video, tmp, sites=args.sites)
+        url = urlparse(base_url)
+
+        levels = [int(level) for level in args.concurrency.split(",")]
+        report = {"sites": args.sites, "requests_per_run": args.requests, "endpoints": {}}
+        for path in ENDPOINTS:
+            load_test(url.hostname, url.port, path, 1, 5)  # warm caches
+            report["endpoints"][path] = {
+                f"c{level}": load_test(url.hostname, url.port, path, level, args.requests)
+                for level in levels
+            }
+
+    emit_report(report)
+
+
+if __name__ == "__main__":
+    main()
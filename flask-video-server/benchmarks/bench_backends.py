@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Backend parity benchmark: PyTorch vs exported/quantized runtimes on the same frames
+
+Reports per-frame latency, batched throughput and how closely each backend's
+detections and PPE counts agree with the PyTorch model.
+
+Usage: python benchmarks/bench_backends.py --weights yolo11n.pt [video.mp4]
+           [--backends pytorch,onnx,onnx-int8] [--frames 50] [--batch 8]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from synthetic import make_synthetic_video, emit_report
+from video_reader import SampledVideoReader
+from inference_backends import BACKENDS
+from ppe_detector import PPEDetector
+
+
+def sample_frames(video_path, count):
+    reader = SampledVideoReader(video_path, frame_stride=1)
+    stride = max(1, int(reader.estimated_frame_count()) // count)
+    frames = []
+    for _index, frame in SampledVideoReader(video_path, frame_stride=stride):
+        frames.append(frame)
+        if len(frames) >= count:
+            break
+    return frames
+
+
+def iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, x2 - x1) * max(0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def match_detections(reference, candidate, min_iou=0.5):
+    """Greedy same-label IoU matching; returns (matched, reference total, candidate total)"""
+    matched = 0
+    used = set()
+    for ref in sorted(reference, key=lambda d: -d["confidence"]):
+        best, best_iou = None, min_iou
+        for n, det in enumerate(candidate):
+            if n in used or det["label"] != ref["label"]:
+                continue
+            overlap = iou(ref["box"], det["box"])
+            if overlap >= best_iou:
+                best, best_iou = n, overlap
+        if best is not None:
+            used.add(best)
+            matched += 1
+    return matched, len(reference), len(candidate)
+
+
+def run_backend(backend, args, frames):
+    detector = PPEDetector(
+        weights_path=args.weights, backend=backend,
+        calibration_video=args.calibration or args.video, cache_results=False
+    )
+    if detector.model is None or detector.backend != backend:
+        return None
+
+    detector.detect_frame(frames[0])  # warm-up (graph optimization, allocations)
+
+    latencies = []
+    detections = []
+    for frame in frames:
+        start = time.perf_counter()
+        detections.append(detector.detect_frame(frame))
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    counts = []
+    for n in range(0, len(frames), args.batch):
+        counts.extend(detector.predict_counts(frames[n:n + args.batch]))
+    batched = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "report": {
+            "latency_ms_p50": round(float(np.percentile(latencies_ms, 50)), 2),
+            "latency_ms_p95": round(float(np.percentile(latencies_ms, 95)), 2),
+            "throughput_fps": round(len(frames) / batched, 2),
+            "batch_size": args.batch,
+        },
+        "detections": detections,
+        "counts": counts,
+    }
+
+
+def agreement(reference, candidate, min_iou):
+    matched = ref_total = cand_total = 0
+    for ref, cand in zip(reference["detections"], candidate["detections"]):
+        m, r, c = match_detections(ref, cand, min_iou)
+        matched, ref_total, cand_total = matched + m, ref_total + r, cand_total + c
+    recall = matched / ref_total if ref_total else 1.0
+    precision = matched / cand_total if cand_total else 1.0
+    same_counts = sum(a == b for a, b in zip(reference["counts"], candidate["counts"]))
+    return {
+        "box_recall": round(recall, 4),
+        "box_precision": round(precision, 4),
+        "box_f1": round(2 * recall * precision / (recall + precision), 4) if recall + precision else 0.0,
+        "frames_same_ppe_counts": round(same_counts / len(reference["counts"]), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("video", nargs="?", help="Frames to test on (default: synthetic 720p clip)")
+    parser.add_argument("--weights", default="yolo11n.pt")
+    parser.add_argument("--backends", default="pytorch,onnx,onnx-int8")
+    parser.add_argument("--calibration", help="Calibration video for INT8 (default: the test video)")
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--iou", type=float, default=0.5)
+    args = parser.parse_args()
+
+    args.video = args.video or make_synthetic_video("constructguard_bench_720p.mp4")
+    frames = sample_frames(args.video, args.frames)
+
+    backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+    if "pytorch" not in backends:
+        backends.insert(0, "pytorch")  # the parity reference
+
+    runs = {}
+    report = {"video": args.video, "weights": args.weights, "frames": len(frames), "backends": {}}
+    for backend in backends:
+        if backend not in BACKENDS:
+            report["backends"][backend] = {"error": "unknown backend"}
+            continue
+        runs[backend] = run_backend(backend, args, frames)
+        if runs[backend] is None:
+            report["backends"][backend] = {"error": "backend unavailable"}
+            continue
+        report["backends"][backend] = runs[backend]["report"]
+
+    reference = runs.get("pytorch")
+    for backend, run in runs.items():
+        if run is None or reference is None:
+            continue
+        entry = report["backends"][backend]
+        entry["speedup_vs_pytorch"] = round(
+            reference["report"]["latency_ms_p50"] / entry["latency_ms_p50"], 2
+        ) if entry["latency_ms_p50"] else None
+        if backend != "pytorch":
+            entry["agreement"] = agreement(reference, run, args.iou)
+
+    emit_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Counting benchmark: per-box Python loop vs vectorized class-id lookup table
+
+Usage: python benchmarks/bench_counting.py [--boxes 300] [--frames 2000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from synthetic import STUB_CLASS_NAMES, make_stub_result, emit_report
+import ppe_detector
+from ppe_detector import PPEDetector
+
+
+def legacy_count(detector, result):
+    """The original count_ppe_from_result loop, kept for comparison"""
+    counts = {"hat": 0, "mask": 0, "vest": 0}
+    conf = result.boxes.conf
+    cls = result.boxes.cls
+    for i in range(len(cls)):
+        if float(conf[i]) < detector.conf_threshold:
+            continue
+        class_id = int(cls[i])
+        label = detector.names.get(class_id, str(class_id))
+        label_normalized = detector.normalize_label(label)
+        for category, synonyms in detector.PPE_SYNONYMS.items():
+            if any(syn in label_normalized for syn in synonyms):
+                counts[category] += 1
+                break
+    return counts
+
+
+def make_detector():
+    """A PPEDetector wired to the stub label set without loading weights"""
+    ppe_detector.YOLO_AVAILABLE = True
+    ppe_detector.YOLO = lambda _weights: type("StubModel", (), {"names": STUB_CLASS_NAMES})()
+    return PPEDetector(cache_results=False, timeline=False, checkpoints=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--boxes", type=int, default=300)
+    parser.add_argument("--frames", type=int, default=2000)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # ppe_results/ goes here
+        try:
+            detector = make_detector()
+        finally:
+            os.chdir(cwd)
+    results = [make_stub_result(args.boxes, seed=n) for n in range(args.frames)]
+
+    start = time.perf_counter()
+    legacy = [legacy_count(detector, r) for r in results]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = [detector.count_ppe_from_result(r) for r in results]
+    vectorized_time = time.perf_counter() - start
+
+    report = {
+        "boxes_per_frame": args.boxes,
+        "frames": args.frames,
+        "same_counts": legacy == vectorized,
+        "loop_us_per_frame": round(legacy_time / args.frames * 1e6, 1),
+        "vectorized_us_per_frame": round(vectorized_time / args.frames * 1e6, 1),
+        "speedup": round(legacy_time / vectorized_time, 1) if vectorized_time else None,
+    }
+    emit_report(report)
+
+
+if __name__ == "__main__":
+    main()
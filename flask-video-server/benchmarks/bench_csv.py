@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+CSV logging benchmark: reopen-and-append per row vs the buffered FrameResultsWriter
+
+Usage: python benchmarks/bench_csv.py [--rows 20000]
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from synthetic import emit_report
+from results_writer import CSV_HEADER, FrameResultsWriter, frame_csv_row
+
+
+def frame_counts(rows):
+    return [(i * 30, i, {"hat": i % 3, "mask": i % 2, "vest": (i // 7) % 2}) for i in range(rows)]
+
+
+def legacy_log(path, frames):
+    """The original logging: open the CSV in append mode for every frame"""
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerow(CSV_HEADER)
+    for frame_index, time_s, counts in frames:
+        with open(path, "a", newline="") as f:
+            csv.writer(f).writerow(frame_csv_row(frame_index, time_s, counts))
+
+
+def buffered_log(path, frames, columnar_path=None):
+    with FrameResultsWriter(path, columnar_path=columnar_path) as sink:
+        for frame_index, time_s, counts in frames:
+            sink.write_frame(frame_index, time_s, counts)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    frames = frame_counts(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.csv")
+        buffered_path = os.path.join(tmp, "buffered.csv")
+        legacy_s = timed(legacy_log, legacy_path, frames)
+        buffered_s = timed(buffered_log, buffered_path, frames)
+        columnar_s = timed(buffered_log, os.path.join(tmp, "columnar.csv"), frames,
+                           os.path.join(tmp, "columnar.npz"))
+        with open(legacy_path) as a, open(buffered_path) as b:
+            identical = a.read() == b.read()
+
+    report = {
+        "rows": args.rows,
+        "identical_output": identical,
+        "legacy_us_per_row": round(legacy_s / args.rows * 1e6, 2),
+        "buffered_us_per_row": round(buffered_s / args.rows * 1e6, 2),
+        "buffered_with_npz_us_per_row": round(columnar_s / args.rows * 1e6, 2),
+        "speedup": round(legacy_s / buffered_s, 1) if buffered_s else None,
+    }
+    emit_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Decode benchmark: original decode-everything loop vs ffmpeg-side frame selection
+
+Usage: python benchmarks/bench_decode.py [video.mp4] [--stride 30]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from synthetic import make_synthetic_video, emit_report
+from video_reader import SampledVideoReader
+
+
+def time_reader(video_path, mode, stride):
+    reader = SampledVideoReader(video_path, frame_stride=stride, mode=mode)
+    start = time.perf_counter()
+    sampled = list(reader)
+    elapsed = time.perf_counter() - start
+    return sampled, elapsed
+
+
+def same_frames(reference, candidate):
+    """Same frame indices and identical pixels, frame for frame"""
+    return len(reference) == len(candidate) and all(
+        i == j and np.array_equal(a, b) for (i, a), (j, b) in zip(reference, candidate)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("video", nargs="?", help="Video to decode (default: synthetic 720p clip)")
+    parser.add_argument("--stride", type=int, default=30)
+    args = parser.parse_args()
+
+    video_path = args.video or make_synthetic_video("constructguard_bench_720p.mp4")
+
+    sequential, seq_time = time_reader(video_path, "sequential", args.stride)
+    selected, sel_time = time_reader(video_path, "select", args.stride)
+
+    report = {
+        "video": video_path,
+        "stride": args.stride,
+        "sampled_frames": len(selected),
+        "same_frames": same_frames(sequential, selected),
+        "sequential_s": round(seq_time, 3),
+        "select_s": round(sel_time, 3),
+        "speedup": round(seq_time / sel_time, 2) if sel_time else None,
+    }
+    emit_report(report)
+
+
+if __name__ == "__main__":
+    main()
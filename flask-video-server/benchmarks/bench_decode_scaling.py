@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Decode scaling benchmark: peak RSS and frames/sec of full-size RGB decoding vs scaled BGR decoding
+
+Each (resolution, decode mode) pair analyzes a synthetic clip in its own
+interpreter, so peak RSS is that run's alone. The stub model letterboxes
+every frame to 640x640 like ultralytics does, so the cost of resizing
+full-size frames at inference time is part of the "full" numbers.
+
+Usage: python benchmarks/bench_decode_scaling.py [--sizes 1080p,4k] [--seconds 6] [--stride 5]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic import emit_report, install_stub_model, make_synthetic_video
+
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080), "4k": (3840, 2160)}
+
+# decode mode -> PPEDetector decode_size
+MODES = {"full_rgb": None, "scaled_bgr": 640}
+
+
+def rss_mb():
+    """Current resident set size in MB (Linux), or None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20, 1)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def run_child(video_path, decode_size, stride):
+    """Analyze once in this process and print the measurements as JSON"""
+    install_stub_model(letterbox=True)
+    from ppe_detector import PPEDetector
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # ppe_results/ goes here
+        detector = PPEDetector(
+            frame_stride=stride, decode_size=decode_size, cache_results=False, checkpoints=False
+        )
+        before = rss_mb()
+        start = time.perf_counter()
+        results = detector.process_video_file(video_path, "run.csv", "run.json", "SITE_BENCH")
+        wall = time.perf_counter() - start
+
+    frames = results["pipeline_timing"]["stages"]["inference"]["items"]
+    print(json.dumps({
+        "sampled_frames": frames,
+        "wall_s": round(wall, 3),
+        "sampled_fps": round(frames / wall, 2),
+        "decode_ms_per_frame": results["pipeline_timing"]["stages"]["decode"]["ms_per_item"],
+        "inference_ms_per_frame": results["pipeline_timing"]["stages"]["inference"]["ms_per_item"],
+        "rss_before_mb": before,
+        # ru_maxrss is in KB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }))
+
+
+def measure(video_path, decode_size, stride):
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", video_path,
+         "--decode-size", str(decode_size or 0), "--stride", str(stride)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1080p,4k", help=f"Comma-separated, from {', '.join(RESOLUTIONS)}")
+    parser.add_argument("--seconds", type=float, default=6)
+    parser.add_argument("--stride", type=int, default=5)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--decode-size", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.decode_size or None, args.stride)
+        return
+
+    report = {"stride": args.stride, "seconds": args.seconds, "results": {}}
+    for size in args.sizes.split(","):
+        width, height = RESOLUTIONS[size]
+        video_path = make_synthetic_video(
+            f"constructguard_bench_{size}_{args.seconds:g}s.mp4",
+            seconds=args.seconds, width=width, height=height
+        )
+        runs = {mode: measure(video_path, decode_size, args.stride) for mode, decode_size in MODES.items()}
+        full, scaled = runs["full_rgb"], runs["scaled_bgr"]
+        runs["speedup"] = round(scaled["sampled_fps"] / full["sampled_fps"], 2)
+        runs["peak_rss_saved_mb"] = round(full["peak_rss_mb"] - scaled["peak_rss_mb"], 1)
+        report["results"][size] = runs
+    emit_report(report)
+
+
+if __name__ == "__main__":
+    main()
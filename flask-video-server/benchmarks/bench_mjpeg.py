@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+MJPEG benchmark: frames/sec and bandwidth per client as viewers are added
+
+Starts the app on a local port and attaches N concurrent viewers to one site
+feed, counting the multipart frames each receives.
+
+Usage: python benchmarks/bench_mjpeg.py [--clients 1,4,16] [--seconds 5] [--query "width=320"]
+"""
+
+import argparse
+import http.client
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+from synthetic import emit_report, make_synthetic_video, start_bench_server
+
+BOUNDARY = b"--frame\r\n"
+
+
+def watch(host, port, path, seconds, result):
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    conn.request("GET", path)
+    response = conn.getresponse()
+    frames = 0
+    received = 0
+    tail = b""
+    started = time.perf_counter()
+    try:
+        while time.perf_counter() - started < seconds:
+            chunk = response.read1(65536)
+            if not chunk:
+                break
+            received += len(chunk)
+            data = tail + chunk
+            frames += data.count(BOUNDARY)
+            tail = data[-(len(BOUNDARY) - 1):]
+    finally:
+        conn.close()
+    result.append((frames, received, time.perf_counter() - started))
+
+
+def run_level(base_url, path, clients, seconds):
+    url = urlparse(base_url)
+    results = []
+    threads = [
+        threading.Thread(target=watch, args=(url.hostname, url.port, path, seconds, results))
+        for _ in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    fps = [frames / elapsed for frames, _, elapsed in results]
+    total_bytes = sum(received for _, received, _ in results)
+    return {
+        "clients": clients,
+        "fps_per_client_mean": round(sum(fps) / len(fps), 2),
+        "fps_per_client_min": round(min(fps), 2),
+        "mbit_per_s_total": round(total_bytes * 8 / seconds / 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", default="1,4,16")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--query", default="", help="Stream parameters, e.g. width=320&quality=60")
+    args = parser.parse_args()
+
+    video = make_synthetic_video("constructguard_bench_480p.mp4", seconds=10, width=640, height=480)
+    path = "/video_feed/1" + (f"?{args.query}" if args.query else "")
+    with tempfile.TemporaryDirectory() as tmp:
+        base_url, app = start_bench_server(video, tmp)
+        source_fps = app.video_fps("videos/site1_construction.mp4")
+        run_level(base_url, path, 1, 1.0)  # start the producer (and fill the frame cache)
+
+        levels = [run_level(base_url, path, int(n), args.seconds) for n in args.clients.split(",")]
+
+        # Let the producer hit its idle timeout and release the capture;
+        # exiting with it mid-decode can abort inside OpenCV
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline and any(
+                feed["running"] for feed in app.stream_broadcasters.stats().values()):
+            time.sleep(0.2)
+
+    emit_report({"feed": path, "source_fps": source_fps, "seconds": args.seconds, "levels": levels})
+
+
+if __name__ == "__main__":
+    main()
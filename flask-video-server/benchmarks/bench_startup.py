@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: time for a fresh process to import the server and get the model ready
+
+Runs each trial in a new interpreter (so import caches don't carry over) and
+reports how long until the app can serve requests and until /ready turns 200.
+
+Usage: python benchmarks/bench_startup.py [--runs 3] [--timeout 300]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from synthetic import emit_report
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TRIAL = r"""
+import json, time
+started = time.perf_counter()
+import app
+initialized = time.perf_counter() - started
+client = app.app.test_client()
+health = client.get('/health').status_code
+while client.get('/ready').status_code != 200:
+    time.sleep(0.05)
+print("STARTUP " + json.dumps({
+    "app_initialized_s": round(initialized, 3),
+    "health_status": health,
+    "ready_s": round(time.perf_counter() - started, 3),
+    "server_timings": app.startup_timings()
+}))
+"""
+
+
+def run_trial(timeout):
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", TRIAL], cwd=SERVER_DIR,
+        capture_output=True, text=True, timeout=timeout
+    ).stdout
+    wall = time.perf_counter() - start
+    for line in output.splitlines():
+        if line.startswith("STARTUP "):
+            trial = json.loads(line[len("STARTUP "):])
+            trial["process_wall_s"] = round(wall, 3)
+            return trial
+    raise RuntimeError(f"Trial produced no timing line:\n{output[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    trials = [run_trial(args.timeout) for _ in range(args.runs)]
+    report = {
+        "runs": args.runs,
+        "app_initialized_s_median": statistics.median(t["app_initialized_s"] for t in trials),
+        "ready_s_median": statistics.median(t["ready_s"] for t in trials),
+        "trials": trials,
+    }
+    emit_report(report)
+
+
+if __name__ == "__main__":
+    main()
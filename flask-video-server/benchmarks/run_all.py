@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite runner: runs every offline benchmark and saves one JSON report
+
+Each benchmark runs in its own interpreter. Reports carry the git commit and
+environment so runs can be compared later with --compare.
+
+Usage: python benchmarks/run_all.py [--quick] [--only decode,csv] [--output bench.json]
+           [--compare previous.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from importlib import metadata
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# name -> (script, full args, --quick args)
+SUITE = {
+    "decode": ("bench_decode.py", [], []),
+    "decode_scaling": ("bench_decode_scaling.py", [], ["--sizes", "1080p", "--seconds", "2"]),
+    "counting": ("bench_counting.py", [], ["--frames", "300"]),
+    "csv": ("bench_csv.py", [], ["--rows", "2000"]),
+    "end_to_end": ("bench_end_to_end.py", [], ["--runs", "1"]),
+    "api": ("bench_api.py", [], ["--requests", "100", "--concurrency", "1,8"]),
+    "mjpeg": ("bench_mjpeg.py", [], ["--clients", "1,4", "--seconds", "2"]),
+}
+
+# Benchmarks that need real weights or are slow; run only when named in --only
+OPTIONAL = {
+    "startup": ("bench_startup.py", [], ["--runs", "1"]),
+    "backends": ("bench_backends.py", [], ["--frames", "10"]),
+}
+
+# Metric name fragments where a larger number is better
+HIGHER_IS_BETTER = ("fps", "per_s", "speedup")
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+            capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    versions = {}
+    for package in ("numpy", "opencv-python", "opencv-python-headless", "imageio", "Flask", "ultralytics"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            continue
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": versions,
+    }
+
+
+def run_benchmark(script, extra_args, timeout):
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = os.path.join(tmp, "report.json")
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, os.path.join(BENCH_DIR, script)] + extra_args,
+            cwd=os.path.dirname(BENCH_DIR),
+            env=dict(os.environ, BENCH_REPORT=report_path),
+            capture_output=True, text=True, timeout=timeout
+        )
+        elapsed = round(time.perf_counter() - start, 2)
+        if proc.returncode != 0 or not os.path.exists(report_path):
+            return {"error": (proc.stderr or proc.stdout)[-2000:], "bench_wall_s": elapsed}
+        with open(report_path) as f:
+            report = json.load(f)
+    report["bench_wall_s"] = elapsed
+    return report
+
+
+def flatten(data, prefix=""):
+    """{"a": {"b": 1}} -> {"a.b": 1} for numeric leaves"""
+    flat = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(flatten(value, f"{prefix}{key}."))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        flat[prefix[:-1]] = data
+    return flat
+
+
+def compare(previous, current):
+    """Print metrics that moved by more than 5% between two suite reports"""
+    before = flatten(previous.get("results", {}))
+    after = flatten(current.get("results", {}))
+    print(f"\nCompared with {previous.get('environment', {}).get('git_commit')} "
+          f"({previous.get('environment', {}).get('timestamp')}):")
+    changed = 0
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        if key.endswith("bench_wall_s") or not old:
+            continue
+        change = (new - old) / abs(old)
+        if abs(change) < 0.05:
+            continue
+        better = change > 0 if any(tag in key for tag in HIGHER_IS_BETTER) else change < 0
+        print(f"  {'+' if better else '-'} {key}: {old} -> {new} ({change:+.0%})")
+        changed += 1
+    if not changed:
+        print("  no metric moved by more than 5%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true", help="Smaller workloads for a fast check")
+    parser.add_argument("--only", help="Comma-separated benchmarks (default: the offline suite)")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="Earlier report to diff against")
+    parser.add_argument("--timeout", type=float, default=900)
+    args = parser.parse_args()
+
+    available = dict(SUITE, **OPTIONAL)
+    names = args.only.split(",") if args.only else list(SUITE)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}; choose from {', '.join(available)}")
+
+    suite = {"environment": environment(), "quick": args.quick, "results": {}}
+    for name in names:
+        script, full_args, quick_args = available[name]
+        print(f"Running {name}...", flush=True)
+        result = run_benchmark(script, quick_args if args.quick else full_args, args.timeout)
+        suite["results"][name] = result
+        print(f"  {'FAILED' if 'error' in result else 'done'} in {result['bench_wall_s']}s", flush=True)
+
+    with open(args.output, "w") as f:
+        json.dump(suite, f, indent=2)
+    print(f"Saved {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), suite)
+
+
+if __name__ == "__main__":
+    main()
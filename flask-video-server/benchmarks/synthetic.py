@@ -0,0 +1,155 @@
+"""
+Synthetic inputs for ConstructGuard-AI benchmarks
+Everything here is generated locally so benchmarks run fully offline
+"""
+
+import os
+import sys
+import json
+import tempfile
+import time
+
+import numpy as np
+
+# Benchmarks import the server modules directly
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+
+def make_synthetic_video(name, seconds=60, fps=30, width=1280, height=720):
+    """Write a moving-bars test clip to the temp dir and return its path (reused if present)"""
+    import imageio.v2 as imageio
+
+    path = os.path.join(tempfile.gettempdir(), name)
+    if os.path.exists(path):
+        return path
+
+    writer = imageio.get_writer(path, fps=fps, macro_block_size=16)
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    for i in range(int(seconds * fps)):
+        frame = background.copy()
+        x = (i * 8) % max(1, width - 64)
+        frame[:, x:x + 64] = (255, 200, 0)
+        frame[:16, :16] = i % 256
+        writer.append_data(frame)
+    writer.close()
+    return path
+
+
+# COCO-style label set with the PPE classes a site model adds on top
+STUB_CLASS_NAMES = {
+    0: "person", 1: "bicycle", 2: "car", 3: "motorcycle", 4: "truck",
+    5: "Hard Hat", 6: "Safety Vest", 7: "Face Mask", 8: "NO-Hardhat", 9: "ladder",
+    10: "excavator", 11: "hi-vis jacket", 12: "safety helmet", 13: "crane", 14: "cone",
+}
+
+
+class StubBoxes:
+    """Just enough of ultralytics' Boxes for PPE counting and drawing"""
+
+    def __init__(self, cls, conf, xyxy=None):
+        self.cls = np.asarray(cls, dtype=np.float32)
+        self.conf = np.asarray(conf, dtype=np.float32)
+        if xyxy is None:
+            xyxy = np.zeros((len(self.cls), 4), dtype=np.float32)
+        self.xyxy = np.asarray(xyxy, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.cls)
+
+
+class StubResult:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+def make_stub_result(num_boxes, seed=0, num_classes=len(STUB_CLASS_NAMES)):
+    """A deterministic fake YOLO result with `num_boxes` detections"""
+    rng = np.random.default_rng(seed)
+    cls = rng.integers(0, num_classes, size=num_boxes)
+    conf = rng.random(num_boxes)
+    corners = rng.integers(0, 600, size=(num_boxes, 2))
+    xyxy = np.hstack([corners, corners + rng.integers(20, 120, size=(num_boxes, 2))])
+    return StubResult(StubBoxes(cls, conf, xyxy))
+
+
+class StubModel:
+    """Deterministic stand-in for ultralytics.YOLO.
+
+    Results depend only on each frame's content (same frame, same boxes),
+    and `infer_ms` per image simulates model latency. With `letterbox`,
+    every frame also goes through the resize to a 640x640 float input that
+    ultralytics does before inference.
+    """
+
+    names = STUB_CLASS_NAMES
+
+    def __init__(self, weights="stub.pt", task=None, boxes=20, infer_ms=0.0, letterbox=False):
+        self.weights = weights
+        self.boxes = boxes
+        self.infer_ms = infer_ms
+        self.letterbox = letterbox
+
+    def predict(self, source, **kwargs):
+        frames = source if isinstance(source, list) else [source]
+        if self.letterbox:
+            from inference_backends import letterbox
+            for frame in frames:
+                letterbox(frame, kwargs.get("imgsz", 640))
+        if self.infer_ms:
+            time.sleep(self.infer_ms * len(frames) / 1000.0)
+        return [make_stub_result(self.boxes, seed=int(frame[:16, :16].sum())) for frame in frames]
+
+
+def install_stub_model(boxes=20, infer_ms=0.0, letterbox=False):
+    """Make PPEDetector load StubModel instead of real weights"""
+    import ppe_detector
+
+    ppe_detector.YOLO_AVAILABLE = True
+    ppe_detector.YOLO = lambda weights, task=None: StubModel(weights, task, boxes, infer_ms, letterbox)
+
+
+def emit_report(report):
+    """Print a benchmark's JSON report (and save it to $BENCH_REPORT if set)"""
+    text = json.dumps(report, indent=2)
+    print(text)
+    path = os.environ.get("BENCH_REPORT")
+    if path:
+        with open(path, "w") as f:
+            f.write(text)
+
+
+def start_bench_server(video_path, workdir, sites=4):
+    """Run the Flask app on a free localhost port inside `workdir`.
+
+    The working directory gets a copy of data/alerts.json (repeated up to
+    `sites` sites) and `video_path` as every site's video, and the app loads
+    the stub model. Returns (base_url, app_module).
+    """
+    import shutil
+    import threading
+    from werkzeug.serving import make_server
+
+    os.makedirs(os.path.join(workdir, "data"), exist_ok=True)
+    os.makedirs(os.path.join(workdir, "videos"), exist_ok=True)
+    with open(os.path.join(SERVER_DIR, "data", "alerts.json")) as f:
+        alerts = json.load(f)
+    template = alerts["sites"]
+    alerts["sites"] = [
+        dict(template[n % len(template)], id=f"SITE_{n + 1:03d}") for n in range(sites)
+    ]
+    with open(os.path.join(workdir, "data", "alerts.json"), "w") as f:
+        json.dump(alerts, f)
+    for n in range(1, 5):
+        shutil.copyfile(video_path, os.path.join(workdir, "videos", f"site{n}_construction.mp4"))
+
+    os.chdir(workdir)
+    install_stub_model()
+    import app
+
+    app.ppe_detector.ready.wait()
+    server = make_server("127.0.0.1", 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", app
@@ -0,0 +1,141 @@
+"""
+Checkpoint Module for ConstructGuard-AI
+Saves analysis progress next to the results so runs can resume or extend
+"""
+
+import os
+import json
+import hashlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: runs of one video aren't serialized across processes
+    fcntl = None
+
+from results_writer import atomic_write_json
+
+CHECKPOINT_VERSION = 1
+
+# Bytes hashed from the start of the video (at most; never past the end it
+# had when checkpointed) to tell "same recording, more frames appended"
+# apart from "a different file with the same name"
+PREFIX_BYTES = 1 << 20
+
+
+def prefix_digest(path, size=PREFIX_BYTES):
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(size), digest_size=20).hexdigest()
+
+
+def video_key(video_path):
+    return hashlib.blake2b(os.path.abspath(str(video_path)).encode(), digest_size=6).hexdigest()
+
+
+class AnalysisLock:
+    """Cross-process lock held while one site's video is being analyzed.
+
+    Inline runs and scheduler workers (other processes) may analyze the
+    same video at once; its checkpoint and timeline series are only
+    consistent if those runs take turns.
+    """
+
+    def __init__(self, results_dir, site_id, video_path):
+        lock_dir = os.path.join(str(results_dir), "locks")
+        os.makedirs(lock_dir, exist_ok=True)
+        self.path = os.path.join(lock_dir, f"analysis_{site_id}_{video_key(video_path)}.lock")
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "w")
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+
+
+class AnalysisCheckpoint:
+    """Progress of the latest analysis of one video for one site.
+
+    While a run is going, every log flush records the last analyzed frame,
+    how much of the `.partial` CSV is on disk and the accumulator totals.
+    A later run can then either resume an interrupted run (status
+    "running") or, in incremental mode, extend a finished one (status
+    "complete") with frames appended to the video since. In both cases it
+    seeks to `next_frame` and starts its log from the checkpointed bytes.
+
+    `params` must change whenever analysis output would (model, thresholds,
+    sampling); a checkpoint saved with other params is never reused.
+    """
+
+    def __init__(self, results_dir, site_id, video_path, params):
+        self.video_path = os.path.abspath(str(video_path))
+        self.path = os.path.join(str(results_dir), f"checkpoint_{site_id}_{video_key(video_path)}.json")
+        self.site_id = site_id
+        self.params_key = hashlib.blake2b(
+            json.dumps(params, sort_keys=True).encode(), digest_size=20
+        ).hexdigest()
+        self._prefixes = {}
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def video_prefix(self, size):
+        if size not in self._prefixes:
+            self._prefixes[size] = prefix_digest(self.video_path, size)
+        return self._prefixes[size]
+
+    def resume_point(self, incremental=False):
+        """The saved state to continue from, or None to analyze from frame 0"""
+        state = self.load()
+        if (not state or state.get("version") != CHECKPOINT_VERSION
+                or state.get("params") != self.params_key
+                or state.get("video_path") != self.video_path):
+            return None
+
+        if state["status"] == "running":
+            log_path = state["partial_log"]
+        elif state["status"] == "complete" and incremental:
+            log_path = state["csv_log"]
+        else:
+            return None
+
+        try:
+            if (os.path.getsize(self.video_path) < state["video_size"]
+                    or self.video_prefix(state["prefix_bytes"]) != state["video_prefix"]
+                    or os.path.getsize(log_path) < state["log_bytes"]):
+                return None
+        except (OSError, KeyError):
+            return None
+
+        state["log_path"] = log_path
+        return state
+
+    def save(self, status, stride, accumulator, partial_log, log_bytes, csv_log=None, results_json=None):
+        last = accumulator.last_frame_index
+        video_size = os.path.getsize(self.video_path)
+        prefix_bytes = min(video_size, PREFIX_BYTES)
+        atomic_write_json(self.path, {
+            "version": CHECKPOINT_VERSION,
+            "status": status,
+            "site_id": self.site_id,
+            "video_path": self.video_path,
+            "video_size": video_size,
+            "prefix_bytes": prefix_bytes,
+            "video_prefix": self.video_prefix(prefix_bytes),
+            "params": self.params_key,
+            "stride": stride,
+            "next_frame": 0 if last is None else last + stride,
+            "partial_log": partial_log,
+            "csv_log": csv_log,
+            "log_bytes": log_bytes,
+            "results_json": results_json,
+            "accumulator": accumulator.state()
+        })
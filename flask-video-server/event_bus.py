@@ -0,0 +1,158 @@
+"""
+Event Bus Module for ConstructGuard-AI
+Per-site analysis progress and alert events, served as Server-Sent Events
+"""
+
+import json
+import threading
+import time
+from collections import deque, namedtuple
+
+# Events kept per site for Last-Event-ID replay
+DEFAULT_BUFFER_SIZE = 500
+
+# Comment line sent to idle streams so proxies keep them open and
+# disconnected clients are noticed
+HEARTBEAT_S = 15.0
+
+# Reconnect delay suggested to EventSource clients
+RETRY_MS = 3000
+
+# Minimum gap between two progress updates for one analysis
+PROGRESS_INTERVAL_S = 0.5
+
+Event = namedtuple("Event", ["id", "name", "data"])
+
+
+def format_sse(event_id, name, data):
+    """One SSE message; `data` is already-serialized JSON"""
+    if event_id is None:
+        return f"event: {name}\ndata: {data}\n\n"
+    return f"id: {event_id}\nevent: {name}\ndata: {data}\n\n"
+
+
+class ProgressTracker:
+    """Rate-limits progress callbacks and adds elapsed time and an ETA.
+
+    update() returns None for calls that fall inside the interval, so
+    per-frame callbacks turn into a couple of events per second.
+    """
+
+    def __init__(self, min_interval=PROGRESS_INTERVAL_S):
+        self.min_interval = min_interval
+        self.started = time.perf_counter()
+        self._first = None  # (time, frames) at the first update, so model warm-up doesn't skew the rate
+        self._last = None
+
+    def update(self, frames_processed, total_frames):
+        now = time.perf_counter()
+        done = bool(total_frames) and frames_processed >= total_frames
+        if self._last is not None and now - self._last < self.min_interval and not done:
+            return None
+        self._last = now
+
+        if self._first is None:
+            self._first = (now, frames_processed)
+        first_at, first_frames = self._first
+
+        eta = None
+        if total_frames and frames_processed > first_frames:
+            rate = (frames_processed - first_frames) / (now - first_at)
+            eta = round(max(0, total_frames - frames_processed) / rate, 1)
+        elapsed = now - self.started
+        return {
+            "frames_processed": frames_processed,
+            "total_frames": total_frames,
+            "percent": round(min(100.0, 100.0 * frames_processed / total_frames), 1) if total_frames else 0.0,
+            "elapsed_s": round(elapsed, 1),
+            "eta_s": eta
+        }
+
+
+class _SiteBuffer:
+    def __init__(self, size, lock):
+        self.events = deque(maxlen=size)
+        self.dropped_through = 0  # id of the newest event pushed out of the buffer
+        # Shares the bus lock, so publishing wakes only this site's subscribers
+        self.changed = threading.Condition(lock)
+
+    def append(self, event):
+        if len(self.events) == self.events.maxlen:
+            self.dropped_through = self.events[0].id
+        self.events.append(event)
+
+
+class EventBus:
+    """In-memory publish/subscribe of analysis events, keyed by site.
+
+    Every event gets an id from one increasing sequence. Each site keeps
+    its last `buffer_size` events; subscribers read from that buffer by
+    id instead of owning queues, so a slow client costs nothing and a
+    reconnecting client resumes after its Last-Event-ID. A client that
+    fell further behind than the buffer (or reconnects after a server
+    restart) gets a `resync` event and should re-fetch the results.
+    """
+
+    def __init__(self, buffer_size=DEFAULT_BUFFER_SIZE, heartbeat_s=HEARTBEAT_S):
+        self.buffer_size = buffer_size
+        self.heartbeat_s = heartbeat_s
+        self._sites = {}
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def _buffer(self, site_id):
+        """The site's buffer, created if needed; call with the lock held"""
+        buffer = self._sites.get(site_id)
+        if buffer is None:
+            buffer = self._sites[site_id] = _SiteBuffer(self.buffer_size, self._lock)
+        return buffer
+
+    def publish(self, site_id, name, data):
+        payload = json.dumps(data, default=str)  # serialized once for every subscriber
+        with self._lock:
+            self._last_id += 1
+            buffer = self._buffer(site_id)
+            buffer.append(Event(self._last_id, name, payload))
+            buffer.changed.notify_all()
+            return self._last_id
+
+    @staticmethod
+    def _since(buffer, cursor):
+        """(events after cursor, whether some were missed); call with the lock held"""
+        if not buffer.events or buffer.events[-1].id <= cursor:
+            return [], cursor < buffer.dropped_through
+        return [event for event in buffer.events if event.id > cursor], cursor < buffer.dropped_through
+
+    def stream(self, site_id, last_event_id=None):
+        """Generator of SSE text for one subscriber; ends when the client goes away"""
+        with self._lock:
+            buffer = self._buffer(site_id)
+            if last_event_id is None:
+                cursor, missed = self._last_id, False
+            elif last_event_id > self._last_id:
+                # Ids from before a restart: replay whatever we have
+                cursor, missed = 0, True
+            else:
+                cursor, missed = last_event_id, False
+
+        yield f"retry: {RETRY_MS}\n\n"
+        while True:
+            with self._lock:
+                # Only a full heartbeat interval without events sends a keep-alive
+                buffer.changed.wait_for(
+                    lambda: any(self._since(buffer, cursor)), timeout=self.heartbeat_s
+                )
+                events, gap = self._since(buffer, cursor)
+
+            if missed or gap:
+                missed = False
+                yield format_sse(None, "resync", json.dumps({
+                    "site_id": site_id,
+                    "reason": "events were dropped; re-fetch /api/ppe/results"
+                }))
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                yield format_sse(event.id, event.name, event.data)
+            cursor = events[-1].id
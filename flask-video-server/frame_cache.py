@@ -0,0 +1,344 @@
+"""
+Frame Cache Module for ConstructGuard-AI
+Pre-encoded JPEG frames for looping video-file feeds
+"""
+
+import os
+import mmap
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from metrics import ENCODE_SECONDS
+
+# Encoded bytes kept in memory per clip before spilling to disk
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+# Clips larger than this (memory + spill) are not cached at all
+DEFAULT_MAX_CLIP_BYTES = 2 * 1024 * 1024 * 1024
+# All cached clips together; clips nobody is streaming are dropped
+# (least recently used first) to stay under it
+DEFAULT_MAX_TOTAL_BYTES = 4 * 1024 * 1024 * 1024
+
+JPEG_QUALITY = 95  # cv2.imencode's default
+
+# 4:2:0 JPEGs are coded in 16x16 MCUs
+MCU = 16
+
+# Clock overlay: text baseline and the MCU-aligned box it is drawn in
+CLOCK_ORIGIN = (10, 60)
+CLOCK_BOX_TOP = 48
+CLOCK_BOX_ROWS = 1
+CLOCK_FONT_SCALE = 0.5
+
+
+class EncodedFrameStore:
+    """Append-only list of encoded frames with a memory budget.
+
+    Frames beyond the budget are appended to a spill file that is
+    memory-mapped once the clip is complete, so large clips are served
+    from the page cache instead of the Python heap.
+    """
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET, spill_dir=None):
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.memory_bytes = 0
+        self.spill_bytes = 0
+        self._frames = []  # bytes, or (offset, length) into the spill file
+        self._spill = None
+        self._map = None
+
+    def __len__(self):
+        return len(self._frames)
+
+    @property
+    def total_bytes(self):
+        return self.memory_bytes + self.spill_bytes
+
+    def append(self, data):
+        if self.memory_bytes + len(data) <= self.memory_budget:
+            self._frames.append(data)
+            self.memory_bytes += len(data)
+            return
+
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(prefix="constructguard_frames_", dir=self.spill_dir)
+        self._spill.write(data)
+        self._frames.append((self.spill_bytes, len(data)))
+        self.spill_bytes += len(data)
+
+    def finalize(self):
+        """Stop appending; map the spill file for reads"""
+        if self._spill is not None and self._map is None:
+            self._spill.flush()
+            self._map = mmap.mmap(self._spill.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def get(self, index):
+        frame = self._frames[index]
+        if isinstance(frame, bytes):
+            return frame
+        offset, length = frame
+        return self._map[offset:offset + length]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        self._frames = []
+        self.memory_bytes = self.spill_bytes = 0
+
+
+def _jpeg_scan(jpeg):
+    """Split a baseline JPEG into (header up to scan data, restart segments)"""
+    pos = 2  # after SOI
+    while True:
+        if jpeg[pos] != 0xFF:
+            raise ValueError("Malformed JPEG marker")
+        marker = jpeg[pos + 1]
+        length = int.from_bytes(jpeg[pos + 2:pos + 4], "big")
+        pos += 2 + length
+        if marker == 0xDA:  # SOS: entropy-coded data follows
+            break
+
+    header = jpeg[:pos]
+    segments = []
+    start = pos
+    while True:
+        pos = jpeg.index(b"\xff", pos)
+        following = jpeg[pos + 1]
+        if 0xD0 <= following <= 0xD7:  # RSTn
+            segments.append(jpeg[start:pos])
+            pos += 2
+            start = pos
+        elif following == 0xD9:  # EOI
+            segments.append(jpeg[start:pos])
+            return header, segments
+        else:  # stuffed 0xFF00 (or fill bytes) inside scan data
+            pos += 1
+
+
+def _join_scan(header, segments):
+    parts = [header]
+    for n, segment in enumerate(segments):
+        if n:
+            parts.append(bytes((0xFF, 0xD0 + (n - 1) % 8)))
+        parts.append(segment)
+    parts.append(b"\xff\xd9")
+    return b"".join(parts)
+
+
+class JpegBandSplicer:
+    """Replaces one small MCU-aligned box of a JPEG without re-encoding it.
+
+    Frames are encoded with a restart marker every `box_mcus` MCUs, which
+    makes every box-wide strip of an MCU row an independently decodable
+    segment. A box encoded separately with the same quality, subsampling
+    and (standard) Huffman tables produces segments that can be swapped in
+    byte-for-byte.
+    """
+
+    def __init__(self, width, height, box_top, box_rows, box_width, quality=JPEG_QUALITY):
+        self.width = width
+        self.height = height
+        self.quality = quality
+        self.mcus_per_row = -(-width // MCU)
+
+        # Restart interval: smallest divisor of the row that covers the box
+        needed = -(-box_width // MCU)
+        self.box_mcus = next(
+            (d for d in range(needed, self.mcus_per_row + 1) if self.mcus_per_row % d == 0),
+            self.mcus_per_row
+        )
+        self.box_rect = (0, box_top, min(self.box_mcus * MCU, width), box_top + box_rows * MCU)
+        self.segments_per_row = self.mcus_per_row // self.box_mcus
+        self.first_row = box_top // MCU
+        self.box_rows = box_rows
+
+        self._params = [
+            cv2.IMWRITE_JPEG_QUALITY, quality,
+            cv2.IMWRITE_JPEG_RST_INTERVAL, self.box_mcus,
+        ]
+        if hasattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR"):
+            self._params += [cv2.IMWRITE_JPEG_SAMPLING_FACTOR, cv2.IMWRITE_JPEG_SAMPLING_FACTOR_420]
+
+        self.enabled = (box_top % MCU == 0 and self.box_rect[2] <= width
+                        and self.box_rect[3] <= height and self._self_test())
+
+    def encode(self, image):
+        ok, jpeg = cv2.imencode(".jpg", image, self._params)
+        return jpeg.tobytes() if ok else None
+
+    def box_segments(self, box_image):
+        """Scan segments for a box image (one per MCU row of the box)"""
+        _, segments = _jpeg_scan(self.encode(box_image))
+        return segments
+
+    def splice(self, jpeg, box_segments):
+        header, segments = _jpeg_scan(jpeg)
+        for row in range(self.box_rows):
+            segments[(self.first_row + row) * self.segments_per_row] = box_segments[row]
+        return _join_scan(header, segments)
+
+    def _self_test(self):
+        """Check this OpenCV/libjpeg build produces spliceable output"""
+        try:
+            frame = np.full((self.height, self.width, 3), 90, dtype=np.uint8)
+            x0, y0, x1, y1 = self.box_rect
+            box = np.full((y1 - y0, x1 - x0, 3), 200, dtype=np.uint8)
+            spliced = cv2.imdecode(
+                np.frombuffer(self.splice(self.encode(frame), self.box_segments(box)), np.uint8),
+                cv2.IMREAD_COLOR
+            )
+        except (ValueError, IndexError, cv2.error):
+            return False
+        if spliced is None or spliced.shape[:2] != (self.height, self.width):
+            return False
+        inside = spliced[y0 + 2:y1 - 2, x0 + 2:x1 - 2].mean()
+        outside = spliced[y1 + MCU:, :].mean()
+        return abs(inside - 200) < 4 and abs(outside - 90) < 4
+
+
+class LoopingClipCache:
+    """Every frame of one video file, encoded once with its static overlays.
+
+    The first playback pass encodes and stores frames; later loops only
+    serve stored bytes. The clock is the one overlay that changes with wall
+    time: it lives in a small dark box whose JPEG segments are rendered once
+    per second and spliced into each served frame.
+    """
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET, max_bytes=DEFAULT_MAX_CLIP_BYTES,
+                 key=None, max_total_bytes=DEFAULT_MAX_TOTAL_BYTES):
+        self.memory_budget = memory_budget
+        self.max_bytes = max_bytes
+        self.key = key
+        self.max_total_bytes = max_total_bytes
+        self.users = 0  # cameras holding this clip (see clip_cache_for)
+        self.store = EncodedFrameStore(memory_budget)
+        self.complete = False
+        self.failed = False
+        self.splicer = None
+        self._clock_text = None
+        self._clock_segments = None
+
+    def reset(self):
+        self.store.close()
+        self.store = EncodedFrameStore(self.memory_budget)
+        self.complete = False
+
+    def prepare(self, image):
+        """Blank the clock box on a frame about to be stored"""
+        if self.splicer is None:
+            h, w = image.shape[:2]
+            text_width = cv2.getTextSize("Time: 00:00:00", cv2.FONT_HERSHEY_SIMPLEX, CLOCK_FONT_SCALE, 1)[0][0]
+            self.splicer = JpegBandSplicer(w, h, CLOCK_BOX_TOP, CLOCK_BOX_ROWS, CLOCK_ORIGIN[0] + text_width + 6)
+        if self.splicer.enabled:
+            x0, y0, x1, y1 = self.splicer.box_rect
+            image[y0:y1, x0:x1] = 0
+        return image
+
+    def add(self, image):
+        """Encode and store the next frame in clip order; returns the JPEG"""
+        with ENCODE_SECONDS.time(kind="clip_cache"):
+            jpeg = self.splicer.encode(image) if self.splicer.enabled else cv2.imencode(".jpg", image)[1].tobytes()
+        if not self.failed:
+            if self.store.total_bytes + len(jpeg) > self.max_bytes:
+                print("Clip too large for the frame cache; streaming without it")
+                self.failed = True
+                self.store.close()
+            else:
+                self.store.append(jpeg)
+        return jpeg
+
+    def finish(self):
+        if not self.failed and len(self.store):
+            self.store.finalize()
+            self.complete = True
+            mb = self.store.total_bytes / (1024 * 1024)
+            print(f"Frame cache ready: {len(self.store)} frames, {mb:.1f} MB "
+                  f"({self.store.spill_bytes / (1024 * 1024):.1f} MB on disk)")
+            with _clips_lock:
+                _evict_idle(self.max_total_bytes)
+
+    def frame(self, index):
+        return self.store.get(index)
+
+    def with_clock(self, jpeg):
+        """Composite the current time into a stored frame"""
+        text = f'Time: {time.strftime("%H:%M:%S")}'
+        if not self.splicer.enabled:
+            # Fallback for builds that can't splice: decode, draw, re-encode
+            image = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+            cv2.putText(image, text, CLOCK_ORIGIN, cv2.FONT_HERSHEY_SIMPLEX, CLOCK_FONT_SCALE, (255, 255, 255), 1)
+            return cv2.imencode(".jpg", image)[1].tobytes()
+
+        if text != self._clock_text:
+            x0, y0, x1, y1 = self.splicer.box_rect
+            box = np.zeros((y1 - y0, x1 - x0, 3), dtype=np.uint8)
+            cv2.putText(box, text, (CLOCK_ORIGIN[0] - x0, CLOCK_ORIGIN[1] - y0),
+                        cv2.FONT_HERSHEY_SIMPLEX, CLOCK_FONT_SCALE, (255, 255, 255), 1)
+            self._clock_segments = self.splicer.box_segments(box)
+            self._clock_text = text
+        return self.splicer.splice(bytes(jpeg), self._clock_segments)
+
+
+_clips = OrderedDict()  # least recently released first
+_clips_lock = threading.Lock()
+
+
+def clip_cache_for(video_path, max_total_bytes=DEFAULT_MAX_TOTAL_BYTES):
+    """Shared cache for a video file, held until release_clip_cache().
+
+    A changed file gets a fresh cache; the old one is closed once its
+    last holder releases it.
+    """
+    stat = os.stat(video_path)
+    key = (os.path.abspath(video_path), stat.st_mtime_ns, stat.st_size)
+    with _clips_lock:
+        for stale in [k for k in _clips if k[0] == key[0] and k != key]:
+            cache = _clips.pop(stale)
+            if not cache.users:
+                cache.store.close()
+        cache = _clips.get(key)
+        if cache is None:
+            cache = _clips[key] = LoopingClipCache(key=key, max_total_bytes=max_total_bytes)
+        cache.users += 1
+        _evict_idle(cache.max_total_bytes)
+        return cache
+
+
+def release_clip_cache(cache):
+    """Give back a clip from clip_cache_for(); idle clips stay cached within the byte cap"""
+    with _clips_lock:
+        cache.users -= 1
+        if cache.users:
+            return
+        if _clips.get(cache.key) is not cache or not cache.complete:
+            # Superseded by a newer version of the file, or never finished
+            # (the next viewer would rebuild it from frame 0 anyway)
+            if _clips.get(cache.key) is cache:
+                del _clips[cache.key]
+            cache.store.close()
+            return
+        _clips.move_to_end(cache.key)
+        _evict_idle(cache.max_total_bytes)
+
+
+def _evict_idle(max_total_bytes):
+    """Close idle clips, least recently used first, until under the cap; call with the lock held"""
+    total = sum(cache.store.total_bytes for cache in _clips.values())
+    for key, cache in list(_clips.items()):
+        if total <= max_total_bytes:
+            return
+        if cache.users:
+            continue
+        total -= cache.store.total_bytes
+        del _clips[key]
+        cache.store.close()
@@ -0,0 +1,220 @@
+"""
+Inference Backends Module for ConstructGuard-AI
+Exports YOLO weights once to faster CPU runtimes and caches the artifacts
+"""
+
+import os
+import hashlib
+import importlib.util
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from result_cache import file_hash, video_fingerprint
+
+try:
+    import fcntl
+except ImportError:  # Windows: exports just aren't serialized across processes
+    fcntl = None
+
+# Runtimes are imported only when an export/quantization actually runs
+ONNXRUNTIME_AVAILABLE = importlib.util.find_spec("onnxruntime") is not None
+OPENVINO_AVAILABLE = importlib.util.find_spec("openvino") is not None
+
+# backend -> (ultralytics export format, needs INT8 calibration)
+BACKENDS = {
+    "pytorch": (None, False),
+    "onnx": ("onnx", False),
+    "onnx-int8": ("onnx", True),
+    "openvino": ("openvino", False),
+}
+
+DEFAULT_EXPORT_DIR = "model_exports"
+CALIBRATION_FRAMES = 64
+
+
+def backend_available(backend):
+    if backend == "pytorch":
+        return True
+    if backend.startswith("onnx"):
+        return ONNXRUNTIME_AVAILABLE
+    if backend == "openvino":
+        return OPENVINO_AVAILABLE
+    return False
+
+
+def find_calibration_video(videos_dir="videos"):
+    """First site video, used when no calibration video is configured"""
+    if not os.path.isdir(videos_dir):
+        return None
+    for name in sorted(os.listdir(videos_dir)):
+        if name.lower().endswith((".mp4", ".avi", ".mov", ".mkv")):
+            return os.path.join(videos_dir, name)
+    return None
+
+
+def letterbox(frame, imgsz=640):
+    """YOLO-style input tensor (1, 3, imgsz, imgsz) float32 for one frame"""
+    import cv2
+
+    height, width = frame.shape[:2]
+    scale = min(imgsz / height, imgsz / width)
+    resized = cv2.resize(frame, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_LINEAR)
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top = (imgsz - resized.shape[0]) // 2
+    left = (imgsz - resized.shape[1]) // 2
+    canvas[top:top + resized.shape[0], left:left + resized.shape[1]] = resized
+    # predict() treats arrays as BGR and flips them to RGB; do the same
+    tensor = canvas[..., ::-1].transpose(2, 0, 1)[None].astype(np.float32) / 255.0
+    return np.ascontiguousarray(tensor)
+
+
+def sample_calibration_frames(video_path, count=CALIBRATION_FRAMES):
+    """Evenly spaced frames from a video for INT8 calibration"""
+    from video_reader import SampledVideoReader
+
+    reader = SampledVideoReader(video_path, frame_stride=1)
+    total = max(1, int(reader.estimated_frame_count()))
+    # BGR like the frames predict() gets (letterbox() flips them to RGB)
+    reader = SampledVideoReader(video_path, frame_stride=max(1, total // count), pix_fmt="bgr24")
+    frames = []
+    for _index, frame in reader:
+        frames.append(frame)
+        if len(frames) >= count:
+            break
+    return frames
+
+
+def quantize_onnx_int8(fp32_path, int8_path, frames, imgsz=640):
+    """Static INT8 quantization calibrated on `frames`.
+
+    Only Conv/MatMul weights and activations are quantized; the box decode
+    and class-score tail of the graph stays in float, where YOLO loses the
+    most accuracy under INT8.
+    """
+    if not ONNXRUNTIME_AVAILABLE:
+        raise RuntimeError("onnxruntime is not installed")
+    if not frames:
+        raise ValueError("INT8 quantization needs calibration frames")
+
+    import onnx
+    import onnxruntime
+    from onnxruntime.quantization import (
+        CalibrationDataReader, CalibrationMethod, QuantFormat, QuantType, quantize_static
+    )
+
+    class FrameCalibrationReader(CalibrationDataReader):
+        """Feeds letterboxed sample frames to onnxruntime's calibrator"""
+
+        def __init__(self, input_name):
+            self._inputs = iter([{input_name: letterbox(frame, imgsz)} for frame in frames])
+
+        def get_next(self):
+            return next(self._inputs, None)
+
+    session = onnxruntime.InferenceSession(str(fp32_path), providers=["CPUExecutionProvider"])
+    input_name = session.get_inputs()[0].name
+    del session
+
+    quantize_static(
+        str(fp32_path), str(int8_path),
+        FrameCalibrationReader(input_name),
+        quant_format=QuantFormat.QDQ,
+        op_types_to_quantize=["Conv", "MatMul"],
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        calibrate_method=CalibrationMethod.MinMax
+    )
+
+    # ultralytics reads class names/stride from the model metadata
+    source = onnx.load(str(fp32_path), load_external_data=False)
+    quantized = onnx.load(str(int8_path))
+    present = {prop.key for prop in quantized.metadata_props}
+    missing = [prop for prop in source.metadata_props if prop.key not in present]
+    if missing:
+        quantized.metadata_props.extend(missing)
+        onnx.save(quantized, str(int8_path))
+
+
+class _ExportLock:
+    """Cross-process lock so concurrent workers export a model only once"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "w")
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+
+
+def export_path(weights_path, backend, imgsz=640, export_dir=DEFAULT_EXPORT_DIR, calibration_video=None):
+    """Where the cached artifact for (weights content, backend, imgsz) lives"""
+    stem = Path(weights_path).stem
+    key = hashlib.blake2b(file_hash(weights_path).encode(), digest_size=6).hexdigest()
+    name = f"{backend}-{imgsz}"
+    if BACKENDS[backend][1] and calibration_video:
+        name += "-" + video_fingerprint(calibration_video)[:8]
+    suffix = "_openvino_model" if backend == "openvino" else ".onnx"
+    return Path(export_dir) / f"{stem}-{key}" / (name + suffix)
+
+
+def resolve_model_path(weights_path, backend="pytorch", imgsz=640,
+                       export_dir=DEFAULT_EXPORT_DIR, calibration_video=None):
+    """Path to load with YOLO() for `backend`, exporting on first use.
+
+    Exports are keyed by the weights' content hash, so replacing the .pt
+    file triggers a fresh export and old artifacts are never reused.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}; use one of {', '.join(BACKENDS)}")
+    export_format, needs_calibration = BACKENDS[backend]
+    if export_format is None:
+        return weights_path
+    if not backend_available(backend):
+        raise RuntimeError(f"{backend} backend is not installed")
+
+    target = export_path(weights_path, backend, imgsz, export_dir, calibration_video)
+    if target.exists():
+        return str(target)
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with _ExportLock(str(target) + ".lock"):
+        if target.exists():  # another worker finished the export meanwhile
+            return str(target)
+
+        if needs_calibration:
+            if not calibration_video:
+                raise ValueError(f"{backend} needs a calibration video")
+            fp32_path = resolve_model_path(weights_path, "onnx", imgsz, export_dir)
+            print(f"Quantizing {fp32_path} to INT8 on frames from {calibration_video}...")
+            tmp_path = target.with_suffix(".partial.onnx")
+            quantize_onnx_int8(fp32_path, tmp_path, sample_calibration_frames(calibration_video), imgsz)
+            os.replace(tmp_path, target)
+            return str(target)
+
+        from ultralytics import YOLO
+
+        print(f"Exporting {weights_path} to {export_format} (one-time)...")
+        with tempfile.TemporaryDirectory(dir=target.parent) as workdir:
+            # Export from a private copy so the artifact lands in workdir
+            local_weights = Path(workdir) / Path(weights_path).name
+            if os.path.exists(weights_path):
+                shutil.copy2(weights_path, local_weights)
+            else:
+                local_weights = weights_path  # ultralytics downloads known names
+            exported = YOLO(str(local_weights)).export(format=export_format, imgsz=imgsz, dynamic=True)
+            os.replace(exported, target)
+
+    print(f"Cached {backend} model at {target}")
+    return str(target)
@@ -0,0 +1,325 @@
+"""
+Job Scheduler Module for ConstructGuard-AI
+Runs background PPE analysis on a bounded, prioritized process pool
+"""
+
+import os
+import heapq
+import itertools
+import threading
+import uuid
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from event_bus import ProgressTracker
+from metrics import REGISTRY
+
+# Worker processes; each one loads its own model instance
+DEFAULT_MAX_WORKERS = int(os.environ.get("PPE_JOB_WORKERS", "2"))
+
+# Lower value runs first
+PRIORITIES = {"high": 0, "normal": 5, "low": 10}
+
+# Finished jobs kept around for /api/ppe/jobs
+DEFAULT_HISTORY_LIMIT = 200
+
+# Per-process state inside pool workers
+_worker_detector = None
+_worker_events = None
+
+
+def _init_worker(events, detector_kwargs):
+    """Pool initializer: one PPEDetector (and model) per worker process"""
+    global _worker_detector, _worker_events
+    from ppe_detector import PPEDetector
+    _worker_events = events
+    _worker_detector = PPEDetector(**detector_kwargs)
+
+
+def _run_analysis_job(job_id, video_path, site_id, incremental=False):
+    tracker = ProgressTracker()
+
+    def report_progress(frames_processed, total_frames):
+        update = tracker.update(frames_processed, total_frames)
+        if update is not None:
+            _worker_events.put((job_id, "progress", update))
+
+    def report_alert(alert):
+        _worker_events.put((job_id, "alert", alert))
+
+    _worker_events.put((job_id, "started", {"pid": os.getpid()}))
+    try:
+        # A job that can't analyze its video fails; it never reports the
+        # simulated demo numbers analyze_video falls back to
+        results = _worker_detector.analyze_video(
+            video_path, site_id, progress_callback=report_progress, alert_callback=report_alert,
+            incremental=incremental, fallback=False
+        )
+        if results.get("status") == "simulated_demo_data":
+            if not os.path.exists(video_path):
+                raise FileNotFoundError(f"Video file not found: {video_path}")
+            raise RuntimeError("Video analysis is unavailable (imageio or the YOLO model is missing)")
+        return results
+    finally:
+        # Hand this job's counters/histograms to the server's /metrics
+        _worker_events.put((job_id, "metrics", REGISTRY.drain()))
+
+
+class AnalysisJob:
+    """One queued/running/finished analysis request"""
+
+    def __init__(self, video_path, site_id, priority, incremental=False):
+        self.id = uuid.uuid4().hex
+        self.video_path = str(video_path)
+        self.site_id = site_id
+        self.priority = priority
+        self.incremental = incremental
+        self.status = "queued"
+        self.submitted_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self.progress = {"frames_processed": 0, "total_frames": None, "percent": 0.0, "eta_s": None}
+        self.result = None
+        self.error = None
+        self.worker_pid = None
+
+    @staticmethod
+    def coalescing_key(video_path, site_id, incremental=False):
+        """Requests with the same key would produce the same run"""
+        return (site_id, os.path.abspath(video_path), bool(incremental))
+
+    @property
+    def key(self):
+        return self.coalescing_key(self.video_path, self.site_id, self.incremental)
+
+    @property
+    def finished(self):
+        return self.status in ("completed", "failed")
+
+    def to_dict(self, include_result=False):
+        data = {
+            "job_id": self.id,
+            "site_id": self.site_id,
+            "video_path": self.video_path,
+            "priority": self.priority,
+            "incremental": self.incremental,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": dict(self.progress),
+            "error": self.error
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+class JobScheduler:
+    """Priority queue of analysis jobs in front of a fixed-size process pool.
+
+    Jobs are only handed to the pool when a worker is free, so the priority
+    order holds for everything still waiting. Workers report progress back
+    over a multiprocessing queue that a listener thread applies to the job
+    records.
+
+    listener(job, event, payload), if given, is called (outside the lock)
+    for "started", "progress", "alert", "completed" and "failed".
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, detector_kwargs=None,
+                 history_limit=DEFAULT_HISTORY_LIMIT, listener=None):
+        self.max_workers = max(1, int(max_workers))
+        self.detector_kwargs = detector_kwargs or {}
+        self.history_limit = history_limit
+        self.listener = listener
+
+        # spawn keeps torch and server threads out of the workers
+        self._ctx = multiprocessing.get_context("spawn")
+        self._events = None
+        self._executor = None
+        self._heap = []
+        self._order = itertools.count()
+        self._jobs = OrderedDict()
+        self._active = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._slots = threading.Semaphore(self.max_workers)
+        self._started = False
+        self._closed = False
+
+    def submit(self, video_path, site_id, priority="normal", incremental=False):
+        """Queue a video for analysis, joining an in-flight job for the same
+        site, video and mode instead of starting a second one. Incremental
+        jobs only analyze frames added since the last finished run, so they
+        never join a full one (or the other way around).
+
+        Returns (job, created) where created is False for a coalesced request.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority} (use one of {list(PRIORITIES)})")
+
+        key = AnalysisJob.coalescing_key(video_path, site_id, incremental)
+        with self._wakeup:
+            if self._closed:
+                raise RuntimeError("Job scheduler has been shut down")
+
+            existing = self._active.get(key)
+            if existing is not None:
+                return existing, False
+
+            job = AnalysisJob(video_path, site_id, priority, incremental=incremental)
+            self._jobs[job.id] = job
+            self._active[key] = job
+            heapq.heappush(self._heap, (PRIORITIES[priority], next(self._order), job))
+            self._prune_history()
+            self._wakeup.notify()
+
+        self._ensure_started()
+        return job, True
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self, status=None):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        if status:
+            jobs = [job for job in jobs if job.status == status]
+        return jobs
+
+    def counts(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in ("queued", "running", "completed", "failed")}
+
+    def shutdown(self, wait=False):
+        with self._wakeup:
+            self._closed = True
+            self._wakeup.notify_all()
+        if self._executor:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+        if self._events is not None:
+            self._events.put(None)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            self._events = self._ctx.Queue()
+
+        threading.Thread(target=self._dispatch_loop, daemon=True).start()
+        threading.Thread(target=self._event_loop, daemon=True).start()
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=self._ctx,
+                initializer=_init_worker,
+                initargs=(self._events, self.detector_kwargs)
+            )
+        return self._executor
+
+    def _dispatch_loop(self):
+        while True:
+            self._slots.acquire()
+            with self._wakeup:
+                while not self._heap and not self._closed:
+                    self._wakeup.wait()
+                if self._closed:
+                    return
+                _, _, job = heapq.heappop(self._heap)
+                job.status = "running"
+                job.started_at = datetime.now().isoformat()
+
+            try:
+                executor = self._get_executor()
+                future = executor.submit(
+                    _run_analysis_job, job.id, job.video_path, job.site_id, job.incremental
+                )
+            except Exception as e:
+                self._finish(job, error=e)
+                continue
+            future.add_done_callback(lambda f, job=job, executor=executor: self._on_done(job, f, executor))
+
+    def _on_done(self, job, future, executor):
+        try:
+            self._finish(job, result=future.result())
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                # A worker died; reap the broken pool (unless an earlier
+                # failed job already replaced it) and start a fresh one
+                # for the next job
+                if self._executor is executor:
+                    self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            self._finish(job, error=e)
+
+    def _finish(self, job, result=None, error=None):
+        with self._lock:
+            self._active.pop(job.key, None)
+            job.finished_at = datetime.now().isoformat()
+            if error is None:
+                job.status = "completed"
+                job.result = result
+                job.progress["percent"] = 100.0
+            else:
+                job.status = "failed"
+                job.error = str(error) or error.__class__.__name__
+        self._slots.release()
+        print(f"Analysis job {job.id[:8]} for {job.site_id} {job.status}")
+        if error is None:
+            self._notify(job, "completed", {
+                "total_violations": (result or {}).get("total_violations"),
+                "compliance_score": (result or {}).get("compliance_score"),
+                "cache_hit": bool((result or {}).get("cache_hit"))
+            })
+        else:
+            self._notify(job, "failed", {"error": job.error})
+
+    def _notify(self, job, event, payload):
+        if self.listener is None:
+            return
+        try:
+            self.listener(job, event, payload)
+        except Exception as e:
+            print(f"Job event listener failed: {e}")
+
+    def _event_loop(self):
+        while True:
+            message = self._events.get()
+            if message is None:
+                return
+            job_id, event, payload = message
+            if event == "metrics":
+                REGISTRY.merge(payload)
+                continue
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                # Alerts raised just before the job returned may arrive after
+                # it finished; they are still real, stale progress is not
+                if job.finished and event != "alert":
+                    continue
+                if event == "started":
+                    job.worker_pid = payload["pid"]
+                elif event == "progress":
+                    job.progress = {
+                        "frames_processed": payload["frames_processed"],
+                        "total_frames": payload["total_frames"],
+                        "percent": payload["percent"],
+                        "eta_s": payload["eta_s"]
+                    }
+            self._notify(job, event, payload)
+
+    def _prune_history(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history_limit)]:
+            del self._jobs[job_id]
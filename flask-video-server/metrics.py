@@ -0,0 +1,298 @@
+"""
+Metrics Module for ConstructGuard-AI
+Low-overhead counters, gauges and histograms exposed in Prometheus text format
+"""
+
+import bisect
+import threading
+import time
+
+# Latency buckets (seconds) for per-frame work: decode, inference, JPEG encode
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Buckets for HTTP handlers
+REQUEST_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0, 60.0)
+
+
+def _label_key(labelnames, labels):
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _format_labels(labelnames, key, extra=None):
+    pairs = list(zip(labelnames, key))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic count, optionally split by labels"""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name + "_total", _format_labels(self.labelnames, key), value
+
+    def drain(self):
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values):
+        with self._lock:
+            for key, value in values.items():
+                key = tuple(key)
+                self._values[key] = self._values.get(key, 0) + value
+
+
+class Gauge:
+    """Current value; either set directly or read from a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._callback = None
+        self._lock = threading.Lock()
+
+    def set(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_callback(self, callback):
+        """callback() -> number, or {label tuple: number} for labelled gauges"""
+        self._callback = callback
+
+    def samples(self):
+        if self._callback is not None:
+            try:
+                values = self._callback()
+            except Exception:
+                return
+            if not isinstance(values, dict):
+                values = {(): values}
+        else:
+            with self._lock:
+                values = dict(self._values)
+        for key, value in sorted(values.items()):
+            key = key if isinstance(key, tuple) else (key,)
+            yield self.name, _format_labels(self.labelnames, tuple(str(k) for k in key)), value
+
+
+class Histogram:
+    """Bucketed observations (cumulative buckets are built only when scraped)"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # key -> [per-bucket counts (+Inf last), sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, **labels):
+        """Context manager observing the duration of its block"""
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        for key, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                yield (self.name + "_bucket",
+                       _format_labels(self.labelnames, key, ("le", _format_value(bound))),
+                       cumulative)
+            yield self.name + "_sum", _format_labels(self.labelnames, key), total
+            yield self.name + "_count", _format_labels(self.labelnames, key), count
+
+    def drain(self):
+        with self._lock:
+            series, self._series = self._series, {}
+        return series
+
+    def merge(self, series):
+        with self._lock:
+            for key, (counts, total, count) in series.items():
+                key = tuple(key)
+                mine = self._series.get(key)
+                if mine is None:
+                    mine = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                for index, bucket_count in enumerate(counts):
+                    mine[0][index] += bucket_count
+                mine[1] += total
+                mine[2] += count
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def drain(self):
+        """Take (and reset) counter/histogram state, e.g. in a worker process"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: metric.drain()
+            for metric in metrics if hasattr(metric, "drain")
+        }
+
+    def merge(self, drained):
+        """Add state drained from another process's registry"""
+        with self._lock:
+            metrics = dict(self._metrics)
+        for name, state in drained.items():
+            if name in metrics and state:
+                metrics[name].merge(state)
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Analysis
+DECODE_SECONDS = REGISTRY.register(Histogram(
+    "ppe_decode_seconds", "Time to decode one sampled video frame"))
+INFERENCE_SECONDS = REGISTRY.register(Histogram(
+    "ppe_inference_seconds", "Model predict() call latency", ["mode"]))
+INFERENCE_FRAMES = REGISTRY.register(Counter(
+    "ppe_inference_frames", "Frames passed to the model", ["mode"]))
+FRAMES_ANALYZED = REGISTRY.register(Counter(
+    "ppe_frames_analyzed", "Sampled frames analyzed (including motion-gated ones)"))
+FRAMES_SKIPPED = REGISTRY.register(Counter(
+    "ppe_frames_skipped", "Sampled frames whose inference was skipped by the motion gate"))
+ALERTS = REGISTRY.register(Counter(
+    "ppe_alerts", "PPE alerts generated", ["type"]))
+ANALYSES = REGISTRY.register(Counter(
+    "ppe_analyses", "Video analyses finished", ["outcome"]))
+PIPELINE_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "ppe_pipeline_queue_depth", "Items waiting between analysis pipeline stages", ["queue"]))
+
+# Streaming
+ENCODE_SECONDS = REGISTRY.register(Histogram(
+    "stream_encode_seconds", "JPEG encode latency for stream frames", ["kind"]))
+STREAM_FRAMES = REGISTRY.register(Counter(
+    "stream_frames", "Frames published by stream producers", ["source"]))
+STREAM_SUBSCRIBERS = REGISTRY.register(Gauge(
+    "stream_subscribers", "Connected MJPEG viewers", ["feed"]))
+
+# Jobs and server
+JOBS = REGISTRY.register(Gauge(
+    "analysis_jobs", "Background analysis jobs by status", ["status"]))
+THREADS = REGISTRY.register(Gauge(
+    "process_threads", "Live threads in the server process"))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Time to produce an HTTP response (streams: until headers)",
+    ["endpoint", "method", "status"], buckets=REQUEST_BUCKETS))
+
+THREADS.set_callback(threading.active_count)
+
+_active_pipelines = set()
+_pipelines_lock = threading.Lock()
+
+
+def track_pipeline(pipeline, active):
+    """Add/remove a running pipeline from the queue-depth gauge"""
+    with _pipelines_lock:
+        if active:
+            _active_pipelines.add(pipeline)
+        else:
+            _active_pipelines.discard(pipeline)
+
+
+def _queue_depths():
+    with _pipelines_lock:
+        pipelines = list(_active_pipelines)
+    return {
+        ("frames",): sum(p.frames.qsize() for p in pipelines),
+        ("counts",): sum(p.counts.qsize() for p in pipelines),
+    }
+
+
+PIPELINE_QUEUE_DEPTH.set_callback(_queue_depths)
@@ -0,0 +1,90 @@
+"""
+Motion Gate Module for ConstructGuard-AI
+Skips inference on sampled frames that look the same as the last analyzed one
+"""
+
+import time
+
+import numpy as np
+
+from metrics import FRAMES_SKIPPED
+
+# RGB -> luma weights (x256) for the downscaled comparison image
+_LUMA = np.array([77, 150, 29], dtype=np.uint16)
+_LUMA_BGR = _LUMA[::-1].copy()
+
+
+class MotionGate:
+    """Cheap scene-change test run before the model.
+
+    Each frame is reduced to a ~`size`-pixel-wide grayscale thumbnail by
+    strided slicing (no full-frame resize) and compared with the thumbnail
+    of the last frame that was actually analyzed. If fewer than `threshold`
+    of the pixels moved by more than `pixel_delta` levels, inference is
+    skipped and the previous counts are carried forward, but never more
+    than `max_skip` times in a row.
+
+    Lower `threshold`/`pixel_delta` or `max_skip` favour recall; higher
+    values favour throughput. Set `bgr` when frames come in BGR order.
+    """
+
+    def __init__(self, threshold=0.02, pixel_delta=25, max_skip=10, size=64, bgr=False):
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.max_skip = max_skip
+        self.size = size
+        self.luma = _LUMA_BGR if bgr else _LUMA
+        self.reference = None
+        self.run_length = 0
+        self.frames_checked = 0
+        self.frames_skipped = 0
+        self.check_s = 0.0
+        self.inference_s = 0.0
+        self.frames_inferred = 0
+
+    def thumbnail(self, frame):
+        height, width = frame.shape[:2]
+        step = max(1, min(height, width) // self.size)
+        small = frame[::step, ::step]
+        if small.ndim == 3:
+            return (small[..., :3].astype(np.uint16) @ self.luma >> 8).astype(np.int16)
+        return small.astype(np.int16)
+
+    def should_infer(self, frame):
+        """True if the frame needs the model; False to reuse the last counts"""
+        started = time.perf_counter()
+        thumb = self.thumbnail(frame)
+        self.frames_checked += 1
+
+        changed = True
+        if self.reference is not None and self.reference.shape == thumb.shape and self.run_length < self.max_skip:
+            moved = np.count_nonzero(np.abs(thumb - self.reference) > self.pixel_delta)
+            changed = moved >= self.threshold * thumb.size
+
+        if changed:
+            self.reference = thumb
+            self.run_length = 0
+        else:
+            self.run_length += 1
+            self.frames_skipped += 1
+            FRAMES_SKIPPED.inc()
+        self.check_s += time.perf_counter() - started
+        return changed
+
+    def record_inference(self, seconds, frames):
+        self.inference_s += seconds
+        self.frames_inferred += frames
+
+    def summary(self):
+        """Skip ratio and estimated time saved, for the results JSON"""
+        per_frame = self.inference_s / self.frames_inferred if self.frames_inferred else 0.0
+        return {
+            "threshold": self.threshold,
+            "pixel_delta": self.pixel_delta,
+            "max_skip": self.max_skip,
+            "frames_checked": self.frames_checked,
+            "frames_skipped": self.frames_skipped,
+            "skip_ratio": round(self.frames_skipped / self.frames_checked, 4) if self.frames_checked else 0.0,
+            "gate_time_s": round(self.check_s, 3),
+            "est_time_saved_s": round(self.frames_skipped * per_frame - self.check_s, 3)
+        }
@@ -4,9 +4,9 @@ Analyzes video files for PPE compliance using YOLO
 """
 
 import os
-import csv
 import re
 import json
+import importlib.util
 import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -14,12 +14,11 @@ from PIL import Image, ImageDraw, ImageFont
 import threading
 import time
 
-# Try importing YOLO and imageio, with fallbacks
-try:
-    from ultralytics import YOLO
-    YOLO_AVAILABLE = True
-except ImportError:
-    YOLO_AVAILABLE = False
+# ultralytics (and torch behind it) takes seconds to import, so only check
+# it is installed here and import it when a model is actually loaded
+YOLO = None
+YOLO_AVAILABLE = importlib.util.find_spec("ultralytics") is not None
+if not YOLO_AVAILABLE:
     print("Warning: ultralytics not installed. PPE detection will be simulated.")
 
 try:
@@ -29,13 +28,101 @@ except ImportError:
     IMAGEIO_AVAILABLE = False
     print("Warning: imageio not installed. Using fallback video processing.")
 
+from video_reader import SampledVideoReader
+from results_writer import FrameResultsWriter, atomic_write_json
+from analysis_pipeline import AnalysisAccumulator, AnalysisPipeline
+from result_cache import ResultCache, file_hash
+from results_catalog import ResultsCatalog
+from checkpoint import AnalysisCheckpoint, AnalysisLock
+from timeline_store import TimelineStore
+from motion_gate import MotionGate
+from sharded_analysis import ShardPool, analyze_sharded, plan_shards
+from inference_backends import BACKENDS, find_calibration_video, resolve_model_path
+from metrics import ANALYSES, INFERENCE_FRAMES, INFERENCE_SECONDS
+
+# Batched inference limits when batch_size is left to auto-sizing
+DEFAULT_BATCH_SIZE = 4
+MAX_AUTO_BATCH_SIZE = 16
+
+# Order of the PPE categories in the class-id lookup table
+PPE_CATEGORIES = ("hat", "mask", "vest")
+
+def to_numpy(values):
+    """Detection tensors (torch or numpy) as a NumPy array"""
+    if hasattr(values, "cpu"):
+        values = values.cpu().numpy()
+    return np.asarray(values)
+
+def available_memory_bytes():
+    """Free physical memory in bytes, or None when it can't be determined"""
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
 class PPEDetector:
-    def __init__(self, weights_path="yolo11n.pt", conf_threshold=0.25):
+    def __init__(self, weights_path="yolo11n.pt", conf_threshold=0.25,
+                 frame_stride=30, target_fps=None, sampling="select", batch_size=None,
+                 columnar_output=False, queue_size=8, cache_results=True,
+                 motion_gating=False, motion_threshold=0.02, motion_pixel_delta=25,
+                 motion_max_skip=10, backend="pytorch", calibration_video=None,
+                 defer_load=False, checkpoints=True, incremental=False, shards=1, decode_size=640,
+                 timeline=True):
         self.weights_path = weights_path
         self.conf_threshold = conf_threshold
         self.model = None
         self.names = {}
         
+        # Inference runtime: "pytorch", or an exported/quantized model
+        # (see inference_backends.BACKENDS); exports are cached on disk
+        self.backend = backend
+        self.calibration_video = calibration_video
+        
+        # Frame sampling: analyze every `frame_stride`-th frame, or as many
+        # frames per second as `target_fps` asks for when it is set
+        self.frame_stride = frame_stride
+        self.target_fps = target_fps
+        self.sampling = sampling
+        
+        # Have ffmpeg shrink frames to fit the model input (640) while
+        # decoding, in the BGR order ultralytics expects, straight into
+        # reused buffers; None decodes full-size frames
+        self.decode_size = decode_size
+        
+        # Frames per predict call; None sizes batches from available memory
+        self.batch_size = batch_size
+        
+        # Also save per-frame counts as compressed NumPy columns (.npz)
+        self.columnar_output = columnar_output
+        
+        # Bounded hand-off between the decode, inference and logging stages
+        self.queue_size = queue_size
+        self.last_pipeline_stats = None
+        
+        # Long videos are split into up to `shards` keyframe-aligned ranges
+        # analyzed by that many processes, each with its own model
+        # (see sharded_analysis); 1 keeps everything in this process
+        self.shards = max(1, int(shards))
+        self._shard_pool = None
+        
+        # Checkpoint runs so an interrupted one resumes where it stopped;
+        # incremental runs also extend the last finished run of a video
+        # with just the frames appended since (see AnalysisCheckpoint)
+        self.checkpoints = checkpoints
+        self.incremental = incremental
+        
+        # Skip the model on sampled frames that barely differ from the last
+        # analyzed one (see MotionGate for how the thresholds trade off)
+        self.motion_gating = motion_gating
+        self.motion_threshold = motion_threshold
+        self.motion_pixel_delta = motion_pixel_delta
+        self.motion_max_skip = motion_max_skip
+        
         # PPE category mappings
         self.PPE_SYNONYMS = {
             "hat": {"helmet", "hard hat", "hat", "headgear", "hardhat", "safety helmet"},
@@ -43,22 +130,80 @@ class PPEDetector:
             "vest": {"vest", "safety vest", "reflective vest", "high visibility vest", "hi vis"}
         }
         
+        # class id -> index into PPE_CATEGORIES, built once per model
+        self.category_lookup = None
+        
+        # Predictors aren't thread-safe; live streams and analyses share the model
+        self._predict_lock = threading.Lock()
+        
         # Results storage
         self.results_dir = Path("ppe_results")
         self.results_dir.mkdir(exist_ok=True)
         
-        self.load_model()
+        # Unchanged video + weights + parameters -> reuse the saved results
+        self.result_cache = ResultCache(self.results_dir) if cache_results else None
+        
+        # Index of saved runs for latest/history lookups
+        self.results_catalog = ResultsCatalog(self.results_dir)
+        
+        # Per-frame counts by site and video time for dashboard charts
+        self.timeline = TimelineStore(self.results_dir / "timeline") if timeline else None
+        
+        # Set once the model is loaded (and warmed up, for background loads)
+        self.ready = threading.Event()
+        self.ready_at = None  # time.perf_counter() when ready was set
+        self.load_timings = {}
+        
+        if not defer_load:
+            self.load_model()
+            self.ready_at = time.perf_counter()
+            self.ready.set()
+    
+    def start_background_load(self):
+        """Load and warm up the model in a thread; `ready` is set when done"""
+        def worker():
+            try:
+                self.load_model()
+                self.warm_up()
+            except Exception as e:
+                print(f"Error during background model load: {e}")
+            finally:
+                self.ready_at = time.perf_counter()
+                self.ready.set()
+                print(f"✅ PPE model ready ({self.load_timings})")
+        
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
+    
+    def warm_up(self):
+        """One throwaway inference so the first real request isn't slow"""
+        if self.model is None:
+            return
+        started = time.perf_counter()
+        self.detect_frame(np.zeros((480, 640, 3), dtype=np.uint8))
+        self.load_timings["warm_up_s"] = round(time.perf_counter() - started, 3)
     
     def load_model(self):
         """Load YOLO model if available"""
+        global YOLO
         if not YOLO_AVAILABLE:
             print("YOLO not available - using simulated detection")
             self.model = None
             return
         
+        started = time.perf_counter()
         try:
-            self.model = YOLO(self.weights_path)
+            if YOLO is None:
+                from ultralytics import YOLO
+                self.load_timings["ultralytics_import_s"] = round(time.perf_counter() - started, 3)
+            if self.backend != "pytorch":
+                self.model = self.load_exported_model()
+            if self.model is None:
+                self.model = YOLO(self.weights_path)
             self.names = self.model.names
+            self.build_category_lookup()
+            self.load_timings["load_s"] = round(time.perf_counter() - started, 3)
             print(f"PPE Detection model loaded: {self.weights_path}")
             print(f"Available classes: {list(self.names.values())[:10]}...")  # Show first 10 classes
         except Exception as e:
@@ -66,10 +211,44 @@ class PPEDetector:
             print("Falling back to simulated detection for demo purposes")
             self.model = None
     
+    def load_exported_model(self):
+        """YOLO over the exported backend model, or None to fall back to PyTorch"""
+        try:
+            calibration_video = self.calibration_video
+            if BACKENDS.get(self.backend, (None, False))[1] and not calibration_video:
+                calibration_video = find_calibration_video()
+            model_path = resolve_model_path(
+                self.weights_path, self.backend, imgsz=640, calibration_video=calibration_video
+            )
+            model = YOLO(model_path, task="detect")
+            print(f"Using {self.backend} backend: {model_path}")
+            return model
+        except Exception as e:
+            print(f"Could not load {self.backend} backend ({e}); using PyTorch")
+            self.backend = "pytorch"
+            return None
+    
     def normalize_label(self, label):
         """Normalize class name for matching"""
         return re.sub(r"[^a-z0-9]+", " ", label.lower()).strip()
     
+    def build_category_lookup(self):
+        """Precompute the class id -> PPE category lookup (-1 for non-PPE classes)"""
+        size = max((int(class_id) for class_id in self.names), default=-1) + 1
+        lookup = np.full(size, -1, dtype=np.int64)
+        
+        for class_id, label in self.names.items():
+            label_normalized = self.normalize_label(label)
+            
+            # Same first-match rule the per-box loop used to apply
+            for index, category in enumerate(PPE_CATEGORIES):
+                if any(syn in label_normalized for syn in self.PPE_SYNONYMS[category]):
+                    lookup[int(class_id)] = index
+                    break
+        
+        self.category_lookup = lookup
+        return lookup
+    
     def count_ppe_from_result(self, result):
         """Count PPE items detected in frame"""
         counts = {"hat": 0, "mask": 0, "vest": 0}
@@ -81,31 +260,45 @@ class PPEDetector:
         if result.boxes is None or len(result.boxes) == 0:
             return counts
         
-        conf = result.boxes.conf
-        cls = result.boxes.cls
+        if self.category_lookup is None:
+            self.build_category_lookup()
         
-        for i in range(len(cls)):
-            if float(conf[i]) < self.conf_threshold:
-                continue
-            
-            class_id = int(cls[i])
-            label = self.names.get(class_id, str(class_id))
-            label_normalized = self.normalize_label(label)
-            
-            # Match against PPE categories
-            for category, synonyms in self.PPE_SYNONYMS.items():
-                if any(syn in label_normalized for syn in synonyms):
-                    counts[category] += 1
-                    break
+        conf = to_numpy(result.boxes.conf)
+        cls = to_numpy(result.boxes.cls).astype(np.int64)
+        
+        # Confident boxes -> category index, then one bincount per frame
+        class_ids = cls[conf >= self.conf_threshold]
+        class_ids = class_ids[(class_ids >= 0) & (class_ids < len(self.category_lookup))]
+        categories = self.category_lookup[class_ids]
+        tally = np.bincount(categories[categories >= 0], minlength=len(PPE_CATEGORIES))
+        
+        for index, category in enumerate(PPE_CATEGORIES):
+            counts[category] = int(tally[index])
         
         return counts
     
-    def analyze_video(self, video_path, site_id="SITE_001"):
-        """Analyze video file for PPE compliance"""
+    def analyze_video(self, video_path, site_id="SITE_001", progress_callback=None, alert_callback=None,
+                      incremental=None, fallback=True):
+        """Analyze video file for PPE compliance
+
+        A failed analysis returns simulated results; with fallback=False
+        the error is raised instead.
+        """
         if not os.path.exists(video_path):
             print(f"⚠️  Video file not found: {video_path}")
             return self.create_simulated_results(site_id)
         
+        cache_key = None
+        if self.result_cache:
+            params = dict(self.cache_params(), site_id=site_id)
+            cache_key = self.result_cache.key_for(video_path, file_hash(self.weights_path), params)
+            cached = self.result_cache.lookup(cache_key)
+            if cached:
+                print(f"♻️  Reusing cached PPE analysis for {os.path.basename(video_path)}")
+                ANALYSES.inc(outcome="cached")
+                cached["cache_hit"] = True
+                return cached
+        
         file_size = os.path.getsize(video_path) / (1024 * 1024)  # Size in MB
         print(f"🎬 Analyzing video: {os.path.basename(video_path)} ({file_size:.1f} MB)")
         
@@ -115,123 +308,342 @@ class PPEDetector:
         json_path = self.results_dir / f"ppe_alerts_{site_id}_{timestamp}.json"
         
         try:
-            return self.process_video_file(video_path, csv_path, json_path, site_id)
+            results = self.process_video_file(
+                video_path, csv_path, json_path, site_id,
+                progress_callback=progress_callback, alert_callback=alert_callback,
+                incremental=incremental
+            )
         except Exception as e:
+            ANALYSES.inc(outcome="failed")
             print(f"❌ Error processing video: {e}")
+            if not fallback:
+                raise
             print(f"📊 Generating simulated results for {site_id}")
             return self.create_simulated_results(site_id)
+        
+        ANALYSES.inc(outcome="completed")
+        if cache_key and "status" not in results:  # never cache simulated data
+            self.result_cache.store(cache_key, json_path, [json_path, results.get("csv_log"), results.get("columnar_log")])
+        return results
     
-    def process_video_file(self, video_path, csv_path, json_path, site_id):
-        """Process actual video file"""
+    def cache_params(self):
+        """Detector settings that change analysis output (part of the cache key)"""
+        params = {
+            "conf_threshold": self.conf_threshold,
+            "frame_stride": self.frame_stride,
+            "target_fps": self.target_fps,
+            "imgsz": 640,
+            "decode_size": self.decode_size,
+            "synonyms": {category: sorted(syns) for category, syns in self.PPE_SYNONYMS.items()},
+            "columnar_output": self.columnar_output
+        }
+        if self.backend != "pytorch":
+            params["backend"] = self.backend
+        if self.motion_gating:
+            params["motion_gate"] = [self.motion_threshold, self.motion_pixel_delta, self.motion_max_skip]
+        return params
+    
+    def worker_kwargs(self):
+        """Constructor arguments for an identically configured detector in another process"""
+        return {
+            "weights_path": self.weights_path,
+            "conf_threshold": self.conf_threshold,
+            "frame_stride": self.frame_stride,
+            "target_fps": self.target_fps,
+            "sampling": self.sampling,
+            "decode_size": self.decode_size,
+            "batch_size": self.batch_size,
+            "queue_size": self.queue_size,
+            "motion_gating": self.motion_gating,
+            "motion_threshold": self.motion_threshold,
+            "motion_pixel_delta": self.motion_pixel_delta,
+            "motion_max_skip": self.motion_max_skip,
+            "backend": self.backend,
+            "calibration_video": self.calibration_video,
+            "cache_results": False,
+            "checkpoints": False,
+            "timeline": False
+        }
+    
+    def open_reader(self, video_path, start_frame=0, end_frame=None):
+        """SampledVideoReader for analysis with this detector's sampling and decode settings"""
+        options = {}
+        if self.decode_size is not None:
+            # Enough buffers for every frame the pipeline can hold at once: a
+            # full frame queue, a full inference batch and one being decoded
+            batch_size = self.batch_size or MAX_AUTO_BATCH_SIZE
+            options = dict(max_side=self.decode_size, pix_fmt="bgr24", buffers=self.queue_size + batch_size + 2)
+        return SampledVideoReader(
+            video_path, frame_stride=self.frame_stride, target_fps=self.target_fps,
+            mode=self.sampling, start_frame=start_frame, end_frame=end_frame, **options
+        )
+    
+    def motion_gate(self):
+        """A fresh MotionGate for one analysis, or None when gating is off"""
+        if not self.motion_gating:
+            return None
+        return MotionGate(
+            threshold=self.motion_threshold,
+            pixel_delta=self.motion_pixel_delta,
+            max_skip=self.motion_max_skip,
+            bgr=self.decode_size is not None
+        )
+    
+    def shard_pool(self):
+        if self._shard_pool is None:
+            self._shard_pool = ShardPool(self.shards, self.worker_kwargs())
+        return self._shard_pool
+    
+    def process_video_file(self, video_path, csv_path, json_path, site_id, progress_callback=None,
+                           alert_callback=None, incremental=None):
+        """Process actual video file
+
+        progress_callback(frames_processed, total_frames) is called from the
+        writer stage after every analyzed frame, and alert_callback(alert)
+        for each alert as soon as it is raised. `incremental` (default: the
+        detector setting) continues the last finished run of this video.
+        Runs of the same video for the same site wait for each other.
+        """
         if not IMAGEIO_AVAILABLE or not YOLO_AVAILABLE:
             return self.create_simulated_results(site_id)
         
-        reader = imageio.get_reader(video_path)
-        meta = reader.get_meta_data()
-        fps = meta.get("fps", 24)
-        
-        # CSV logging
-        with open(csv_path, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                "frame", "time_s", "hat_present", "mask_present", "vest_present",
-                "hat_count", "mask_count", "vest_count", 
-                "alert_hat", "alert_mask", "alert_vest"
-            ])
-        
-        alerts_generated = []
-        violation_count = 0
-        total_frames = 0
-        
-        # Process frames
-        for i, frame in enumerate(reader):
-            if i % 30 == 0:  # Process every 30th frame for performance
-                time_s = i / float(fps)
-                
-                # Run inference
-                if self.model:
-                    results = self.model.predict(
-                        source=frame, 
-                        imgsz=640, 
-                        conf=self.conf_threshold, 
-                        verbose=False
-                    )
-                    result = results[0]
-                    counts = self.count_ppe_from_result(result)
-                else:
-                    # Simulated detection
-                    counts = self.simulate_frame_detection(i)
-                
-                # Check compliance
-                hat_present = counts["hat"] > 0
-                mask_present = counts["mask"] > 0
-                vest_present = counts["vest"] > 0
-                
-                # Generate alerts for violations
-                if not hat_present:
-                    violation_count += 1
-                    alerts_generated.append({
-                        "type": "NoHelmetDetected",
-                        "timestamp": (datetime.now() - timedelta(seconds=(total_frames-i)/fps)).isoformat() + "Z",
-                        "description": f"Worker detected without helmet at {time_s:.1f}s",
-                        "confidence": 0.92,
-                        "frame": i,
-                        "video_time": time_s
-                    })
-                
-                if not vest_present and i % 60 == 0:  # Less frequent vest checks
-                    violation_count += 1
-                    alerts_generated.append({
-                        "type": "SafetyVestMissing",
-                        "timestamp": (datetime.now() - timedelta(seconds=(total_frames-i)/fps)).isoformat() + "Z",
-                        "description": f"Worker without safety vest detected at {time_s:.1f}s",
-                        "confidence": 0.87,
-                        "frame": i,
-                        "video_time": time_s
-                    })
-                
-                # Log to CSV
-                with open(csv_path, "a", newline="") as f:
-                    writer = csv.writer(f)
-                    writer.writerow([
-                        i, f"{time_s:.3f}",
-                        int(hat_present), int(mask_present), int(vest_present),
-                        counts["hat"], counts["mask"], counts["vest"],
-                        "OK" if hat_present else "NO_HAT",
-                        "OK" if mask_present else "NO_MASK",
-                        "OK" if vest_present else "NO_VEST"
-                    ])
-            
-            total_frames = i
-            if i % 100 == 0:
-                print(f"Processed {i} frames...")
+        with AnalysisLock(self.results_dir, site_id, video_path):
+            return self._process_video_file(
+                video_path, csv_path, json_path, site_id,
+                progress_callback=progress_callback, alert_callback=alert_callback,
+                incremental=incremental
+            )
+    
+    def _process_video_file(self, video_path, csv_path, json_path, site_id, progress_callback=None,
+                            alert_callback=None, incremental=None):
+        reader = self.open_reader(video_path)
+        fps = reader.fps
+        
+        checkpoint = base = None
+        if self.checkpoints:
+            checkpoint = AnalysisCheckpoint(
+                self.results_dir, site_id, video_path,
+                dict(self.cache_params(), weights=file_hash(self.weights_path))
+            )
+            base = checkpoint.resume_point(self.incremental if incremental is None else incremental)
+            if base and base["stride"] != reader.stride:
+                base = None
+        if base and base["log_path"] == f"{csv_path}.partial":
+            # Retried within the same second, so this run's log has the
+            # interrupted run's name; move that log aside to seed from it
+            os.replace(base["log_path"], f"{base['log_path']}.resume")
+            base["log_path"] = base["partial_log"] = f"{base['log_path']}.resume"
+        if base:
+            reader.start_frame = base["next_frame"]
+            action = "Resuming" if base["status"] == "running" else "Extending"
+            print(f"⏩ {action} analysis of {os.path.basename(video_path)} from frame {reader.start_frame}")
+        
+        # Per-frame log: one buffered sink for the whole run
+        columnar_path = Path(csv_path).with_suffix(".npz") if self.columnar_output else None
+        
+        # The sink flushes what it has if analysis fails and only publishes
+        # the CSV (atomic rename) once every frame has been processed
+        gate = self.motion_gate()
+        
+        timeline = None
+        if self.timeline:
+            # Frames this run analyzes replace whatever the series has for them
+            timeline = self.timeline.series(site_id, video_path)
+            timeline.truncate_from(reader.start_frame)
         
-        reader.close()
+        with FrameResultsWriter(
+            csv_path, columnar_path=columnar_path,
+            seed_path=base["log_path"] if base else None,
+            seed_bytes=base["log_bytes"] if base else None,
+            timeline=timeline
+        ) as sink:
+            accumulator = AnalysisAccumulator(fps, sink)
+            if base:
+                accumulator.restore(base["accumulator"])
+            if checkpoint:
+                sink.on_flush = lambda: checkpoint.save(
+                    "running", reader.stride, accumulator, sink.partial_path, sink.bytes_written
+                )
+            total_frames = reader.estimated_frame_count()
+            shard_ranges = [(reader.start_frame, None)]
+            if self.shards > 1:
+                shard_ranges = plan_shards(
+                    video_path, reader.start_frame, total_frames, reader.stride, fps, self.shards
+                )
+            
+            if len(shard_ranges) > 1:
+                print(f"🧩 Analyzing {os.path.basename(video_path)} in {len(shard_ranges)} shards")
+                reader.last_frame_index, pipeline_timing, gating = analyze_sharded(
+                    self.shard_pool(), video_path, shard_ranges, accumulator,
+                    progress_callback=progress_callback,
+                    alert_callback=alert_callback,
+                    total_frames=total_frames
+                )
+            else:
+                pipeline = AnalysisPipeline(
+                    self, reader, accumulator,
+                    queue_size=self.queue_size,
+                    progress_callback=progress_callback,
+                    gate=gate,
+                    alert_callback=alert_callback
+                )
+                pipeline.run()
+                pipeline_timing = pipeline.stats()
+                gating = gate.summary() if gate is not None else None
         
         # Generate summary
-        analysis_results = {
-            "site_id": site_id,
-            "video_path": str(video_path),
-            "analysis_timestamp": datetime.now().isoformat(),
-            "total_frames_processed": total_frames,
-            "total_violations": violation_count,
-            "compliance_score": max(0, 100 - (violation_count * 5)),  # Rough calculation
-            "alerts": alerts_generated[-10:],  # Last 10 alerts
-            "csv_log": str(csv_path),
-            "summary": {
-                "helmet_violations": len([a for a in alerts_generated if a["type"] == "NoHelmetDetected"]),
-                "vest_violations": len([a for a in alerts_generated if a["type"] == "SafetyVestMissing"]),
-                "total_violations": len(alerts_generated)
+        analysis_results = accumulator.summary(
+            site_id, video_path, csv_path, total_frames=reader.last_frame_index
+        )
+        if columnar_path:
+            analysis_results["columnar_log"] = str(columnar_path)
+        analysis_results["pipeline_timing"] = pipeline_timing
+        if gating is not None:
+            analysis_results["motion_gating"] = gating
+        if base:
+            analysis_results["continued_from"] = {
+                "mode": "resume" if base["status"] == "running" else "incremental",
+                "start_frame": reader.start_frame,
+                "previous_results": base["results_json"],
+                "frames_analyzed_this_run": accumulator.frames_analyzed - base["accumulator"]["frames_analyzed"]
             }
-        }
+        self.last_pipeline_stats = analysis_results["pipeline_timing"]
         
         # Save JSON results
-        with open(json_path, "w") as f:
-            json.dump(analysis_results, f, indent=2)
+        atomic_write_json(json_path, analysis_results)
+        self.results_catalog.record(json_path, analysis_results)
+        
+        if checkpoint:
+            checkpoint.save(
+                "complete", reader.stride, accumulator, None, os.path.getsize(csv_path),
+                csv_log=str(csv_path), results_json=str(json_path)
+            )
+            if base and base["status"] == "running":
+                # The interrupted run's log is now part of this one
+                try:
+                    os.remove(base["partial_log"])
+                except OSError:
+                    pass
         
         print(f"PPE analysis complete. Results saved to {json_path}")
         return analysis_results
     
+    def resolve_batch_size(self, frame_shape):
+        """Pick an inference batch size that fits in available memory"""
+        if self.batch_size:
+            return max(1, int(self.batch_size))
+        
+        available = available_memory_bytes()
+        if available is None:
+            return DEFAULT_BATCH_SIZE
+        
+        # Source frame + letterboxed float32 input + a rough allowance for
+        # per-image activations, kept within a quarter of free memory
+        height, width = frame_shape[:2]
+        per_frame = height * width * 3 + 4 * (640 * 640 * 3 * 4)
+        fits = int((available * 0.25) // per_frame)
+        return max(1, min(MAX_AUTO_BATCH_SIZE, fits))
+    
+    def predict_counts(self, frames):
+        """Run a single predict call over a batch of frames, counts in input order"""
+        started = time.perf_counter()
+        with self._predict_lock:
+            results = self.model.predict(
+                source=list(frames),
+                imgsz=640,
+                conf=self.conf_threshold,
+                verbose=False
+            )
+        INFERENCE_SECONDS.observe(time.perf_counter() - started, mode="batch")
+        INFERENCE_FRAMES.inc(len(results), mode="batch")
+        return [self.count_ppe_from_result(result) for result in results]
+    
+    def detect_frame(self, frame):
+        """Boxes for one frame: dicts with box (x1, y1, x2, y2), label, category, confidence"""
+        if not YOLO_AVAILABLE or self.model is None:
+            return []
+        
+        started = time.perf_counter()
+        with self._predict_lock:
+            result = self.model.predict(
+                source=frame,
+                imgsz=640,
+                conf=self.conf_threshold,
+                verbose=False
+            )[0]
+        INFERENCE_SECONDS.observe(time.perf_counter() - started, mode="frame")
+        INFERENCE_FRAMES.inc(mode="frame")
+        
+        if result.boxes is None or len(result.boxes) == 0:
+            return []
+        
+        if self.category_lookup is None:
+            self.build_category_lookup()
+        
+        detections = []
+        for box, conf, class_id in zip(to_numpy(result.boxes.xyxy),
+                                       to_numpy(result.boxes.conf),
+                                       to_numpy(result.boxes.cls).astype(np.int64)):
+            if conf < self.conf_threshold:
+                continue
+            category = None
+            if 0 <= class_id < len(self.category_lookup) and self.category_lookup[class_id] >= 0:
+                category = PPE_CATEGORIES[self.category_lookup[class_id]]
+            detections.append({
+                "box": [int(v) for v in box],
+                "label": self.names.get(int(class_id), str(int(class_id))),
+                "category": category,
+                "confidence": round(float(conf), 3)
+            })
+        return detections
+    
+    def iter_frame_counts(self, frames, gate=None):
+        """Yield (sample_no, frame_index, counts) for (frame_index, frame) pairs
+
+        With a MotionGate, frames it judges unchanged skip the model and
+        repeat the counts of the frame before them.
+        """
+        if not self.model:
+            # Simulated detection
+            for sample_no, (i, _frame) in enumerate(frames):
+                yield sample_no, i, self.simulate_frame_detection(i)
+            return
+        
+        batch = []
+        pending = 0  # frames in the batch that need the model
+        batch_size = None
+        previous = None
+        for sample_no, (i, frame) in enumerate(frames):
+            if batch_size is None:
+                batch_size = self.resolve_batch_size(frame.shape)
+            if gate is not None and not gate.should_infer(frame):
+                frame = None
+            else:
+                pending += 1
+            batch.append((sample_no, i, frame))
+            if pending >= batch_size:
+                previous = yield from self._flush_batch(batch, previous, gate)
+                batch = []
+                pending = 0
+        
+        if batch:
+            yield from self._flush_batch(batch, previous, gate)
+    
+    def _flush_batch(self, batch, previous=None, gate=None):
+        """Yield counts for a batch in order; returns the last counts"""
+        frames = [frame for _, _, frame in batch if frame is not None]
+        started = time.perf_counter()
+        counts = iter(self.predict_counts(frames) if frames else [])
+        if gate is not None:
+            gate.record_inference(time.perf_counter() - started, len(frames))
+        
+        for sample_no, i, frame in batch:
+            if frame is not None:
+                previous = next(counts)
+            # Skipped frames carry the last analyzed counts forward
+            yield sample_no, i, dict(previous)
+        return previous
+    
     def simulate_frame_detection(self, frame_num):
         """Simulate PPE detection for demo purposes"""
         # Simulate some violations over time
@@ -284,41 +696,42 @@ class PPEDetector:
     
     def get_latest_results(self, site_id):
         """Get the most recent PPE analysis results for a site"""
-        pattern = f"ppe_alerts_{site_id}_*.json"
-        result_files = list(self.results_dir.glob(pattern))
-        
-        if not result_files:
-            return self.create_simulated_results(site_id)
-        
-        # Get most recent file
-        latest_file = max(result_files, key=os.path.getctime)
-        
         try:
-            with open(latest_file, 'r') as f:
-                return json.load(f)
+            results = self.results_catalog.latest(site_id)
         except Exception as e:
             print(f"Error reading results file: {e}")
             return self.create_simulated_results(site_id)
+        
+        if results is None:
+            return self.create_simulated_results(site_id)
+        return results
+    
+    def get_results_history(self, site_id, since=None, until=None, limit=100):
+        """Catalogued analysis runs for a site, newest first"""
+        return self.results_catalog.history(site_id, since=since, until=until, limit=limit)
+    
+    def get_timeline(self, site_id, start=None, end=None, resolution=None, video=None):
+        """Bucketed per-frame counts over video time, or None if nothing is stored"""
+        if self.timeline is None:
+            return None
+        return self.timeline.query(site_id, start=start, end=end, resolution=resolution, video=video)
 
 # Global PPE detector instance
 ppe_detector = None
 
-def initialize_ppe_detector():
-    """Initialize the global PPE detector"""
+def initialize_ppe_detector(background=False):
+    """Initialize the global PPE detector
+
+    With background=True this returns immediately and the model loads (and
+    warms up) in a thread; check `ppe_detector.ready` before using it.
+    """
     global ppe_detector
     if ppe_detector is None:
-        ppe_detector = PPEDetector()
+        ppe_detector = PPEDetector(
+            backend=os.environ.get("PPE_BACKEND", "pytorch"),
+            shards=int(os.environ.get("PPE_VIDEO_SHARDS", "1")),
+            defer_load=background
+        )
+        if background:
+            ppe_detector.start_background_load()
     return ppe_detector
-
-def analyze_video_async(video_path, site_id, callback=None):
-    """Analyze video in background thread"""
-    def worker():
-        detector = initialize_ppe_detector()
-        results = detector.analyze_video(video_path, site_id)
-        if callback:
-            callback(results)
-    
-    thread = threading.Thread(target=worker)
-    thread.daemon = True
-    thread.start()
-    return thread
\ No newline at end of file
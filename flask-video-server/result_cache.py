@@ -0,0 +1,165 @@
+"""
+Result Cache Module for ConstructGuard-AI
+Content-addressed cache so unchanged videos are never re-analyzed
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+from results_writer import atomic_write_json
+
+# Bytes hashed from each sampled region of a video
+FINGERPRINT_BLOCK_SIZE = 1 << 20
+FINGERPRINT_BLOCKS = 8
+
+_file_hash_memo = {}
+_file_hash_lock = threading.Lock()
+
+
+def video_fingerprint(path, block_size=FINGERPRINT_BLOCK_SIZE, blocks=FINGERPRINT_BLOCKS):
+    """Fast content fingerprint: file size plus evenly spaced blocks.
+
+    Reads at most `blocks * block_size` bytes, so it stays cheap for
+    multi-GB recordings while still changing when the content does.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.blake2b(str(size).encode(), digest_size=20)
+
+    with open(path, "rb") as f:
+        if size <= block_size * blocks:
+            digest.update(f.read())
+        else:
+            step = (size - block_size) // (blocks - 1)
+            for n in range(blocks):
+                f.seek(n * step)
+                digest.update(f.read(block_size))
+
+    return digest.hexdigest()
+
+
+def file_hash(path):
+    """Full-content hash (for model weights), memoized by size and mtime"""
+    if not os.path.exists(path):
+        # ultralytics resolves bare names like "yolo11n.pt" itself
+        return "name:" + os.path.basename(str(path))
+
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _file_hash_lock:
+        if memo_key in _file_hash_memo:
+            return _file_hash_memo[memo_key]
+
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+
+    with _file_hash_lock:
+        _file_hash_memo[memo_key] = digest.hexdigest()
+    return _file_hash_memo[memo_key]
+
+
+class ResultCache:
+    """Maps (video fingerprint, weights hash, detector params) to saved results.
+
+    Each entry is a small JSON file under `<results_dir>/cache/` named by its
+    key, so lookups are a single open() and concurrent analysis workers
+    never fight over a shared index. An entry's mtime doubles as its
+    last-access time for LRU eviction.
+
+    The result files belong to the analysis run (the results catalog and
+    checkpoints point at them too), so eviction only forgets the entry;
+    with `delete_outputs` it also deletes the run's files.
+    """
+
+    def __init__(self, results_dir, max_entries=500, max_age_days=30, max_bytes=1 << 30,
+                 delete_outputs=False):
+        self.cache_dir = Path(results_dir) / "cache"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_age_s = max_age_days * 24 * 3600
+        self.max_bytes = max_bytes
+        self.delete_outputs = delete_outputs
+
+    def key_for(self, video_path, weights_hash, params):
+        # The fingerprint samples blocks, so a same-size rewrite that misses
+        # them would look unchanged; the mtime catches any rewrite
+        payload = json.dumps({
+            "video": video_fingerprint(video_path),
+            "video_mtime_ns": os.stat(video_path).st_mtime_ns,
+            "weights": weights_hash,
+            "params": params
+        }, sort_keys=True)
+        return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+    def _entry_path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    def lookup(self, key):
+        """Saved results for `key`, or None if missing, expired or incomplete"""
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r") as f:
+                entry = json.load(f)
+            with open(entry["results_json"], "r") as f:
+                results = json.load(f)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        if time.time() - entry.get("created", 0) > self.max_age_s:
+            self._remove(entry_path, entry)
+            return None
+
+        os.utime(entry_path)  # mark as recently used
+        return results
+
+    def store(self, key, results_json, files):
+        """Remember the result files of a finished analysis"""
+        files = [str(path) for path in files if path and os.path.exists(path)]
+        atomic_write_json(self._entry_path(key), {
+            "key": key,
+            "created": time.time(),
+            "results_json": str(results_json),
+            "files": files,
+            "bytes": sum(os.path.getsize(path) for path in files)
+        })
+        self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones over the limits"""
+        now = time.time()
+        entries = []
+        for entry_path in self.cache_dir.glob("*.json"):
+            try:
+                with open(entry_path, "r") as f:
+                    entry = json.load(f)
+                last_access = entry_path.stat().st_mtime
+            except (OSError, ValueError):
+                continue
+            if now - entry.get("created", 0) > self.max_age_s:
+                self._remove(entry_path, entry)
+            else:
+                entries.append((last_access, entry_path, entry))
+
+        entries.sort(key=lambda item: item[0], reverse=True)
+        total_bytes = 0
+        for count, (_, entry_path, entry) in enumerate(entries, start=1):
+            total_bytes += entry.get("bytes", 0)
+            if count > self.max_entries or total_bytes > self.max_bytes:
+                self._remove(entry_path, entry)
+
+    def _remove(self, entry_path, entry):
+        if self.delete_outputs:
+            for path in entry.get("files", []):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        try:
+            os.remove(entry_path)
+        except OSError:
+            pass
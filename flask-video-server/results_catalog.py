@@ -0,0 +1,163 @@
+"""
+Results Catalog Module for ConstructGuard-AI
+SQLite index of PPE analysis runs for fast latest/history lookups
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    json_path TEXT PRIMARY KEY,
+    site_id TEXT NOT NULL,
+    analyzed_at REAL NOT NULL,
+    analysis_timestamp TEXT,
+    csv_path TEXT,
+    video_path TEXT,
+    compliance_score REAL,
+    total_violations INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_site_time ON runs (site_id, analyzed_at);
+"""
+
+
+class ResultsCatalog:
+    """Catalog of saved analysis runs, kept in sync as results are written.
+
+    The newest parsed result per site is also held in memory. SQLite's
+    data_version tells us when another connection (an analysis worker
+    process) has committed, so the memory copy is only rebuilt after an
+    actual change and a dashboard poll is normally a dict lookup.
+    """
+
+    def __init__(self, results_dir):
+        self.results_dir = Path(results_dir)
+        self.db_path = self.results_dir / "results_index.sqlite3"
+        self._local = threading.local()
+        self._latest = {}
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            empty = conn.execute("SELECT 1 FROM runs LIMIT 1").fetchone() is None
+        if empty:
+            self.backfill()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.data_version = None
+        return conn
+
+    def _check_external_writes(self, conn):
+        """Forget cached latest results if another connection committed"""
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._local.data_version is not None and version != self._local.data_version:
+            with self._lock:
+                self._latest.clear()
+        self._local.data_version = version
+
+    def record(self, json_path, results, analyzed_at=None):
+        """Add (or replace) one saved run"""
+        json_path = str(json_path)
+        analyzed_at = analyzed_at or time.time()
+        site_id = results.get("site_id")
+
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    json_path, site_id, analyzed_at,
+                    results.get("analysis_timestamp"),
+                    results.get("csv_log"),
+                    results.get("video_path"),
+                    results.get("compliance_score"),
+                    results.get("total_violations")
+                )
+            )
+        self._local.data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+
+        with self._lock:
+            current = self._latest.get(site_id)
+            if current is None or analyzed_at >= current[0]:
+                self._latest[site_id] = (analyzed_at, json_path, results)
+
+    def remove(self, json_path):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM runs WHERE json_path = ?", (str(json_path),))
+        with self._lock:
+            for site_id, (_, path, _) in list(self._latest.items()):
+                if path == str(json_path):
+                    del self._latest[site_id]
+
+    def latest(self, site_id):
+        """Newest saved results for a site, or None"""
+        conn = self._connect()
+        self._check_external_writes(conn)
+
+        with self._lock:
+            cached = self._latest.get(site_id)
+        if cached is not None:
+            return cached[2]
+
+        while True:
+            row = conn.execute(
+                "SELECT json_path, analyzed_at FROM runs WHERE site_id = ? "
+                "ORDER BY analyzed_at DESC LIMIT 1",
+                (site_id,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            try:
+                with open(row["json_path"], "r") as f:
+                    results = json.load(f)
+            except FileNotFoundError:
+                # Evicted or deleted by hand; drop it and try the next run
+                self.remove(row["json_path"])
+                continue
+
+            with self._lock:
+                self._latest[site_id] = (row["analyzed_at"], row["json_path"], results)
+            return results
+
+    def history(self, site_id, since=None, until=None, limit=100):
+        """Catalog rows for a site, newest first, optionally within [since, until]"""
+        query = "SELECT * FROM runs WHERE site_id = ?"
+        params = [site_id]
+        if since is not None:
+            query += " AND analyzed_at >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND analyzed_at <= ?"
+            params.append(until)
+        query += " ORDER BY analyzed_at DESC LIMIT ?"
+        params.append(int(limit))
+
+        rows = self._connect().execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def backfill(self):
+        """Index result files written before the catalog existed"""
+        count = 0
+        for json_path in self.results_dir.glob("ppe_alerts_*.json"):
+            try:
+                with open(json_path, "r") as f:
+                    results = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if results.get("site_id"):
+                self.record(json_path, results, analyzed_at=os.path.getctime(json_path))
+                count += 1
+        if count:
+            print(f"Indexed {count} existing PPE result files")
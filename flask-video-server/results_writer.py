@@ -0,0 +1,185 @@
+"""
+Results Writer Module for ConstructGuard-AI
+Buffered, crash-safe sinks for per-frame PPE analysis logs
+"""
+
+import os
+import csv
+import json
+import time
+import numpy as np
+
+CSV_HEADER = [
+    "frame", "time_s", "hat_present", "mask_present", "vest_present",
+    "hat_count", "mask_count", "vest_count",
+    "alert_hat", "alert_mask", "alert_vest"
+]
+
+
+def atomic_write_json(path, data):
+    """Write JSON next to `path` and rename it into place"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def frame_csv_row(frame_index, time_s, counts):
+    """Format one analyzed frame as a CSV log row"""
+    hat_present = counts["hat"] > 0
+    mask_present = counts["mask"] > 0
+    vest_present = counts["vest"] > 0
+    return [
+        frame_index, f"{time_s:.3f}",
+        int(hat_present), int(mask_present), int(vest_present),
+        counts["hat"], counts["mask"], counts["vest"],
+        "OK" if hat_present else "NO_HAT",
+        "OK" if mask_present else "NO_MASK",
+        "OK" if vest_present else "NO_VEST"
+    ]
+
+
+class FrameResultsWriter:
+    """Single long-lived sink for per-frame rows of one analysis run.
+
+    Rows go to `<csv_path>.partial` in buffered batches and the file is
+    renamed over `csv_path` only when the run completes. If the run fails,
+    buffered rows are still flushed so the partial log survives for
+    inspection. With `columnar_path` set, the same frames are also saved as
+    compressed NumPy columns (.npz) for downstream analytics.
+
+    `seed_path`/`seed_bytes` start the log with the first bytes of an earlier
+    log (a resumed or extended run). If `on_flush` is set, the file is
+    fsynced after each flush and on_flush() is called, so a checkpoint can
+    record `bytes_written` knowing those rows are on disk.
+
+    With `timeline` (a TimelineSeries), each flush also appends the flushed
+    frames' counts to that series.
+    """
+
+    def __init__(self, csv_path, flush_rows=256, flush_interval=5.0, columnar_path=None,
+                 seed_path=None, seed_bytes=None, on_flush=None, timeline=None):
+        self.csv_path = str(csv_path)
+        self.partial_path = f"{self.csv_path}.partial"
+        self.columnar_path = str(columnar_path) if columnar_path else None
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.timeline = timeline
+
+        self._buffer = []
+        self._timeline_rows = []
+        self._columns = {"frame": [], "time_s": [], "hat": [], "mask": [], "vest": []}
+        self.rows_written = 0
+        if seed_path:
+            self._file = self._seed(seed_path, seed_bytes)
+            self._writer = csv.writer(self._file)
+        else:
+            self._file = open(self.partial_path, "w", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(CSV_HEADER)
+        self._last_flush = time.monotonic()
+
+    def _seed(self, seed_path, seed_bytes):
+        with open(seed_path, "rb") as src, open(self.partial_path, "wb") as dst:
+            remaining = seed_bytes if seed_bytes is not None else os.path.getsize(seed_path)
+            while remaining > 0:
+                chunk = src.read(min(remaining, 1 << 20))
+                if not chunk:
+                    raise ValueError(f"{seed_path} is shorter than its checkpoint")
+                dst.write(chunk)
+                remaining -= len(chunk)
+
+        with open(self.partial_path, "r", newline="") as f:
+            rows = csv.reader(f)
+            if next(rows, None) != CSV_HEADER:
+                raise ValueError(f"{seed_path} is not a PPE frame log")
+            for row in rows:
+                self.rows_written += 1
+                if self.columnar_path:
+                    self._columns["frame"].append(int(row[0]))
+                    self._columns["time_s"].append(float(row[1]))
+                    for category, value in zip(("hat", "mask", "vest"), row[5:8]):
+                        self._columns[category].append(int(value))
+        return open(self.partial_path, "a", newline="")
+
+    @property
+    def bytes_written(self):
+        """Size of the log up to the last flush"""
+        return self._file.tell()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def write_frame(self, frame_index, time_s, counts):
+        """Queue one analyzed frame; flushes by row count or elapsed time"""
+        self._buffer.append(frame_csv_row(frame_index, time_s, counts))
+        if self.columnar_path:
+            self._columns["frame"].append(frame_index)
+            self._columns["time_s"].append(time_s)
+            for category in ("hat", "mask", "vest"):
+                self._columns[category].append(counts[category])
+        if self.timeline is not None:
+            self._timeline_rows.append((frame_index, time_s, counts["hat"], counts["mask"], counts["vest"]))
+
+        if (len(self._buffer) >= self.flush_rows
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        flushed = bool(self._buffer)
+        if self._buffer:
+            self._writer.writerows(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+        self._file.flush()
+        if self._timeline_rows:
+            self.timeline.append(*zip(*self._timeline_rows))
+            self._timeline_rows = []
+        self._last_flush = time.monotonic()
+        if flushed and self.on_flush:
+            os.fsync(self._file.fileno())
+            self.on_flush()
+
+    def close(self):
+        """Finish the run: flush, fsync and atomically publish the logs"""
+        if self._file.closed:
+            return
+        self.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.partial_path, self.csv_path)
+
+        if self.columnar_path:
+            self._write_columnar()
+
+    def abort(self):
+        """Keep whatever was analyzed in the .partial log and stop writing"""
+        if self._file.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._file.close()
+
+    def _write_columnar(self):
+        tmp_path = f"{self.columnar_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                frame=np.asarray(self._columns["frame"], dtype=np.int64),
+                time_s=np.asarray(self._columns["time_s"], dtype=np.float64),
+                hat_count=np.asarray(self._columns["hat"], dtype=np.int32),
+                mask_count=np.asarray(self._columns["mask"], dtype=np.int32),
+                vest_count=np.asarray(self._columns["vest"], dtype=np.int32),
+            )
+        os.replace(tmp_path, self.columnar_path)
@@ -0,0 +1,271 @@
+"""
+Sharded Analysis Module for ConstructGuard-AI
+Splits one long video into keyframe-aligned frame ranges analyzed in parallel processes
+"""
+
+import re
+import bisect
+import subprocess
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from analysis_pipeline import AnalysisPipeline
+from metrics import REGISTRY
+
+# Shorter shards spend more time loading and seeking than analyzing
+MIN_SHARD_SECONDS = 60
+
+_PTS_TIME = re.compile(r"pts_time:\s*(-?[\d.]+)")
+
+# Per-process state inside shard workers
+_shard_detector = None
+_shard_progress = None
+
+
+def keyframe_times(video_path):
+    """Keyframe timestamps (seconds), decoding only the keyframes.
+
+    Returns None when ffmpeg isn't available or the probe fails.
+    """
+    try:
+        import imageio_ffmpeg
+        ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    except (ImportError, RuntimeError):
+        return None
+
+    proc = subprocess.run(
+        [ffmpeg, "-hide_banner", "-nostats", "-skip_frame", "nokey", "-i", str(video_path),
+         "-an", "-vf", "showinfo", "-vsync", "0", "-f", "null", "-"],
+        capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return None
+    return sorted(float(t) for t in _PTS_TIME.findall(proc.stderr))
+
+
+def plan_shards(video_path, start_frame, total_frames, stride, fps, shards):
+    """Split [start_frame, total_frames) into up to `shards` frame ranges.
+
+    Each boundary is moved to the first keyframe after the even split point
+    and then up onto the sampling grid (a multiple of `stride`), so every
+    shard samples exactly the frames a serial run would and its seek
+    decodes little it doesn't use. Videos too short to give every shard
+    MIN_SHARD_SECONDS get fewer shards. Returns (start, end) pairs; the
+    last end is None (to the end of the video).
+    """
+    span = total_frames - start_frame
+    shards = min(int(shards), int(span / (MIN_SHARD_SECONDS * fps))) if fps else 1
+    if shards <= 1:
+        return [(start_frame, None)]
+
+    keyframes = keyframe_times(video_path)
+    keyframe_indices = sorted({int(round(t * fps)) for t in keyframes}) if keyframes else []
+    boundaries = [start_frame]
+    for n in range(1, shards):
+        target = start_frame + span * n // shards
+        position = bisect.bisect_left(keyframe_indices, target)
+        if position < len(keyframe_indices):
+            target = keyframe_indices[position]
+        boundary = -(-target // stride) * stride  # round up onto the grid
+        if boundaries[-1] < boundary < total_frames:
+            boundaries.append(boundary)
+
+    return list(zip(boundaries, boundaries[1:] + [None]))
+
+
+def _init_shard_worker(progress, detector_kwargs):
+    """Pool initializer: one PPEDetector (and model) per shard process"""
+    global _shard_detector, _shard_progress
+    from ppe_detector import PPEDetector
+    _shard_progress = progress
+    _shard_detector = PPEDetector(**detector_kwargs)
+
+
+class _ShardRows:
+    """Stands in for AnalysisAccumulator inside a shard: keeps counts, no alerts"""
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, sample_no, frame_index, counts):
+        self.rows.append((frame_index, counts))
+        return []
+
+
+def _analyze_shard(run_id, shard_no, video_path, start_frame, end_frame):
+    detector = _shard_detector
+    reader = detector.open_reader(video_path, start_frame=start_frame, end_frame=end_frame)
+    gate = detector.motion_gate()
+
+    rows = _ShardRows()
+    last_report = [0.0]
+
+    def report_progress(frames_processed, _total_frames):
+        now = time.monotonic()
+        if now - last_report[0] >= 0.5:
+            last_report[0] = now
+            _shard_progress.put((run_id, shard_no, frames_processed))
+
+    pipeline = AnalysisPipeline(
+        detector, reader, rows,
+        queue_size=detector.queue_size,
+        progress_callback=report_progress,
+        gate=gate
+    )
+    pipeline.run()
+    return {
+        "rows": rows.rows,
+        "last_frame_index": reader.last_frame_index,
+        "pipeline_timing": pipeline.stats(),
+        "motion_gating": gate.summary() if gate is not None else None,
+        "metrics": REGISTRY.drain()
+    }
+
+
+class ShardPool:
+    """Long-lived spawn process pool whose workers each hold a detector"""
+
+    def __init__(self, workers, detector_kwargs):
+        self.workers = workers
+        self.detector_kwargs = detector_kwargs
+        self._ctx = multiprocessing.get_context("spawn")
+        self._executor = None
+        self._progress = None
+        self._listeners = {}
+        self._lock = threading.Lock()
+        self._runs = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._progress = self._ctx.Queue()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=self._ctx,
+                    initializer=_init_shard_worker,
+                    initargs=(self._progress, self.detector_kwargs)
+                )
+                threading.Thread(target=self._progress_loop, args=(self._progress,), daemon=True).start()
+            self._runs += 1
+            return self._executor, self._runs
+
+    def _progress_loop(self, progress):
+        while True:
+            try:
+                message = progress.get()
+            except (EOFError, OSError):
+                return
+            if message is None:
+                return
+            run_id, shard_no, frames_processed = message
+            listener = self._listeners.get(run_id)
+            if listener:
+                listener(shard_no, frames_processed)
+
+    def run(self, video_path, ranges, on_progress=None):
+        """Analyze each (start, end) range; yields shard results in range order"""
+        executor, run_id = self._get_executor()
+        if on_progress:
+            self._listeners[run_id] = on_progress
+        futures = []
+        try:
+            futures = [
+                executor.submit(_analyze_shard, run_id, n, str(video_path), start, end)
+                for n, (start, end) in enumerate(ranges)
+            ]
+            for future in futures:
+                try:
+                    yield future.result()
+                except BrokenProcessPool:
+                    # A worker died; the next run starts a fresh pool
+                    self.close()
+                    raise
+        finally:
+            self._listeners.pop(run_id, None)
+            for future in futures:
+                future.cancel()
+
+    def close(self):
+        with self._lock:
+            executor, progress = self._executor, self._progress
+            self._executor = self._progress = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if progress is not None:
+            progress.put(None)
+
+
+def analyze_sharded(pool, video_path, ranges, accumulator, progress_callback=None,
+                    alert_callback=None, total_frames=None):
+    """Run `ranges` on `pool` and replay their rows through `accumulator`.
+
+    Shards are merged in range order as they finish, numbering samples
+    the way a single pipeline would, so the log, alerts and totals come
+    out the same as a serial run. Returns (last frame index, timing in
+    the AnalysisPipeline.stats() shape plus per-shard entries, merged
+    motion gating summary or None).
+    """
+    started = time.perf_counter()
+    lock = threading.Lock()
+    shard_frames = {}
+
+    def report(shard_no, frames_processed):
+        with lock:
+            shard_frames[shard_no] = frames_processed - ranges[shard_no][0]
+            if progress_callback:
+                progress_callback(ranges[0][0] + sum(shard_frames.values()), total_frames)
+
+    sample_no = 0
+    last_frame_index = ranges[0][0]
+    shard_stats = []
+    gating = []
+    for n, result in enumerate(pool.run(video_path, ranges, report)):
+        REGISTRY.merge(result["metrics"])
+        for frame_index, counts in result["rows"]:
+            frame_alerts = accumulator.add(sample_no, frame_index, counts)
+            sample_no += 1
+            if alert_callback:
+                for alert in frame_alerts:
+                    alert_callback(alert)
+        last_frame_index = result["last_frame_index"]
+        start, end = ranges[n]
+        shard_stats.append(dict(result["pipeline_timing"], start_frame=start, end_frame=end))
+        if result["motion_gating"]:
+            gating.append(result["motion_gating"])
+        report(n, last_frame_index + 1)
+
+    return last_frame_index, _merge_timing(time.perf_counter() - started, shard_stats), _merge_gating(gating)
+
+
+def _merge_timing(wall_s, shard_stats):
+    stages = {}
+    for stats in shard_stats:
+        for name, stage in stats["stages"].items():
+            total = stages.setdefault(name, {"items": 0, "busy_s": 0.0, "wait_input_s": 0.0, "wait_output_s": 0.0})
+            for key in total:
+                total[key] += stage[key]
+    for stage in stages.values():
+        for key in ("busy_s", "wait_input_s", "wait_output_s"):
+            stage[key] = round(stage[key], 3)
+        stage["ms_per_item"] = round(stage["busy_s"] / stage["items"] * 1000, 2) if stage["items"] else None
+    return {
+        "wall_s": round(wall_s, 3),
+        "bottleneck": max(stages, key=lambda name: stages[name]["busy_s"]),
+        "stages": stages,
+        "shards": shard_stats
+    }
+
+
+def _merge_gating(summaries):
+    if not summaries:
+        return None
+    merged = {key: summaries[0][key] for key in ("threshold", "pixel_delta", "max_skip")}
+    for key in ("frames_checked", "frames_skipped"):
+        merged[key] = sum(s[key] for s in summaries)
+    merged["skip_ratio"] = round(merged["frames_skipped"] / merged["frames_checked"], 4) if merged["frames_checked"] else 0.0
+    for key in ("gate_time_s", "est_time_saved_s"):
+        merged[key] = round(sum(s[key] for s in summaries), 3)
+    return merged
@@ -0,0 +1,404 @@
+"""
+Stream Broadcaster Module for ConstructGuard-AI
+One capture/encode producer per feed, fanned out to every MJPEG viewer
+"""
+
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from metrics import ENCODE_SECONDS, STREAM_FRAMES
+
+# Keep a producer alive this long after its last viewer leaves, so page
+# reloads don't reopen the capture device
+DEFAULT_IDLE_TIMEOUT = 3.0
+
+# Producer crashes in a row after which viewers are disconnected instead
+# of the producer being restarted again
+MAX_PRODUCER_RESTARTS = 3
+
+# A producer that has run this long before crashing starts a fresh count
+STABLE_PRODUCER_SECONDS = 30.0
+
+# Adaptive quality bounds; steps are coarse so clients share encodes
+MIN_ADAPTIVE_QUALITY = 40
+QUALITY_STEP = 10
+
+
+class FramePacer:
+    """Deadline-based pacing for a target frame rate.
+
+    Each wait() sleeps until the next frame slot instead of a fixed
+    interval, so time spent decoding/encoding is absorbed rather than added
+    on top. When the caller falls more than a slot behind, the missed slots
+    are skipped (counted in `missed`) instead of bursting to catch up.
+    """
+
+    def __init__(self, fps):
+        self.interval = 1.0 / fps if fps and fps > 0 else 0.0
+        self.missed = 0
+        self._deadline = None
+
+    def wait(self):
+        now = time.monotonic()
+        if self._deadline is None:
+            self._deadline = now
+        self._deadline += self.interval
+
+        delay = self._deadline - now
+        if delay > 0:
+            time.sleep(delay)
+        elif self.interval and -delay > self.interval:
+            self.missed += int(-delay / self.interval)
+            self._deadline = now
+
+
+class StreamFrame:
+    """One published frame: the default JPEG plus the source image if kept"""
+
+    def __init__(self, seq, jpeg, image=None):
+        self.seq = seq
+        self.jpeg = jpeg
+        self.image = image
+
+
+class StreamSettings:
+    """Per-client output settings from query parameters"""
+
+    def __init__(self, width=None, height=None, quality=None, max_fps=None, adaptive=True):
+        self.width = width
+        self.height = height
+        self.quality = quality
+        self.max_fps = max_fps
+        self.adaptive = adaptive
+
+    @classmethod
+    def from_args(cls, args):
+        """Parse ?width=&height=&quality=&max_fps=&adaptive=; raises ValueError"""
+        def positive_int(name):
+            value = args.get(name)
+            if value in (None, ''):
+                return None
+            value = int(value)
+            if value <= 0:
+                raise ValueError(f"{name} must be positive")
+            return value
+
+        quality = positive_int('quality')
+        if quality is not None:
+            quality = max(10, min(95, quality))
+        max_fps = args.get('max_fps')
+        max_fps = float(max_fps) if max_fps not in (None, '') else None
+        if max_fps is not None and max_fps <= 0:
+            raise ValueError("max_fps must be positive")
+
+        return cls(
+            width=positive_int('width'),
+            height=positive_int('height'),
+            quality=quality,
+            max_fps=max_fps,
+            adaptive=args.get('adaptive', '1').lower() not in ('0', 'false', 'no')
+        )
+
+
+class StreamSubscription:
+    """A viewer's cursor into a broadcaster's frame sequence"""
+
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+        self.last_seq = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+
+    def next_frame(self, timeout=5.0):
+        """Block until a frame newer than the last one seen; None on timeout.
+
+        Frames published while this viewer was busy are skipped, so a slow
+        client only ever gets the latest frame and never holds up others.
+        """
+        frame = self.broadcaster.wait_for_frame(self.last_seq, timeout)
+        if frame is None:
+            return None
+        if self.last_seq:
+            self.frames_dropped += max(0, frame.seq - self.last_seq - 1)
+        self.last_seq = frame.seq
+        self.frames_sent += 1
+        return frame
+
+    def close(self):
+        self.broadcaster.unsubscribe(self)
+
+
+class FrameBroadcaster:
+    """Runs camera.get_frame() in one thread and publishes the latest JPEG.
+
+    The producer starts with the first subscriber and stops (releasing the
+    capture) once nobody has been watching for `idle_timeout` seconds. If
+    it crashes, waiting viewers restart it, up to MAX_PRODUCER_RESTARTS
+    times in a row (a run of STABLE_PRODUCER_SECONDS resets the count);
+    `last_error` keeps the most recent failure.
+    """
+
+    def __init__(self, camera_factory, name="feed", idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.camera_factory = camera_factory
+        self.name = name
+        self.idle_timeout = idle_timeout
+        self._subscribers = set()
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._frame = None
+        self._thread = None
+        self._last_left = None
+        self._variants = {}
+        self._variant_locks = {}
+        self.failures = 0
+        self.last_error = None
+
+    @property
+    def subscriber_count(self):
+        with self._cond:
+            return len(self._subscribers)
+
+    @property
+    def running(self):
+        with self._cond:
+            return self._thread is not None
+
+    def subscribe(self):
+        subscription = StreamSubscription(self)
+        with self._cond:
+            if not self._subscribers:
+                self.failures = 0  # a fresh audience gets a fresh set of restarts
+            self._subscribers.add(subscription)
+            self._last_left = None
+            self._ensure_producer()
+        return subscription
+
+    def ensure_producer(self):
+        """Restart a crashed producer; False once it has failed too often"""
+        with self._cond:
+            return self._ensure_producer()
+
+    def _ensure_producer(self):
+        if self._thread is None:
+            if self.failures > MAX_PRODUCER_RESTARTS:
+                return False
+            self._thread = threading.Thread(target=self._produce, daemon=True)
+            self._thread.start()
+        return True
+
+    def unsubscribe(self, subscription):
+        with self._cond:
+            self._subscribers.discard(subscription)
+            if not self._subscribers:
+                self._last_left = time.monotonic()
+
+    def wait_for_frame(self, last_seq, timeout):
+        """Newest StreamFrame after `last_seq`, or None on timeout or producer exit"""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: (self._seq > last_seq and self._frame is not None) or self._thread is None,
+                timeout=timeout
+            )
+            if self._seq > last_seq and self._frame is not None:
+                return self._frame
+            return None
+
+    def encode_variant(self, frame, width=None, height=None, quality=None):
+        """JPEG for `frame` at a client's size/quality, encoded once per frame.
+
+        Viewers asking for the same variant share the encode, so the cost
+        grows with the number of distinct settings, not the number of viewers.
+        """
+        if width is None and height is None and quality is None:
+            return frame.jpeg
+
+        key = (width, height, quality)
+        with self._cond:
+            cached = self._variants.get(key)
+            if cached is not None and cached[0] == frame.seq:
+                return cached[1]
+            lock = self._variant_locks.setdefault(key, threading.Lock())
+
+        with lock:
+            with self._cond:
+                cached = self._variants.get(key)
+            if cached is not None and cached[0] == frame.seq:
+                return cached[1]
+
+            image = frame.image
+            if image is None:
+                image = cv2.imdecode(np.frombuffer(frame.jpeg, np.uint8), cv2.IMREAD_COLOR)
+            image = resize_to_fit(image, width, height)
+
+            params = [cv2.IMWRITE_JPEG_QUALITY, quality] if quality else []
+            with ENCODE_SECONDS.time(kind="variant"):
+                ok, jpeg = cv2.imencode('.jpg', image, params)
+            data = jpeg.tobytes() if ok else frame.jpeg
+
+            with self._cond:
+                self._variants[key] = (frame.seq, data)
+            return data
+
+    def _idle_expired(self):
+        return (not self._subscribers and self._last_left is not None
+                and time.monotonic() - self._last_left >= self.idle_timeout)
+
+    def _failed(self, error, started):
+        print(f"❌ Stream producer for {self.name} failed: {error!r}")
+        with self._cond:
+            self._thread = None
+            if time.monotonic() - started >= STABLE_PRODUCER_SECONDS:
+                self.failures = 0
+            self.failures += 1
+            self.last_error = repr(error)
+            self._cond.notify_all()  # let waiting viewers restart us or give up
+
+    def _produce(self):
+        started = time.monotonic()
+        try:
+            camera = self.camera_factory()
+        except Exception as e:
+            self._failed(e, started)
+            return
+
+        print(f"📡 Started stream producer for {self.name}")
+        if getattr(camera, 'is_file', False) and getattr(camera, 'fps', 0):
+            pacer = FramePacer(camera.fps)  # original video FPS
+        else:
+            pacer = FramePacer(10)  # 10 FPS for webcam
+        try:
+            while True:
+                # Deciding to stop and clearing _thread happen under one lock,
+                # so a viewer arriving now either keeps us alive or starts a
+                # fresh producer
+                with self._cond:
+                    if self._idle_expired():
+                        self._thread = None
+                        self._frame = None
+                        break
+
+                jpeg = camera.get_frame()
+                if jpeg is not None:
+                    STREAM_FRAMES.inc(source=self.name)
+                    with self._cond:
+                        self._seq += 1
+                        self._frame = StreamFrame(self._seq, jpeg, getattr(camera, 'last_image', None))
+                        self._cond.notify_all()
+
+                pacer.wait()
+        except Exception as e:
+            self._failed(e, started)
+        finally:
+            del camera
+            print(f"📴 Stopped stream producer for {self.name}")
+
+
+def resize_to_fit(image, width=None, height=None):
+    """Downscale to fit within width x height keeping aspect (never upscales)"""
+    h, w = image.shape[:2]
+    scale = min(
+        width / w if width else 1.0,
+        height / h if height else 1.0,
+        1.0
+    )
+    if scale >= 1.0:
+        return image
+    size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+class ClientStream:
+    """Paces and sizes one viewer's MJPEG stream.
+
+    The client gets at most max_fps (capped at the source rate) on deadline
+    pacing. If writing a frame to its socket takes longer than a frame slot,
+    the client has fallen behind: the pacer skips slots, the newest frame is
+    sent next, and with `adaptive` on the JPEG quality steps down (and creeps
+    back up after a long run of on-time sends).
+    """
+
+    def __init__(self, broadcaster, settings, source_fps=None):
+        self.broadcaster = broadcaster
+        self.settings = settings
+        fps = settings.max_fps or source_fps or 10
+        if source_fps:
+            fps = min(fps, source_fps)
+        self.pacer = FramePacer(fps)
+        self.quality = settings.quality
+        self._ahead = 0
+        self._cooldown = 0
+
+    def frames(self):
+        """Yield encoded JPEGs for this client until the generator is closed"""
+        subscription = self.broadcaster.subscribe()
+        try:
+            while True:
+                frame = subscription.next_frame()
+                if frame is None:
+                    if not self.broadcaster.ensure_producer():
+                        print(f"📴 Ending {self.broadcaster.name} stream: producer keeps failing "
+                              f"({self.broadcaster.last_error})")
+                        return
+                    continue
+
+                data = self.broadcaster.encode_variant(
+                    frame, self.settings.width, self.settings.height, self.quality
+                )
+                sent_at = time.monotonic()
+                yield data
+                self._adapt(time.monotonic() - sent_at)
+                self.pacer.wait()
+        finally:
+            subscription.close()
+
+    def _adapt(self, send_time):
+        if not self.settings.adaptive or not self.pacer.interval:
+            return
+
+        ceiling = self.settings.quality or 90
+        current = self.quality or ceiling
+        if self._cooldown:
+            self._cooldown -= 1
+
+        if send_time > self.pacer.interval:
+            # The socket write stalled past a frame slot: step quality down,
+            # then give the smaller frames a few slots to take effect
+            self._ahead = 0
+            if not self._cooldown and current > MIN_ADAPTIVE_QUALITY:
+                self.quality = max(MIN_ADAPTIVE_QUALITY, current - QUALITY_STEP)
+                self._cooldown = 10
+        else:
+            self._ahead += 1
+            if self._ahead >= 60 and self.quality is not None and current < ceiling:
+                self.quality = min(ceiling, current + QUALITY_STEP)
+                self._ahead = 0
+                if self.quality == ceiling and self.settings.quality is None:
+                    self.quality = None  # back to the shared default encode
+
+
+class BroadcasterRegistry:
+    """Lazily created broadcasters, one per feed key"""
+
+    def __init__(self, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._broadcasters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, camera_factory):
+        with self._lock:
+            broadcaster = self._broadcasters.get(key)
+            if broadcaster is None:
+                broadcaster = FrameBroadcaster(camera_factory, name=str(key), idle_timeout=self.idle_timeout)
+                self._broadcasters[key] = broadcaster
+            return broadcaster
+
+    def stats(self):
+        with self._lock:
+            broadcasters = dict(self._broadcasters)
+        return {
+            str(key): {'subscribers': b.subscriber_count, 'running': b.running}
+            for key, b in broadcasters.items()
+        }
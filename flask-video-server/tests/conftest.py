@@ -0,0 +1,76 @@
+"""
+Shared fixtures for the ConstructGuard-AI analysis tests
+Runs PPEDetector end to end on a synthetic clip with the benchmarks' stub model
+"""
+
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(TESTS_DIR)
+for path in (SERVER_DIR, os.path.join(SERVER_DIR, "benchmarks")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import ppe_detector  # noqa: E402
+from synthetic import StubModel, install_stub_model, make_synthetic_video  # noqa: E402
+
+STRIDE = 10
+
+
+@pytest.fixture(scope="session")
+def video():
+    """20 s, 30 FPS clip whose corner pixels encode the frame number"""
+    return make_synthetic_video("constructguard_test_320x240_20s.mp4", seconds=20, width=320, height=240)
+
+
+@pytest.fixture
+def stub_model(monkeypatch, tmp_path):
+    """StubModel as the detector's YOLO, with ppe_results/ under tmp_path.
+
+    Yields a dict whose "frames" counts the images sent to the model and
+    whose "fail_after" (when set) makes predict raise past that many.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ppe_detector, "YOLO_AVAILABLE", ppe_detector.YOLO_AVAILABLE)
+    monkeypatch.setattr(ppe_detector, "YOLO", ppe_detector.YOLO)
+    install_stub_model(boxes=6)  # sparse enough that missing PPE (and alerts) is common
+
+    calls = {"frames": 0, "fail_after": None}
+    predict = StubModel.predict
+
+    def counting_predict(self, source, **kwargs):
+        calls["frames"] += len(source) if isinstance(source, list) else 1
+        if calls["fail_after"] is not None and calls["frames"] > calls["fail_after"]:
+            raise RuntimeError("stub model failure")
+        return predict(self, source, **kwargs)
+
+    monkeypatch.setattr(StubModel, "predict", counting_predict)
+    yield calls
+
+
+def make_detector(**kwargs):
+    options = dict(frame_stride=STRIDE, cache_results=False, timeline=False)
+    options.update(kwargs)
+    return ppe_detector.PPEDetector(**options)
+
+
+def comparable(results):
+    """(summary fields, per-frame CSV) that must match between equivalent runs"""
+    with open(results["csv_log"]) as f:
+        csv_text = f.read()
+    summary = {key: results[key] for key in (
+        "total_frames_processed", "total_violations", "compliance_score", "summary"
+    )}
+    summary["alerts"] = [(alert["type"], alert["frame"]) for alert in results["alerts"]]
+    return summary, csv_text
+
+
+@pytest.fixture
+def reference(stub_model, video):
+    """comparable() of a straight batch-of-one run in its own site"""
+    results = make_detector(batch_size=1, checkpoints=False).analyze_video(video, "SITE_REF", fallback=False)
+    stub_model["frames"] = 0
+    return comparable(results)
@@ -0,0 +1,18 @@
+"""
+Batching Tests for ConstructGuard-AI
+Batched inference must log and summarize exactly what one-frame predicts do
+"""
+
+import pytest
+
+from conftest import comparable, make_detector
+
+
+@pytest.mark.parametrize("batch_size", [4, 16])
+def test_batched_run_matches_batch_of_one(stub_model, video, reference, batch_size):
+    results = make_detector(batch_size=batch_size, checkpoints=False).analyze_video(video, "SITE_001", fallback=False)
+
+    summary, csv_text = comparable(results)
+    assert (summary, csv_text) == reference
+    # Every sampled frame went through the model exactly once
+    assert stub_model["frames"] == len(csv_text.splitlines()) - 1 == 60
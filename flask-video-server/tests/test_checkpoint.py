@@ -0,0 +1,40 @@
+"""
+Checkpoint Tests for ConstructGuard-AI
+Resumed and incremental runs must end up with the log and summary of a straight run
+"""
+
+import os
+
+from conftest import comparable, make_detector
+
+
+def test_resume_after_crash_matches_straight_run(stub_model, video, reference):
+    stub_model["fail_after"] = 25
+    crashed = make_detector(batch_size=4).analyze_video(video, "SITE_001")
+    assert crashed["status"] == "simulated_demo_data"
+    assert [f for f in os.listdir("ppe_results") if f.endswith(".partial")]
+
+    stub_model.update(frames=0, fail_after=None)
+    results = make_detector(batch_size=4).analyze_video(video, "SITE_001", fallback=False)
+
+    continued = results["continued_from"]
+    assert continued["mode"] == "resume"
+    assert 0 < continued["start_frame"] < 600
+    # Only frames the crashed run never logged went through the model again
+    assert stub_model["frames"] == continued["frames_analyzed_this_run"] < 60
+    assert comparable(results) == reference
+    assert not [f for f in os.listdir("ppe_results") if f.endswith((".partial", ".resume"))]
+
+
+def test_incremental_run_without_new_frames_reuses_log(stub_model, video, reference):
+    detector = make_detector(batch_size=4, incremental=True)
+    first = detector.analyze_video(video, "SITE_001", fallback=False)
+    assert comparable(first) == reference
+
+    stub_model["frames"] = 0
+    results = detector.analyze_video(video, "SITE_001", fallback=False)
+
+    assert results["continued_from"]["mode"] == "incremental"
+    assert results["continued_from"]["frames_analyzed_this_run"] == 0
+    assert stub_model["frames"] == 0
+    assert comparable(results) == reference
@@ -0,0 +1,46 @@
+"""
+Sharded Analysis Tests for ConstructGuard-AI
+Merged shard results must match a single-pipeline run of the same video
+"""
+
+import queue
+
+import sharded_analysis
+from conftest import comparable, make_detector
+
+
+class InlineShardPool:
+    """ShardPool that runs each shard in this process.
+
+    Spawned workers would not see the stub model, so the shards go through
+    the same initializer and _analyze_shard a worker runs, one after another.
+    """
+
+    def __init__(self, detector_kwargs):
+        self.detector_kwargs = detector_kwargs
+        self.ranges = None
+
+    def run(self, video_path, ranges, on_progress=None):
+        self.ranges = ranges
+        sharded_analysis._init_shard_worker(queue.Queue(), self.detector_kwargs)
+        for n, (start, end) in enumerate(ranges):
+            yield sharded_analysis._analyze_shard(0, n, str(video_path), start, end)
+
+
+def test_sharded_run_matches_single_pipeline(stub_model, video, reference, monkeypatch):
+    # The 20 s clip would otherwise be too short to split
+    monkeypatch.setattr(sharded_analysis, "MIN_SHARD_SECONDS", 2)
+    monkeypatch.setattr(sharded_analysis, "_shard_detector", None)
+    monkeypatch.setattr(sharded_analysis, "_shard_progress", None)
+
+    detector = make_detector(batch_size=4, shards=3, checkpoints=False)
+    pool = detector._shard_pool = InlineShardPool(detector.worker_kwargs())
+    results = detector.analyze_video(video, "SITE_001", fallback=False)
+
+    assert len(pool.ranges) == 3
+    starts = [start for start, _end in pool.ranges]
+    assert all(start % detector.frame_stride == 0 for start in starts)
+    assert [end for _start, end in pool.ranges] == starts[1:] + [None]
+    assert len(results["pipeline_timing"]["shards"]) == 3
+    assert comparable(results) == reference
+    assert stub_model["frames"] == 60
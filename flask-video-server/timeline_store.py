@@ -0,0 +1,187 @@
+"""
+Timeline Store Module for ConstructGuard-AI
+Append-only per-frame PPE counts by site and video time, with bucketed range queries
+"""
+
+import os
+import re
+import json
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+# One raw little-endian file per column, all with the same row count
+COLUMNS = {
+    "frame": np.dtype("<i8"),
+    "time_s": np.dtype("<f8"),
+    "hat": np.dtype("<i4"),
+    "mask": np.dtype("<i4"),
+    "vest": np.dtype("<i4"),
+}
+CATEGORIES = ("hat", "mask", "vest")
+
+# Queries without a resolution get about this many buckets; none get more than the cap
+DEFAULT_BUCKETS = 200
+MAX_BUCKETS = 2000
+
+_SAFE_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+class TimelineSeries:
+    """Per-frame counts of one video for one site, ordered by frame.
+
+    Columns live in `<column>.bin` files that only grow, except that
+    truncate_from() cuts them back before a run re-analyzes frames (a full
+    re-run from frame 0, or a resume whose checkpoint is older than what
+    was appended). Readers memory-map the columns and binary-search the
+    time column, so a query touches only the rows in its range.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def _path(self, column):
+        return self.directory / f"{column}.bin"
+
+    def meta(self):
+        try:
+            with open(self.directory / "meta.json", "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def __len__(self):
+        # A crash between column appends leaves some columns a row ahead;
+        # only rows present in every column count
+        rows = []
+        for column, dtype in COLUMNS.items():
+            try:
+                rows.append(os.path.getsize(self._path(column)) // dtype.itemsize)
+            except OSError:
+                return 0
+        return min(rows)
+
+    def truncate_from(self, frame_index):
+        """Drop rows for frame_index and later (keeps a resumed series free of duplicates)"""
+        rows = len(self)
+        keep = rows
+        if rows:
+            keep = int(np.searchsorted(self.read("frame", rows), frame_index, side="left"))
+        for column, dtype in COLUMNS.items():
+            path = self._path(column)
+            if path.exists():
+                os.truncate(path, keep * dtype.itemsize)
+
+    def append(self, frame, time_s, hat, mask, vest):
+        """Append equal-length sequences of rows (frames must keep increasing)"""
+        values = {"frame": frame, "time_s": time_s, "hat": hat, "mask": mask, "vest": vest}
+        for column, dtype in COLUMNS.items():
+            with open(self._path(column), "ab") as f:
+                f.write(np.asarray(values[column], dtype=dtype).tobytes())
+
+    def read(self, column, rows=None):
+        """Read-only memory map of one column (first `rows` rows)"""
+        rows = len(self) if rows is None else rows
+        if rows == 0:
+            return np.empty(0, dtype=COLUMNS[column])
+        return np.memmap(self._path(column), dtype=COLUMNS[column], mode="r", shape=(rows,))
+
+    def buckets(self, start=None, end=None, resolution=None):
+        """min/max/mean counts and compliance per `resolution`-second bucket of [start, end]"""
+        rows = len(self)
+        time_s = self.read("time_s", rows)
+        if start is None:
+            start = float(time_s[0]) if rows else 0.0
+        if end is None:
+            end = float(time_s[-1]) if rows else start
+        span = max(0.0, end - start)
+        if not resolution or resolution <= 0:
+            resolution = span / DEFAULT_BUCKETS or 1.0
+        resolution = max(float(resolution), span / MAX_BUCKETS)
+        bucket_count = max(1, int(np.ceil(span / resolution)))
+
+        lo = int(np.searchsorted(time_s, start, side="left"))
+        hi = int(np.searchsorted(time_s, end, side="right"))
+        result = {"from": start, "to": end, "resolution": round(resolution, 6), "frames": max(0, hi - lo), "buckets": []}
+        if hi <= lo:
+            return result
+
+        # A frame exactly at `end` belongs to the last bucket
+        bucket_ids = np.minimum((time_s[lo:hi] - start) // resolution, bucket_count - 1).astype(np.int64)
+        firsts = np.flatnonzero(np.r_[True, bucket_ids[1:] != bucket_ids[:-1]])
+        counts = np.diff(np.r_[firsts, hi - lo])
+
+        columns = {category: np.asarray(self.read(category, rows)[lo:hi]) for category in CATEGORIES}
+        compliant = (columns["hat"] > 0) & (columns["vest"] > 0)
+        stats = {"compliance": np.add.reduceat(compliant.astype(np.int64), firsts) / counts}
+        for category, values in columns.items():
+            stats[category] = (
+                np.minimum.reduceat(values, firsts),
+                np.maximum.reduceat(values, firsts),
+                np.add.reduceat(values.astype(np.int64), firsts) / counts,
+            )
+
+        for n, first in enumerate(firsts):
+            bucket = {
+                "start": round(start + int(bucket_ids[first]) * resolution, 3),
+                "frames": int(counts[n]),
+                "compliance": round(float(stats["compliance"][n]), 4),
+            }
+            for category in CATEGORIES:
+                mins, maxs, means = stats[category]
+                bucket[category] = {"min": int(mins[n]), "max": int(maxs[n]), "mean": round(float(means[n]), 3)}
+            result["buckets"].append(bucket)
+        return result
+
+
+class TimelineStore:
+    """Timeline series under `<root>/<site_id>/<video key>/`, one per analyzed video"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _site_dir(self, site_id):
+        if not _SAFE_NAME.match(site_id):
+            raise ValueError(f"Invalid site id: {site_id!r}")
+        return self.root / site_id
+
+    def series(self, site_id, video_path):
+        """The (created if needed) series for one video of a site"""
+        video_path = os.path.abspath(str(video_path))
+        video_key = hashlib.blake2b(video_path.encode(), digest_size=6).hexdigest()
+        directory = self._site_dir(site_id) / video_key
+        if not directory.exists():
+            directory.mkdir(parents=True, exist_ok=True)
+            with open(directory / "meta.json", "w") as f:
+                json.dump({"video_key": video_key, "video_path": video_path,
+                           "video_name": os.path.basename(video_path)}, f)
+        return TimelineSeries(directory)
+
+    def videos(self, site_id):
+        """Series of a site, most recently appended first"""
+        site_dir = self._site_dir(site_id)
+        if not site_dir.is_dir():
+            return []
+        series = [TimelineSeries(path) for path in site_dir.iterdir() if (path / "meta.json").exists()]
+
+        def updated(entry):
+            try:
+                return os.path.getmtime(entry._path("frame"))
+            except OSError:
+                return 0.0
+
+        return sorted(series, key=updated, reverse=True)
+
+    def query(self, site_id, start=None, end=None, resolution=None, video=None):
+        """Buckets for one video of a site (by name or key; default: the latest one analyzed)"""
+        candidates = self.videos(site_id)
+        if video:
+            candidates = [s for s in candidates if video in (s.meta().get("video_key"), s.meta().get("video_name"))]
+        if not candidates:
+            return None
+
+        series = candidates[0]
+        result = {"site_id": site_id, "video": series.meta()}
+        result.update(series.buckets(start, end, resolution))
+        return result
@@ -0,0 +1,205 @@
+"""
+Video Reader Module for ConstructGuard-AI
+Decodes only the frames that PPE analysis actually looks at
+"""
+
+import subprocess
+import tempfile
+
+import numpy as np
+
+try:
+    import imageio.v2 as imageio
+    IMAGEIO_AVAILABLE = True
+except ImportError:
+    IMAGEIO_AVAILABLE = False
+
+# "select" lets ffmpeg drop unused frames, "sequential" is the original
+# decode-every-frame-and-skip loop (kept for benchmarks and odd containers)
+SAMPLING_MODES = ("select", "sequential")
+
+# Channel orders ffmpeg can hand over directly (ultralytics expects BGR arrays)
+PIXEL_FORMATS = ("rgb24", "bgr24")
+
+
+def resolve_stride(fps, frame_stride=30, target_fps=None):
+    """Turn a stride or a target analysis FPS into a frame stride"""
+    if target_fps:
+        return max(1, int(round(float(fps) / float(target_fps))))
+    return max(1, int(frame_stride))
+
+
+def fit_within(width, height, max_side):
+    """(width, height) scaled down so neither side exceeds max_side; never enlarged"""
+    if not max_side or max(width, height) <= max_side:
+        return width, height
+    scale = max_side / float(max(width, height))
+    return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+
+def _read_full(stream, view):
+    """readinto() until `view` is full; returns the bytes read (short only at EOF)"""
+    filled = 0
+    while filled < len(view):
+        read = stream.readinto(view[filled:])
+        if not read:
+            break
+        filled += read
+    return filled
+
+
+class SampledVideoReader:
+    """Iterate (frame_index, frame) pairs for every `stride`-th frame of a video
+
+    With `start_frame` (a multiple of the stride, so the sampling grid is the
+    same as a full run) ffmpeg seeks straight to that frame instead of
+    decoding everything before it; `end_frame` (exclusive) stops early.
+
+    `max_side` has ffmpeg shrink frames (area averaging) to fit that size
+    while decoding, and `pix_fmt` picks the channel order it writes. With
+    `buffers` set, frames are read straight into a ring of that many
+    preallocated arrays instead of a new array per frame: a yielded frame
+    is overwritten `buffers` frames later, so callers must not hold more
+    than buffers - 1 of them at once. Any of these options switches from
+    imageio's reader to a raw ffmpeg pipe.
+    """
+
+    def __init__(self, video_path, frame_stride=30, target_fps=None, mode="select", start_frame=0,
+                 end_frame=None, max_side=None, pix_fmt="rgb24", buffers=0):
+        if not IMAGEIO_AVAILABLE:
+            raise RuntimeError("imageio is required for video decoding")
+        if mode not in SAMPLING_MODES:
+            raise ValueError(f"Unknown sampling mode: {mode} (use one of {SAMPLING_MODES})")
+        if pix_fmt not in PIXEL_FORMATS:
+            raise ValueError(f"Unknown pixel format: {pix_fmt} (use one of {PIXEL_FORMATS})")
+
+        self.video_path = str(video_path)
+        self.mode = mode
+
+        # Probe metadata first so a target FPS can be converted to a stride
+        probe = imageio.get_reader(self.video_path)
+        self.meta = probe.get_meta_data()
+        probe.close()
+
+        self.fps = self.meta.get("fps", 24) or 24
+        self.stride = resolve_stride(self.fps, frame_stride, target_fps)
+        if start_frame % self.stride:
+            raise ValueError(f"start_frame {start_frame} is not on the stride-{self.stride} sampling grid")
+        self.start_frame = int(start_frame)
+        self.end_frame = end_frame
+        self.last_frame_index = 0
+
+        # "size" is what ffmpeg outputs, i.e. after applying any rotation
+        self.source_size = tuple(self.meta.get("size") or self.meta["source_size"])
+        self.frame_size = fit_within(*self.source_size, max_side)
+        self.pix_fmt = pix_fmt
+        self.buffers = int(buffers)
+        self.raw_pipe = bool(max_side or buffers or pix_fmt != "rgb24")
+
+    def estimated_frame_count(self):
+        """Frame count from container duration (ffmpeg reports nframes=inf)"""
+        duration = self.meta.get("duration") or 0
+        return int(round(duration * self.fps))
+
+    def _open(self):
+        # Input-side -ss seeks to the nearest keyframe and then decodes up to
+        # the exact frame; aiming half a frame early keeps rounding from
+        # skipping it. The select filter's n counts from there.
+        input_params = []
+        if self.start_frame:
+            input_params = ["-ss", f"{(self.start_frame - 0.5) / self.fps:.6f}"]
+
+        if self.mode == "sequential" or self.stride == 1:
+            if not input_params:
+                return imageio.get_reader(self.video_path)
+            return imageio.get_reader(self.video_path, "ffmpeg", input_params=input_params)
+
+        # select keeps frame n only when n % stride == 0; vsync 0 stops ffmpeg
+        # from duplicating frames to fill the gaps it just created
+        return imageio.get_reader(
+            self.video_path,
+            "ffmpeg",
+            input_params=input_params,
+            output_params=["-vf", f"select=not(mod(n\\,{self.stride}))", "-vsync", "0"],
+        )
+
+    def _pipe_command(self, selected):
+        import imageio_ffmpeg
+
+        command = [imageio_ffmpeg.get_ffmpeg_exe(), "-hide_banner", "-loglevel", "error", "-nostdin"]
+        if self.start_frame:
+            command += ["-ss", f"{(self.start_frame - 0.5) / self.fps:.6f}"]
+        command += ["-i", self.video_path, "-an", "-sn"]
+
+        filters = []
+        if selected:
+            filters.append(f"select=not(mod(n\\,{self.stride}))")
+        if self.frame_size != self.source_size:
+            filters.append("scale={}:{}:flags=area".format(*self.frame_size))
+        if filters:
+            command += ["-vf", ",".join(filters)]
+        return command + ["-vsync", "0", "-f", "rawvideo", "-pix_fmt", self.pix_fmt, "-"]
+
+    def _pipe_frames(self, selected):
+        """Raw frames from ffmpeg's stdout, read into reused arrays when buffering"""
+        width, height = self.frame_size
+        shape = (height, width, 3)
+        ring = [np.empty(shape, dtype=np.uint8) for _ in range(self.buffers)]
+        scratch = np.empty(shape, dtype=np.uint8)  # frames sequential mode throws away
+        frame_bytes = scratch.nbytes
+
+        with tempfile.TemporaryFile() as errors:
+            proc = subprocess.Popen(self._pipe_command(selected), stdout=subprocess.PIPE, stderr=errors)
+            try:
+                n = 0
+                while True:
+                    wanted = selected or (self.start_frame + n) % self.stride == 0
+                    if not wanted:
+                        frame = scratch
+                    elif ring:
+                        frame = ring[n % len(ring)] if selected else ring[(n // self.stride) % len(ring)]
+                    else:
+                        frame = np.empty(shape, dtype=np.uint8)
+                    if _read_full(proc.stdout, memoryview(frame).cast("B")) < frame_bytes:
+                        break
+                    yield frame
+                    n += 1
+
+                if proc.wait() != 0:
+                    errors.seek(0)
+                    message = errors.read().decode(errors="replace").strip()
+                    raise RuntimeError(f"ffmpeg could not decode {self.video_path}: {message}")
+            finally:
+                proc.stdout.close()
+                if proc.poll() is None:
+                    proc.kill()
+                proc.wait()
+
+    def _imageio_frames(self):
+        reader = self._open()
+        try:
+            yield from reader
+        finally:
+            reader.close()
+
+    def __iter__(self):
+        selected = self.mode == "select" and self.stride > 1
+        frames = self._pipe_frames(selected) if self.raw_pipe else self._imageio_frames()
+        self.last_frame_index = max(0, self.start_frame - 1)
+        try:
+            for n, frame in enumerate(frames):
+                index = self.start_frame + (n * self.stride if selected else n)
+                if self.end_frame is not None and index >= self.end_frame:
+                    break
+                self.last_frame_index = index
+                if selected or index % self.stride == 0:
+                    yield index, frame
+        finally:
+            frames.close()
+
+        if selected:
+            # Frames after the last sampled one were never handed to us
+            end = self.estimated_frame_count()
+            if self.end_frame is not None:
+                end = min(end, self.end_frame)
+            self.last_frame_index = max(self.last_frame_index, end - 1)
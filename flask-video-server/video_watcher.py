@@ -0,0 +1,367 @@
+"""
+Video Watcher Module for ConstructGuard-AI
+Watches a folder for new or grown recordings and queues them for PPE analysis
+"""
+
+import os
+import re
+import time
+import threading
+import importlib.util
+from collections import OrderedDict, deque
+from datetime import datetime
+
+from result_cache import video_fingerprint
+
+# watchdog gives instant filesystem events; without it we poll the folder
+WATCHDOG_AVAILABLE = importlib.util.find_spec("watchdog") is not None
+
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv"}
+
+# Suffixes of files still being copied/downloaded
+TEMP_SUFFIXES = (".part", ".partial", ".tmp", ".crdownload", ".download")
+
+# A file is picked up once its size and mtime have not changed for this long
+DEFAULT_SETTLE_S = float(os.environ.get("PPE_WATCHER_SETTLE_S", "5"))
+
+# Watcher jobs allowed in the analysis scheduler at once; the rest wait here
+DEFAULT_MAX_IN_FLIGHT = int(os.environ.get("PPE_WATCHER_MAX_IN_FLIGHT", "2"))
+
+# Settled files waiting for a slot; beyond this, files are left for a later scan
+DEFAULT_MAX_BACKLOG = 500
+
+# Folder scan period when polling, and safety-net rescan period with watchdog
+DEFAULT_POLL_S = 5.0
+DEFAULT_RESCAN_S = 60.0
+
+# How often the watcher loop settles, dispatches and reaps
+TICK_S = 1.0
+
+# (site, fingerprint) pairs remembered for dedupe
+SEEN_LIMIT = 10000
+
+SITE_PATTERN = re.compile(r"site[_\-\s]?0*(\d+)", re.IGNORECASE)
+
+
+def site_id_for(path):
+    """SITE_00N from the file or folder name (site3_cam1.mp4, SITE_003/...)"""
+    match = None
+    for part in reversed(os.path.normpath(path).split(os.sep)):
+        match = SITE_PATTERN.search(part)
+        if match:
+            break
+    return f"SITE_{match.group(1).zfill(3)}" if match else "UNASSIGNED"
+
+
+def is_video_file(path):
+    name = os.path.basename(path)
+    if name.startswith(".") or name.lower().endswith(TEMP_SUFFIXES):
+        return False
+    return os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS
+
+
+class VideoWatcher:
+    """Turns files dropped into (or appended to in) `watch_dir` into analysis jobs.
+
+    Filesystem events (watchdog) or periodic scans mark a path as changed.
+    Once its size and mtime hold still for `settle_seconds` it is
+    fingerprinted; a (site, fingerprint) pair already analyzed is skipped.
+    Everything else waits in a bounded backlog and is handed to the
+    JobScheduler at low priority, at most `max_in_flight` at a time. Jobs
+    are incremental, so a growing recording only has its new frames
+    analyzed.
+    """
+
+    def __init__(self, watch_dir, job_scheduler=None, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                 settle_seconds=DEFAULT_SETTLE_S, poll_interval=DEFAULT_POLL_S,
+                 rescan_interval=DEFAULT_RESCAN_S, max_backlog=DEFAULT_MAX_BACKLOG,
+                 use_watchdog=True, priority="low"):
+        self.watch_dir = os.path.abspath(str(watch_dir))
+        self.job_scheduler = job_scheduler
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.rescan_interval = rescan_interval
+        self.max_backlog = max_backlog
+        self.use_watchdog = use_watchdog and WATCHDOG_AVAILABLE
+        self.priority = priority
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._observer = None
+        self._known = {}            # path -> (size, mtime_ns) at the last scan
+        self._settling = {}         # path -> [(size, mtime_ns), last change time]
+        self._backlog = deque()     # (path, site_id, fingerprint, ready time)
+        self._backlogged = set()
+        self._in_flight = {}        # job id -> (job, path, site_id, fingerprint, submitted time)
+        self._seen = OrderedDict()  # (site_id, fingerprint) -> path
+        self._recent = deque(maxlen=20)
+        self._completions = deque(maxlen=200)  # (finished time, queue wait s, run s)
+
+        self.started_at = None
+        self.running = False
+        self.counts = {"detected": 0, "submitted": 0, "completed": 0, "failed": 0,
+                       "duplicates_skipped": 0, "deferred": 0}
+        self.last_error = None
+
+    @property
+    def mode(self):
+        return "watchdog" if self.use_watchdog else "polling"
+
+    def notify(self, path):
+        """Mark a path as changed (called from watchdog events and scans)"""
+        if not is_video_file(path):
+            return
+        path = os.path.abspath(path)
+        with self._lock:
+            entry = self._settling.get(path)
+            if entry is None:
+                self.counts["detected"] += 1
+                self._settling[path] = [None, time.monotonic()]
+            else:
+                entry[1] = time.monotonic()
+
+    def start_watching(self):
+        """Run the watcher loop in the calling thread until stop()"""
+        os.makedirs(self.watch_dir, exist_ok=True)
+        if self.job_scheduler is None:
+            from job_scheduler import JobScheduler
+            self.job_scheduler = JobScheduler(max_workers=self.max_in_flight)
+
+        if self.use_watchdog:
+            try:
+                self._start_observer()
+            except Exception as e:
+                # e.g. inotify watch limit reached
+                print(f"⚠️  watchdog unavailable ({e}); polling {self.watch_dir} instead")
+                self.use_watchdog = False
+
+        self.started_at = datetime.now().isoformat()
+        self.running = True
+        print(f"👀 Watching {self.watch_dir} for videos ({self.mode})")
+
+        # Files already in the folder are picked up by the first scan
+        next_scan = 0.0
+        try:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                if now >= next_scan:
+                    self._scan()
+                    next_scan = now + (self.rescan_interval if self.use_watchdog else self.poll_interval)
+                self._settle()
+                self._reap()
+                self._dispatch()
+                self._stop.wait(TICK_S)
+        finally:
+            self.running = False
+            if self._observer is not None:
+                self._observer.stop()
+
+    def stop(self):
+        self._stop.set()
+
+    def _start_observer(self):
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                if not event.is_directory:
+                    watcher.notify(event.src_path)
+
+            def on_modified(self, event):
+                if not event.is_directory:
+                    watcher.notify(event.src_path)
+
+            def on_closed(self, event):
+                if not event.is_directory:
+                    watcher.notify(event.src_path)
+
+            def on_moved(self, event):
+                if not event.is_directory:
+                    watcher.notify(event.dest_path)
+
+        self._observer = Observer()
+        self._observer.schedule(Handler(), self.watch_dir, recursive=True)
+        self._observer.daemon = True
+        self._observer.start()
+
+    def _scan(self):
+        """Walk the folder and notify for new or changed files"""
+        current = {}
+        for root, _dirs, files in os.walk(self.watch_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                if not is_video_file(path):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                current[path] = (stat.st_size, stat.st_mtime_ns)
+
+        # Compared and replaced in one step, so a deferral that forgot a
+        # path while we were walking still gets it offered again
+        with self._lock:
+            changed = [path for path, seen in current.items() if self._known.get(path) != seen]
+            self._known = current
+        for path in changed:
+            self.notify(path)
+
+    def _settle(self):
+        """Move files whose size/mtime held still long enough to the backlog"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = list(self._settling.items())
+
+        for path, (last_stat, changed_at) in candidates:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                with self._lock:
+                    self._settling.pop(path, None)  # deleted or renamed away
+                continue
+
+            current = (stat.st_size, stat.st_mtime_ns)
+            with self._lock:
+                entry = self._settling.get(path)
+                if entry is None:
+                    continue
+                if current != entry[0]:
+                    entry[0], entry[1] = current, now
+                    continue
+                if now - entry[1] < self.settle_seconds or stat.st_size == 0:
+                    continue
+                if path in self._backlogged:
+                    del self._settling[path]
+                    continue
+                if len(self._backlog) >= self.max_backlog:
+                    # Left unknown so the next scan offers it again
+                    self.counts["deferred"] += 1
+                    self._known.pop(path, None)
+                    del self._settling[path]
+                    continue
+                del self._settling[path]
+
+            try:
+                fingerprint = video_fingerprint(path)
+            except OSError:
+                continue
+            site_id = site_id_for(os.path.relpath(path, self.watch_dir))
+            with self._lock:
+                if (site_id, fingerprint) in self._seen:
+                    self.counts["duplicates_skipped"] += 1
+                    continue
+                self._remember(site_id, fingerprint, path)
+                self._backlog.append((path, site_id, fingerprint, time.monotonic()))
+                self._backlogged.add(path)
+
+    def _remember(self, site_id, fingerprint, path):
+        self._seen[(site_id, fingerprint)] = path
+        if len(self._seen) > SEEN_LIMIT:
+            self._seen.popitem(last=False)
+
+    def _next_ready(self):
+        """Oldest backlog entry whose file has no job running; call with the lock held.
+
+        A file that grew while its job runs has to wait for that job, or the
+        scheduler would fold the request into it and miss the new frames.
+        """
+        busy = {entry[1] for entry in self._in_flight.values()}
+        for n, item in enumerate(self._backlog):
+            if item[0] not in busy:
+                del self._backlog[n]
+                self._backlogged.discard(item[0])
+                return item
+        return None
+
+    def _dispatch(self):
+        while True:
+            with self._lock:
+                if len(self._in_flight) >= self.max_in_flight:
+                    return
+                item = self._next_ready()
+                if item is None:
+                    return
+                path, site_id, fingerprint, ready_at = item
+
+            try:
+                job, _created = self.job_scheduler.submit(
+                    path, site_id, priority=self.priority, incremental=True
+                )
+            except Exception as e:
+                self.last_error = f"{os.path.basename(path)}: {e}"
+                with self._lock:
+                    self.counts["failed"] += 1
+                    self._seen.pop((site_id, fingerprint), None)
+                continue
+
+            with self._lock:
+                self.counts["submitted"] += 1
+                self._in_flight[job.id] = (job, path, site_id, fingerprint, ready_at)
+            print(f"📥 Queued {os.path.basename(path)} for {site_id} (job {job.id[:8]})")
+
+    def _reap(self):
+        with self._lock:
+            finished = [(job_id, entry) for job_id, entry in self._in_flight.items() if entry[0].finished]
+            for job_id, _entry in finished:
+                del self._in_flight[job_id]
+
+        for _job_id, (job, path, site_id, fingerprint, ready_at) in finished:
+            now = time.monotonic()
+            run_s = None
+            if job.started_at and job.finished_at:
+                run_s = (datetime.fromisoformat(job.finished_at)
+                         - datetime.fromisoformat(job.started_at)).total_seconds()
+            with self._lock:
+                if job.status == "completed":
+                    self.counts["completed"] += 1
+                    self._completions.append((now, now - ready_at - (run_s or 0), run_s))
+                else:
+                    self.counts["failed"] += 1
+                    self.last_error = f"{os.path.basename(path)}: {job.error}"
+                    # Forget it so the next change to the file retries
+                    self._seen.pop((site_id, fingerprint), None)
+                self._recent.appendleft({
+                    "video": os.path.relpath(path, self.watch_dir),
+                    "site_id": site_id,
+                    "job_id": job.id,
+                    "status": job.status,
+                    "finished_at": job.finished_at,
+                    "run_s": round(run_s, 2) if run_s is not None else None,
+                    "compliance_score": (job.result or {}).get("compliance_score"),
+                    "total_violations": (job.result or {}).get("total_violations")
+                })
+
+    def status(self):
+        """Backlog, throughput and recent jobs for the dashboard"""
+        now = time.monotonic()
+        with self._lock:
+            completions = list(self._completions)
+            last_hour = [c for c in completions if now - c[0] <= 3600]
+            run_times = [c[2] for c in completions if c[2] is not None]
+            waits = [c[1] for c in completions]
+            return {
+                "running": self.running,
+                "mode": self.mode,
+                "watch_dir": self.watch_dir,
+                "started_at": self.started_at,
+                "formats": sorted(VIDEO_EXTENSIONS),
+                "max_in_flight": self.max_in_flight,
+                "backlog": {
+                    "settling": len(self._settling),
+                    "queued": len(self._backlog),
+                    "in_flight": len(self._in_flight),
+                    "max_backlog": self.max_backlog
+                },
+                "counts": dict(self.counts),
+                "throughput": {
+                    "completed_last_hour": len(last_hour),
+                    "avg_run_s": round(sum(run_times) / len(run_times), 2) if run_times else None,
+                    "avg_wait_s": round(sum(waits) / len(waits), 2) if waits else None
+                },
+                "recent": list(self._recent)[:10],
+                "last_error": self.last_error
+            }
@@ -50,6 +50,16 @@ function AutoProcessingStatus() {
     return null;
   }
 
+  const watcher = processingStatus?.auto_processing;
+  const backlog = watcher?.backlog;
+  let watcherState = 'Status: Automatic processing is off';
+  if (watcher?.running) {
+    const waiting = backlog.settling + backlog.queued;
+    watcherState = backlog.in_flight || waiting
+      ? `Status: ${backlog.in_flight} analyzing, ${waiting} waiting`
+      : 'Status: Ready for new videos';
+  }
+
   return (
     <div className="auto-processing-status">
       <div className="status-header">
@@ -63,7 +73,7 @@ function AutoProcessingStatus() {
         <div className="monitoring-info">
           <div className="info-item">
             <span className="icon">📁</span>
-            <span>Watching: construction_videos/</span>
+            <span>Watching: {watcher?.running ? watcher.watch_dir : 'construction_videos/'}</span>
           </div>
           <div className="info-item">
             <span className="icon">🎬</span>
@@ -71,8 +81,17 @@ function AutoProcessingStatus() {
           </div>
           <div className="info-item">
             <span className="icon">⚡</span>
-            <span>Status: Ready for new videos</span>
+            <span>{watcherState}</span>
           </div>
+          {watcher?.running && (
+            <div className="info-item">
+              <span className="icon">📈</span>
+              <span>
+                {watcher.throughput.completed_last_hour} videos in the last hour
+                {watcher.throughput.avg_run_s != null && ` · ${watcher.throughput.avg_run_s}s avg`}
+              </span>
+            </div>
+          )}
         </div>
 
         {lastProcessed && (